@@ -0,0 +1,87 @@
+"""Benchmark batch scoring (/generate_scores) against one generate_score call per bill.
+
+The LLM is replaced by a stub with fixed latency so the numbers reflect
+request scheduling, not model speed:
+
+    python benchmarks/bench_batch_scores.py --bills 40 --latency 0.25
+"""
+
+import argparse
+import asyncio
+import importlib
+import time
+
+from langchain_core.runnables import RunnableLambda
+
+graph_module = importlib.import_module("agent.graph")
+ScoreRecord = graph_module.ScoreRecord
+
+
+class StubLLM:
+    """Stands in for the chat model; every structured call sleeps `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def _record(self) -> ScoreRecord:
+        self.calls += 1
+        item = {"score": 50, "rationale": "stub"}
+        return ScoreRecord(spending=item, equity=item, progress=item, environment=item, personal=item)
+
+    def with_structured_output(self, schema):
+        def invoke(messages):
+            time.sleep(self.latency)
+            return self._record()
+
+        async def ainvoke(messages):
+            await asyncio.sleep(self.latency)
+            return self._record()
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+async def run_batch(preferences, contexts, max_concurrency):
+    results = {}
+    async for index, scores in graph_module.agenerate_scores(preferences, contexts, max_concurrency):
+        results[index] = scores
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bills", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.25, help="Seconds per stub LLM call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    stub = StubLLM(args.latency)
+    graph_module.llm = stub
+    preferences = '{"name": "Jane", "politicalInterests": ["healthcare", "economy"]}'
+    contexts = [f"Bill context for H.R. {1000 + i}" for i in range(args.bills)]
+
+    graph_module.score_cache.clear()
+    start = time.perf_counter()
+    for context in contexts:
+        graph_module.generate_score(preferences, context)
+    single = time.perf_counter() - start
+
+    graph_module.score_cache.clear()
+    start = time.perf_counter()
+    results = asyncio.run(run_batch(preferences, contexts, args.concurrency))
+    batch = time.perf_counter() - start
+    assert len(results) == len(contexts)
+
+    start = time.perf_counter()
+    asyncio.run(run_batch(preferences, contexts, args.concurrency))
+    warm = time.perf_counter() - start
+
+    print(f"{args.bills} bills, {args.latency:.2f}s per call, concurrency {args.concurrency}")
+    print(f"  single-call path : {single:7.2f}s  ({args.bills / single:6.1f} bills/s)")
+    print(f"  batch (cold)     : {batch:7.2f}s  ({args.bills / batch:6.1f} bills/s, {single / batch:.1f}x)")
+    print(f"  batch (cached)   : {warm:7.4f}s")
+    print(f"  stub LLM calls   : {stub.calls}")
+
+
+if __name__ == "__main__":
+    main()
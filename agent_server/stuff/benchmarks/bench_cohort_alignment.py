@@ -0,0 +1,150 @@
+"""Benchmark cohort alignment (align_profiles) against one user_alignment_agent run per user.
+
+Re-aligns one analyzed bill for many subscribed profiles. The LLM is a stub
+whose latency grows with the prompt and with the records it returns, so the
+numbers show how packing K profiles per call trades fewer, larger calls
+against longer answers. Each run is repeated with COMBINED_ALIGNMENT, where one
+call per chunk returns both the benefits and the drawbacks (twice the records,
+half the calls and prompt tokens):
+
+    python benchmarks/bench_cohort_alignment.py --users 32 --chunks 6 --sizes 1,2,4,8 --modes two-call,combined
+"""
+
+import argparse
+import importlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+from langchain.docstore.document import Document
+from langchain_core.runnables import RunnableLambda
+
+from agent.cache import PersistentCache
+from agent.prompts import USER_ALIGNMENT_PROMPTS
+from agent.tokens import estimate_tokens
+from agent.types import (
+    AlignmentRecords,
+    BeneficiaryRecords,
+    BillCost,
+    CohortAlignmentRecords,
+    PorkRecords,
+    TrojanHorseRecords,
+)
+
+graph_module = importlib.import_module("agent.graph")
+
+RECORDS_PER_PROFILE = 3
+RECORD = {"benefit_or_harm": "benefit", "effect_type": "community", "summary": "Funds rural clinics",
+          "explanation": "Section 4 funds clinics in counties under 50,000 people. " * 4, "severity": "medium"}
+HARM = {**RECORD, "benefit_or_harm": "harm", "summary": "Raises clinic reporting costs"}
+
+
+def kind_records(messages: list) -> list:
+    """Records one profile gets from an alignment call: benefits, drawbacks, or both for a combined call."""
+    system = messages[0]["content"]
+    if system.startswith(USER_ALIGNMENT_PROMPTS["combined_analysis"]["content"]):
+        return [RECORD] * RECORDS_PER_PROFILE + [HARM] * RECORDS_PER_PROFILE
+    if system.startswith(USER_ALIGNMENT_PROMPTS["drawbacks_analysis"]["content"]):
+        return [HARM] * RECORDS_PER_PROFILE
+    return [RECORD] * RECORDS_PER_PROFILE
+
+
+class StubLLM:
+    """Sleeps `base + input tokens * per_token + records * per_record` seconds (times `scale`) per call."""
+
+    def __init__(self, base: float, per_1k_input: float, per_record: float, scale: float):
+        self.base, self.per_token, self.per_record, self.scale = base, per_1k_input / 1000, per_record, scale
+        self.calls = 0
+        self.input_tokens = 0
+        self.simulated_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def with_structured_output(self, schema):
+        def respond(messages):
+            prompt = "".join(message["content"] for message in messages)
+            if schema is CohortAlignmentRecords:
+                labels = re.findall(r"\[(P\d+)\]", messages[-1]["content"])
+                result = schema(profiles=[{"profile_id": label, "records": kind_records(messages)} for label in labels])
+                records = len(labels) * len(kind_records(messages))
+            elif schema is AlignmentRecords:
+                result, records = schema(records=kind_records(messages)), len(kind_records(messages))
+            else:
+                result, records = BillCost(cost_explanation="stub", alternatives=[]), 1
+            latency = self.base + estimate_tokens(prompt) * self.per_token + records * self.per_record
+            with self._lock:
+                self.calls += 1
+                self.input_tokens += estimate_tokens(prompt)
+                self.simulated_seconds += latency
+            time.sleep(latency * self.scale)
+            return result
+        return RunnableLambda(respond)
+
+
+def bill_state() -> dict:
+    findings = [{"title": f"Provision {i}", "explanation": "Directs funds to a named project. " * 8, "concern": "c",
+                 "severity": "medium", "why": "w"} for i in range(12)]
+    return {
+        "summaries": {"short": "H.R. 1 funds rural health and broadband. " * 40, "detailed": "Outline of every title. " * 400},
+        "pork_barrel_spending": [PorkRecords.model_validate({"records": findings})],
+        "trojan_horses": [TrojanHorseRecords.model_validate({"records": findings[:6]})],
+        "beneficiaries": [BeneficiaryRecords(records=[])],
+    }
+
+
+def profiles(count: int) -> dict:
+    return {
+        f"user{i}": f"Name: User {i}. Lives in county {i}, works as a {('farmer', 'nurse', 'teacher', 'engineer')[i % 4]}. "
+                    f"Interests: healthcare, rural broadband, taxes. Household of {2 + i % 4}. " * 3
+        for i in range(count)
+    }
+
+
+def run(label: str, stub: StubLLM, users: int, work) -> None:
+    start = time.perf_counter()
+    work()
+    wall = (time.perf_counter() - start) / stub.scale
+    print(f"{label:14s} {stub.calls:6d} calls {stub.input_tokens:10d} input tokens "
+          f"{stub.simulated_seconds:9.1f}s model time {wall:8.1f}s wall {users / wall * 3600:8.0f} users/hour")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--chunks", type=int, default=6)
+    parser.add_argument("--sizes", default="1,2,4,8", help="Cohort sizes K to compare")
+    parser.add_argument("--modes", default="two-call,combined", help="Alignment modes to compare")
+    parser.add_argument("--base", type=float, default=0.4, help="Fixed seconds per call")
+    parser.add_argument("--per-1k-input", type=float, default=0.05, help="Seconds per 1,000 input tokens")
+    parser.add_argument("--per-record", type=float, default=0.6, help="Seconds per output record")
+    parser.add_argument("--scale", type=float, default=0.02, help="Fraction of the simulated latency actually slept")
+    args = parser.parse_args()
+
+    state = bill_state()
+    users = profiles(args.users)
+    chunks = [Document(page_content="SEC. 1. Rural health. " * 2500, metadata={"content_hash": f"chunk{i}"})
+              for i in range(args.chunks)]
+    graph_module.get_bill_text = lambda state: "bill text"
+    graph_module.split_bill_text = lambda text, stage="extraction": chunks
+    print(f"{args.users} users, {args.chunks} chunks, concurrency {graph_module.MAX_LLM_CONCURRENCY}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def fresh(name: str) -> StubLLM:
+            stub = StubLLM(args.base, args.per_1k_input, args.per_record, args.scale)
+            graph_module.llm = stub
+            graph_module.section_result_cache = PersistentCache("section_results", path=os.path.join(tmp, f"{name}.sqlite"))
+            return stub
+
+        for mode in args.modes.split(","):
+            graph_module.COMBINED_ALIGNMENT = mode == "combined"
+            print(f"-- {mode}")
+            stub = fresh(f"{mode}_per_user")
+            run("per user", stub, len(users), lambda: [graph_module.user_alignment_agent({**state, "profile": profile}) for profile in users.values()])
+            for size in (int(value) for value in args.sizes.split(",")):
+                stub = fresh(f"{mode}_cohort{size}")
+                run(f"cohort K={size}", stub, len(users), lambda: graph_module.align_profiles(state, users, cohort_size=size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark merging per-chunk findings: record counts and downstream prompt tokens.
+
+Builds per-chunk investigation output where each provision is reported by
+several chunks in slightly different words (as happens with overlapping
+chunks and provisions that span chunk boundaries), merges it with
+`agent.findings.merge_findings`, and estimates the tokens the findings add
+to the correction and alignment prompts before and after:
+
+    python benchmarks/bench_finding_dedup.py --chunks 20 --provisions 40 --repeats 3
+"""
+
+import argparse
+import random
+import time
+
+from agent.findings import merge_findings
+from agent.tokens import estimate_tokens
+from agent.types import BeneficiaryRecords, PorkRecords, TrojanHorseRecords
+
+SYNONYMS = {"provides": "allocates", "funding": "money", "construction": "building", "new": "additional", "city": "municipality"}
+SEVERITIES = ("low", "medium", "high")
+
+
+def reword(text: str, rng: random.Random) -> str:
+    """Swap a few words for synonyms and drop one, like a second LLM pass would."""
+    words = [SYNONYMS.get(word, word) if rng.random() < 0.3 else word for word in text.split()]
+    if len(words) > 8:
+        del words[rng.randrange(len(words))]
+    return " ".join(words)
+
+
+PLACES = ("Springfield", "Riverton", "Lakewood", "Fairview", "Georgetown", "Madison", "Clinton", "Salem", "Franklin", "Greenville")
+PROJECTS = ("pedestrian bridge", "water treatment plant", "regional airport terminal", "museum wing", "rail spur",
+            "harbor dredging", "research park", "sports arena", "highway interchange", "broadband network",
+            "flood wall", "community college campus", "veterans clinic")
+RECIPIENTS = ("the city of", "a nonprofit based in", "the port authority of", "a university in", "a private developer in")
+
+
+def provision(i: int) -> tuple:
+    place, project = PLACES[i % len(PLACES)], PROJECTS[(i * 7) % len(PROJECTS)]
+    recipient = RECIPIENTS[(i * 3) % len(RECIPIENTS)]
+    title = f"{project.title()} in {place}"
+    explanation = (
+        f"Section {100 + i} provides ${(i + 1) * 750_000:,} to {recipient} {place} for the {project}; "
+        f"the award is made without competition and the funds remain available until expended"
+    )
+    return title, explanation
+
+
+def per_chunk_findings(chunks: int, provisions: int, repeats: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    pork = [[] for _ in range(chunks)]
+    trojans = [[] for _ in range(chunks)]
+    beneficiaries = [[] for _ in range(chunks)]
+    for i in range(provisions):
+        title, explanation = provision(i)
+        first = rng.randrange(chunks)
+        for r in range(repeats):
+            chunk = (first + r) % chunks
+            record = {
+                "title": title if r == 0 else reword(title, rng),
+                "explanation": explanation if r == 0 else reword(explanation, rng),
+                "concern": "Directs money to a single locality without competition.",
+                "severity": rng.choice(SEVERITIES),
+                "why": "Targets one district and bypasses competitive grants.",
+            }
+            (pork if i % 2 else trojans)[chunk].append(record)
+            beneficiaries[chunk].append({"name": title, "benefit": reword(explanation, rng), "severity": record["severity"]})
+    return {
+        "pork_barrel_spending": [PorkRecords.model_validate({"records": records}) for records in pork],
+        "trojan_horses": [TrojanHorseRecords.model_validate({"records": records}) for records in trojans],
+        "sleeper_provisions": [TrojanHorseRecords(records=[]) for _ in range(chunks)],
+        "beneficiaries": [BeneficiaryRecords.model_validate({"records": records}) for records in beneficiaries],
+    }
+
+
+def downstream_tokens(findings: dict, chunks: int) -> int:
+    """Tokens the findings contribute to later prompts.
+
+    correction_investigative_agent sends each finding type once for the
+    summary and again with every chunk; user_alignment_agent sends the
+    investigation block with every chunk for benefits and for drawbacks.
+    """
+    per_type = sum(estimate_tokens(str(value)) for value in findings.values()) * (1 + chunks)
+    investigation = {key: findings[key] for key in ("pork_barrel_spending", "trojan_horses", "beneficiaries")}
+    return per_type + estimate_tokens(str(investigation)) * 2 * chunks
+
+
+def count(findings: dict) -> int:
+    return sum(len(container.records) for containers in findings.values() for container in containers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--provisions", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=3, help="Chunks that report each provision")
+    args = parser.parse_args()
+
+    findings = per_chunk_findings(args.chunks, args.provisions, args.repeats)
+    types = {"pork_barrel_spending": PorkRecords, "trojan_horses": TrojanHorseRecords,
+             "sleeper_provisions": TrojanHorseRecords, "beneficiaries": BeneficiaryRecords}
+
+    start = time.perf_counter()
+    merged = {key: merge_findings(value, types[key]) for key, value in findings.items()}
+    elapsed = time.perf_counter() - start
+
+    before, after = downstream_tokens(findings, args.chunks), downstream_tokens(merged, args.chunks)
+    print(f"{args.provisions} provisions x {args.repeats} reports across {args.chunks} chunks")
+    print(f"  records          : {count(findings):6d} -> {count(merged):6d}  (expected {args.provisions * 2})")
+    print(f"  downstream tokens: {before:8d} -> {after:8d}  ({1 - after / before:.0%} fewer)")
+    print(f"  merge time       : {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
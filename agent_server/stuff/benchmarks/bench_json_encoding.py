@@ -0,0 +1,139 @@
+"""Benchmark encoding a large workflow result: legacy converter vs orjson single pass.
+
+Builds a synthetic omnibus-bill result (hundreds of amendments, many chunks of
+findings, react transcripts) and times the old path
+(`convert_to_json_serializable` + `jsonable_encoder` + `json.dumps`) against
+`agent.serialization.dumps`:
+
+    python benchmarks/bench_json_encoding.py --chunks 60 --amendments 400
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agent.serialization import dumps
+from agent.types import (
+    AlignmentRecord,
+    AlignmentRecords,
+    Alternative,
+    BeneficiaryRecord,
+    BeneficiaryRecords,
+    BillCost,
+    ChangeRecord,
+    ChangeRecords,
+    PorkRecord,
+    PorkRecords,
+    TrojanHorseRecord,
+    TrojanHorseRecords,
+)
+
+LEGACY_TYPES = (
+    ChangeRecord, PorkRecord, TrojanHorseRecord, BeneficiaryRecord,
+    AlignmentRecord, BillCost, Alternative,
+    ChangeRecords, PorkRecords, TrojanHorseRecords, BeneficiaryRecords,
+    AlignmentRecords
+)
+
+
+def convert_to_json_serializable(obj):
+    """The converter previously used by api_endpoint/main.py."""
+    if isinstance(obj, LEGACY_TYPES):
+        return convert_to_json_serializable(obj.model_dump())
+    elif isinstance(obj, dict):
+        return {k: convert_to_json_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_to_json_serializable(item) for item in obj]
+    elif hasattr(obj, 'model_dump'):
+        return convert_to_json_serializable(obj.model_dump())
+    elif hasattr(obj, '__dict__'):
+        return convert_to_json_serializable(obj.__dict__)
+    elif isinstance(obj, (str, int, float, bool, type(None))):
+        return obj
+    else:
+        return str(obj)
+
+
+def text(words: int, seed: int) -> str:
+    return " ".join(f"provision{(seed * 31 + i) % 997}" for i in range(words))
+
+
+def omnibus_result(chunks: int, amendments: int) -> dict:
+    def change(i):
+        return ChangeRecord(title=f"Change {i}", explanation=text(120, i), concern=text(40, i), severity="medium")
+
+    def pork(i):
+        return PorkRecord(title=f"Earmark {i}", explanation=text(80, i), concern=text(30, i), severity="high", why=text(30, i))
+
+    def trojan(i):
+        return TrojanHorseRecord(title=f"Rider {i}", explanation=text(80, i), concern=text(30, i), severity="low", why=text(30, i))
+
+    def alignment(i, kind):
+        return AlignmentRecord(benefit_or_harm=kind, effect_type="community", summary=text(20, i), explanation=text(80, i), severity="medium")
+
+    transcript = [HumanMessage(content="Representative Info: ...")]
+    for step in range(6):
+        transcript.append(AIMessage(content="", tool_calls=[{"name": "tavily_search", "args": {"query": f"q{step}"}, "id": f"call{step}"}]))
+        transcript.append(ToolMessage(content=text(400, step), tool_call_id=f"call{step}"))
+    transcript.append(AIMessage(content=text(350, 99)))
+
+    return {
+        "messages": [],
+        "profile": '{"name": "Jane Doe", "location": "Phoenix, Arizona"}',
+        "bill_metadata": {"bill": {"title": "Consolidated Appropriations Act", "number": "2882", "congress": 118}},
+        "bill_history": [{"number": str(i), "updateDate": "2024-03-01", "description": text(30, i)} for i in range(amendments)],
+        "bill_history_analysis": [
+            {"amendment": {"number": str(i)}, "analysis": ChangeRecords(records=[change(i), change(i + 1)])}
+            for i in range(amendments)
+        ],
+        "summaries": {
+            "levels": {f"prompt {i}": text(600, i) for i in range(3)},
+            "rep_profiles": {f"Rep. {i}": {"profile": text(350, i), "messages": transcript} for i in range(3)},
+        },
+        "pork_barrel_spending": [PorkRecords(records=[pork(c * 5 + i) for i in range(5)]) for c in range(chunks)],
+        "trojan_horses": [TrojanHorseRecords(records=[trojan(c * 3 + i) for i in range(3)]) for c in range(chunks)],
+        "sleeper_provisions": [TrojanHorseRecords(records=[trojan(c * 3 + i) for i in range(3)]) for c in range(chunks)],
+        "beneficiaries": [
+            BeneficiaryRecords(records=[BeneficiaryRecord(name=f"Entity {i}", benefit=text(40, i), severity="low") for i in range(6)])
+            for _ in range(chunks)
+        ],
+        "user_benefits": [AlignmentRecords(records=[alignment(c, "benefit") for _ in range(4)]) for c in range(chunks)],
+        "user_drawbacks": [AlignmentRecords(records=[alignment(c, "harm") for _ in range(4)]) for c in range(chunks)],
+        "cost_analysis": BillCost(cost_explanation=text(300, 1), alternatives=[Alternative(alternative="a", explanation=text(60, 2))]),
+    }
+
+
+def best_of(repeats: int, fn):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=60)
+    parser.add_argument("--amendments", type=int, default=400)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    result = omnibus_result(args.chunks, args.amendments)
+    response = {"status": "success", "result": result}
+
+    legacy_time, legacy = best_of(args.repeats, lambda: json.dumps(jsonable_encoder(
+        {"status": "success", "result": convert_to_json_serializable(result)})).encode())
+    fast_time, fast = best_of(args.repeats, lambda: dumps(response))
+    assert json.loads(fast)["result"]["pork_barrel_spending"] == json.loads(legacy)["result"]["pork_barrel_spending"]
+
+    print(f"omnibus result: {args.chunks} chunks, {args.amendments} amendments, {len(fast) / 1e6:.1f} MB of JSON")
+    print(f"  legacy convert + jsonable_encoder + json.dumps : {legacy_time * 1000:8.1f} ms")
+    print(f"  orjson single pass                             : {fast_time * 1000:8.1f} ms  ({legacy_time / fast_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark structured-output setup: schema tokens per call and runnable build time.
+
+For every finding schema, compares the tokens of the tool declaration sent
+with each structured call when the severity rubric is inside the schema
+(default) and when it is hoisted into the system prompt
+(`HOIST_SEVERITY_RUBRIC`). It also compares building the runnable with
+``llm.with_structured_output`` on every call against the `StructuredOutputs`
+registry:
+
+    GOOGLE_API_KEY=... python benchmarks/bench_structured_schemas.py --calls 200
+"""
+
+import argparse
+import json
+import time
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from agent.structured import (
+    STRUCTURED_SCHEMAS,
+    StructuredOutputs,
+    add_severity_rubric,
+    has_severity,
+    with_severity_reference,
+)
+from agent.tokens import estimate_tokens
+
+SYSTEM_PROMPT = {"role": "system", "content": ""}
+
+
+def tool_tokens(schema) -> int:
+    return estimate_tokens(json.dumps(convert_to_openai_tool(schema), ensure_ascii=False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="Structured calls to simulate for build time")
+    args = parser.parse_args()
+
+    rubric_tokens = estimate_tokens(add_severity_rubric([SYSTEM_PROMPT])[0]["content"])
+    print(f"{'schema':20s} {'in schema':>10s} {'hoisted':>8s} {'+prompt':>8s} {'saved/call':>11s}")
+    for schema in STRUCTURED_SCHEMAS:
+        if not has_severity(schema):
+            continue
+        inline, hoisted = tool_tokens(schema), tool_tokens(with_severity_reference(schema))
+        net = inline - (hoisted + rubric_tokens)  # Positive when hoisting saves tokens
+        print(f"{schema.__name__:20s} {inline:10d} {hoisted:8d} {rubric_tokens:8d} {net:+11d}")
+
+    llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+    schemas = [STRUCTURED_SCHEMAS[i % len(STRUCTURED_SCHEMAS)] for i in range(args.calls)]
+    start = time.perf_counter()
+    for schema in schemas:
+        llm.with_structured_output(schema)
+    per_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    registry = StructuredOutputs(llm).build()
+    for schema in schemas:
+        registry.get(schema)
+    prebuilt = time.perf_counter() - start
+    print(f"\nbuild time for {args.calls} calls: {per_call * 1000:.1f} ms per-call -> {prebuilt * 1000:.1f} ms prebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Section-level structure and diffs of bill text versions.
+
+Bills are split into sections (``SEC. 101. ...``), each identified by a hash
+of its whitespace-normalized content. Diffing two versions by those hashes is
+cheap and needs no LLM, and downstream stages key their per-chunk results by
+the section hashes so unchanged sections are never re-analyzed.
+"""
+
+import difflib
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+SECTION_HEADER_RE = re.compile(r"^[ \t]*SEC(?:TION)?\.[ \t]+(\d+[A-Za-z]*)\.?[ \t]*(.*)$", re.MULTILINE)
+SECTION_NUMBER_RE = re.compile(r"^\s*SEC(?:TION)?\.\s+\d+[A-Za-z]*\.?")
+# Omnibus bills restart section numbers in every division ("DIVISION A—AGRICULTURE")
+DIVISION_HEADER_RE = re.compile(r"^[ \t]*DIVISION[ \t]+([A-Z]{1,3})\b", re.MULTILINE)
+# XML elements rendered on their own line when flattening bill XML
+XML_BLOCK_TAGS = {"subsection", "paragraph", "subparagraph", "clause", "subclause", "item", "subitem", "text", "quoted-block", "toc-entry"}
+
+
+class BillSection(BaseModel):
+    """A single section of a bill version."""
+    number: str = Field(description="Section number, e.g. '101' ('0' for text before the first section)")
+    division: str = Field(default="", description="Division of an omnibus bill, e.g. 'A' ('' when there are none)")
+    header: str = Field(default="", description="Section heading")
+    text: str = Field(description="Plain text of the section, heading included")
+    content_hash: str = Field(description="sha256 of the whitespace-normalized text")
+
+    @property
+    def key(self) -> str:
+        """Division-qualified number, e.g. 'A/101'; the bare number in bills without divisions."""
+        return f"{self.division}/{self.number}" if self.division else self.number
+
+
+def section_label(number: str, division: str = "") -> str:
+    """How a section is named in reports, e.g. 'Division A SEC. 101'."""
+    return f"Division {division} SEC. {number}" if division else f"SEC. {number}"
+
+
+def hash_text(text: str) -> str:
+    """Hash text so reflowed whitespace doesn't count as a change."""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def make_section(number: str, header: str, text: str, division: str = "") -> BillSection:
+    """Build a section whose content hash ignores its own number."""
+    # Leave the section number out of the hash so renumbered sections still match
+    body = SECTION_NUMBER_RE.sub("", text, count=1)
+    return BillSection(number=number, division=division, header=header.strip(), text=text.strip(), content_hash=hash_text(body))
+
+
+def local_tag(elem: ET.Element) -> str:
+    """Tag name without its XML namespace."""
+    return elem.tag.rsplit("}", 1)[-1] if isinstance(elem.tag, str) else ""
+
+
+def render_xml_text(elem: ET.Element) -> str:
+    """Flatten an XML element to text, putting block-level elements on new lines."""
+    parts = []
+
+    def walk(node: ET.Element) -> None:
+        if local_tag(node) in XML_BLOCK_TAGS:
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            parts.append(" ")
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(elem)
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def parse_xml_sections(xml_text: str) -> List[BillSection]:
+    """Extract top-level <section> elements (not ones quoted inside amendments)."""
+    root = ET.fromstring(xml_text.encode("utf-8"))
+    sections = []
+
+    def walk(node: ET.Element, division: str) -> None:
+        for child in node:
+            if local_tag(child) == "section":
+                enum = next((c for c in child if local_tag(c) == "enum"), None)
+                header = next((c for c in child if local_tag(c) == "header"), None)
+                number = (enum.text or "").strip().rstrip(".") if enum is not None else str(len(sections) + 1)
+                header_text = "".join(header.itertext()) if header is not None else ""
+                body = render_xml_text(child)
+                sections.append(make_section(number, header_text, f"SEC. {body}", division))
+            elif local_tag(child) == "division":
+                enum = next((c for c in child if local_tag(c) == "enum"), None)
+                label = re.sub(r"^division\s+", "", (enum.text or "") if enum is not None else "", flags=re.IGNORECASE)
+                walk(child, label.strip().rstrip(".—-") or division)
+            else:
+                walk(child, division)
+
+    walk(root, "")
+    return sections
+
+
+def parse_text_sections(text: str) -> List[BillSection]:
+    """Split plain bill text on ``SEC. n.`` headings."""
+    matches = list(SECTION_HEADER_RE.finditer(text))
+    if not matches:
+        return [make_section("0", "", text)] if text.strip() else []
+
+    divisions = list(DIVISION_HEADER_RE.finditer(text))
+
+    def division_at(position: int) -> str:
+        return next((match.group(1) for match in reversed(divisions) if match.start() < position), "")
+
+    sections = []
+    preamble = text[:matches[0].start()]
+    if preamble.strip():
+        sections.append(make_section("0", "", preamble))
+    for match, next_match in zip(matches, matches[1:] + [None]):
+        end = next_match.start() if next_match else len(text)
+        sections.append(make_section(match.group(1), match.group(2), text[match.start():end], division_at(match.start())))
+    return sections
+
+
+def parse_sections(text: str) -> List[BillSection]:
+    """Parse a bill version (Formatted XML or plain text) into sections."""
+    if text.lstrip().startswith("<"):
+        try:
+            sections = parse_xml_sections(text)
+            if sections:
+                return sections
+        except ET.ParseError:
+            pass
+    return parse_text_sections(text)
+
+
+def diff_sections(old: List[BillSection], new: List[BillSection]) -> dict:
+    """Compare two versions section by section.
+
+    Sections are first matched by content hash (unchanged, possibly moved or
+    renumbered), then the rest by division-qualified section number
+    (modified). Whatever is left is added or removed. Repeated hashes or
+    numbers are paired in bill order.
+    """
+    old_by_hash: Dict[str, List[BillSection]] = defaultdict(list)
+    for section in old:
+        old_by_hash[section.content_hash].append(section)
+    unchanged, renumbered = [], []
+    remaining_new = []
+    for section in new:
+        candidates = old_by_hash.get(section.content_hash)
+        if candidates:
+            previous = candidates.pop(0)
+            unchanged.append(section.key)
+            if previous.key != section.key:
+                renumbered.append({"from": previous.number, "to": section.number, "division": section.division, "header": section.header})
+        else:
+            remaining_new.append(section)
+
+    unmatched = {id(section) for candidates in old_by_hash.values() for section in candidates}
+    remaining_old: Dict[str, List[BillSection]] = defaultdict(list)
+    for section in old:
+        if id(section) in unmatched:
+            remaining_old[section.key].append(section)
+    modified, added = [], []
+    for section in remaining_new:
+        candidates = remaining_old.get(section.key)
+        if not candidates:
+            added.append({"number": section.number, "division": section.division, "header": section.header})
+            continue
+        previous = candidates.pop(0)
+        similarity = difflib.SequenceMatcher(None, previous.text.split(), section.text.split(), autojunk=False).ratio()
+        modified.append({"number": section.number, "division": section.division, "header": section.header, "similarity": round(similarity, 3)})
+
+    removed = [{"number": s.number, "division": s.division, "header": s.header} for group in remaining_old.values() for s in group]
+    return {
+        "unchanged": len(unchanged),
+        "renumbered": renumbered,
+        "modified": modified,
+        "added": added,
+        "removed": removed,
+        "changed_hashes": sorted({s.content_hash for s in remaining_new}),
+    }
+
+
+def what_changed_report(diff: dict, old_label: str = "previous version", new_label: str = "current version") -> str:
+    """Render a diff as a short plain-text "what changed" report."""
+    lines = [
+        f"Changes from {old_label} to {new_label}: "
+        f"{len(diff['modified'])} modified, {len(diff['added'])} added, {len(diff['removed'])} removed, "
+        f"{diff['unchanged']} unchanged section(s)."
+    ]
+    for entry in diff["modified"]:
+        lines.append(f"- Modified {section_label(entry['number'], entry['division'])} {entry['header']} ({entry['similarity']:.0%} similar)")
+    for entry in diff["added"]:
+        lines.append(f"- Added {section_label(entry['number'], entry['division'])} {entry['header']}")
+    for entry in diff["removed"]:
+        lines.append(f"- Removed {section_label(entry['number'], entry['division'])} {entry['header']}")
+    for entry in diff["renumbered"]:
+        lines.append(f"- Renumbered {section_label(entry['from'], entry['division'])} to SEC. {entry['to']} {entry['header']}")
+    return "\n".join(lines)
+
+
+def compare_versions(old_text: str, new_text: str, old_label: Optional[str] = None, new_label: Optional[str] = None) -> dict:
+    """Diff two bill versions and attach the rendered report."""
+    diff = diff_sections(parse_sections(old_text), parse_sections(new_text))
+    diff["report"] = what_changed_report(diff, old_label or "previous version", new_label or "current version")
+    return diff
@@ -0,0 +1,140 @@
+"""Normalize congress.gov "Formatted XML" bill text into compact plain text.
+
+Tags, attributes, namespaces and the table of contents are dropped; sections
+keep their ``SEC. n. Header`` lines and titles, subsections and paragraphs
+keep their enumerators, one block per line. Every line records the byte
+offset of the XML element it came from, so a citation into the plain text
+can be mapped back to the original markup.
+"""
+
+import bisect
+import logging
+import xml.parsers.expat
+from typing import List, Tuple
+
+from pydantic import BaseModel, Field
+
+from agent.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Elements whose content never reaches a prompt
+SKIP_TAGS = {"metadata", "toc"}
+# Elements that start a new line
+BLOCK_TAGS = {
+    "section", "title", "subtitle", "division", "part", "subpart", "chapter", "subchapter",
+    "subsection", "paragraph", "subparagraph", "clause", "subclause", "item", "subitem",
+    "quoted-block", "congress", "session", "legis-num", "current-chamber", "action",
+    "legis-type", "official-title", "enacting-clause",
+}
+# Headed divisions of a bill, rendered like "TITLE I GENERAL PROVISIONS"
+DIVISION_TAGS = {"title", "subtitle", "division", "part", "subpart", "chapter", "subchapter"}
+
+
+class NormalizedBillText(BaseModel):
+    """Plain bill text plus the map back to the XML it came from."""
+    text: str
+    offsets: List[Tuple[int, int]] = Field(
+        default_factory=list, description="(text offset, XML byte offset) at the start of each line"
+    )
+    stats: dict = Field(default_factory=dict, description="Size of the XML and the plain text, in chars and tokens")
+
+
+def normalization_stats(xml_text: str, text: str) -> dict:
+    """Chars and tokens of the XML and of its plain text, and the share saved."""
+    xml_tokens, text_tokens = estimate_tokens(xml_text), estimate_tokens(text)
+    return {
+        "xml_chars": len(xml_text),
+        "text_chars": len(text),
+        "xml_tokens": xml_tokens,
+        "text_tokens": text_tokens,
+        "saved_tokens": xml_tokens - text_tokens,
+        "saved_ratio": round(1 - text_tokens / xml_tokens, 3) if xml_tokens else 0.0,
+    }
+
+
+def xml_to_text(xml_text: str) -> NormalizedBillText:
+    """Render bill XML as compact plain text with a line-level offset map."""
+    lines = []  # [xml byte offset, [text parts]]
+    stack = []
+    skip_depth = 0
+    quoted_depth = 0
+    parser = xml.parsers.expat.ParserCreate()
+
+    def new_line() -> None:
+        lines.append([parser.CurrentByteIndex, []])
+
+    def emit(text: str) -> None:
+        if not lines:
+            new_line()
+        lines[-1][1].append(text)
+
+    def start(name: str, attrs: dict) -> None:
+        nonlocal skip_depth, quoted_depth
+        tag = name.rsplit(":", 1)[-1]
+        if skip_depth or tag in SKIP_TAGS:
+            skip_depth += 1
+            return
+        parent = stack[-1] if stack else ""
+        stack.append(tag)
+        if tag == "quoted-block":
+            quoted_depth += 1
+        if tag in BLOCK_TAGS:
+            new_line()
+        if tag == "enum" and parent == "section":
+            # Quoted sections are marked so they are not taken for sections of this bill
+            emit('"SEC. ' if quoted_depth else "SEC. ")
+        elif tag == "enum" and parent in DIVISION_TAGS:
+            emit(f"{parent.upper()} ")
+
+    def end(name: str) -> None:
+        nonlocal skip_depth, quoted_depth
+        if skip_depth:
+            skip_depth -= 1
+            return
+        tag = stack.pop()
+        parent = stack[-1] if stack else ""
+        if tag == "quoted-block":
+            quoted_depth -= 1
+        if tag == "header" and (parent == "section" or parent in DIVISION_TAGS):
+            new_line()  # The body starts below the heading
+        elif tag == "header":
+            emit(".—")
+        elif tag == "enum" or tag == "text" or tag in BLOCK_TAGS:
+            emit(" ")  # Inline elements (quotes, short titles) keep their own spacing
+
+    def characters(data: str) -> None:
+        if not skip_depth:
+            emit(data)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = characters
+    parser.Parse(xml_text.encode("utf-8"), True)
+
+    text_lines, offsets, position = [], [], 0
+    for byte_offset, parts in lines:
+        line = " ".join("".join(parts).split())
+        if not line:
+            continue
+        offsets.append((position, byte_offset))
+        text_lines.append(line)
+        position += len(line) + 1
+    text = "\n".join(text_lines)
+    return NormalizedBillText(text=text, offsets=offsets, stats=normalization_stats(xml_text, text))
+
+
+def normalize_bill_text(raw_text: str) -> NormalizedBillText:
+    """Normalize bill XML; plain text (or XML that fails to parse) passes through unchanged."""
+    if raw_text.lstrip().startswith("<"):
+        try:
+            return xml_to_text(raw_text)
+        except xml.parsers.expat.ExpatError as e:
+            logger.warning(f"Bill XML could not be parsed, using it as-is: {e}")
+    return NormalizedBillText(text=raw_text, offsets=[(0, 0)], stats=normalization_stats(raw_text, raw_text))
+
+
+def xml_offset(offsets: List[Tuple[int, int]], text_offset: int) -> int:
+    """Byte offset in the XML of the element containing `text_offset` in the plain text."""
+    index = bisect.bisect_right(offsets, (text_offset, float("inf"))) - 1
+    return offsets[max(index, 0)][1] if offsets else 0
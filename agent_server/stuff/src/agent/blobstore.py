@@ -0,0 +1,83 @@
+"""Content-addressed blob store for bill text and other large artifacts.
+
+Graph state only carries the sha256 digest of each blob; nodes materialize the
+content lazily. Blobs are written uncompressed, one file per digest, so they
+can be memory-mapped instead of read into a fresh buffer on every access.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from typing import Any, Union
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(".data", "blobs"))
+
+
+class BlobStore:
+    """Store blobs on the local filesystem under their sha256 digest."""
+
+    def __init__(self, root: str = BLOB_STORE_DIR):
+        """Use `root` as the store directory."""
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        """Return the file path of a blob, sharded by the first two hex digits."""
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def exists(self, digest: str) -> bool:
+        """Tell whether a blob with this digest is stored."""
+        return bool(digest) and os.path.exists(self.path(digest))
+
+    def put(self, data: Union[bytes, str]) -> str:
+        """Write a blob (if not already present) and return its digest."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def put_json(self, obj: Any) -> str:
+        """Serialize an object canonically and store it."""
+        return self.put(json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str))
+
+    def get_bytes(self, digest: str) -> bytes:
+        """Read a blob through a read-only memory map."""
+        with open(self.path(digest), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""  # mmap rejects empty files
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:]
+
+    def get_text(self, digest: str) -> str:
+        """Read a blob as UTF-8 text."""
+        return self.get_bytes(digest).decode("utf-8")
+
+    def get_json(self, digest: str) -> Any:
+        """Read a blob stored with `put_json`."""
+        return json.loads(self.get_bytes(digest))
+
+
+blob_store = BlobStore()
+
+
+def load_text(digest: str) -> str:
+    """Materialize a text blob; repeat reads come from the OS page cache, not a Python-side copy."""
+    if not digest:
+        return ""
+    return blob_store.get_text(digest)
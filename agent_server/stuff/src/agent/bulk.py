@@ -0,0 +1,229 @@
+"""Bulk bill analysis from the command line.
+
+Runs the bill-level pipeline (see `graph.analyze_bill`) over a list or range
+of bills, or every bill in a congress, on a worker pool:
+
+    python -m agent.bulk --congress 119 hr3852 s1001 hr10-20
+    python -m agent.bulk --congress 119 --all --type hr --workers 4 --output results.jsonl
+
+Each finished bill is appended to a progress file, so an interrupted run
+picks up where it left off when started again with the same arguments.
+Results go to the report store (default) or to a JSONL file.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from agent.congress_api import fetch_all
+from agent.routing import stage_metrics, track_usage
+from agent.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+BULK_WORKERS = 4  # Bills analyzed at once; each bill also fans out its own LLM calls
+BULK_PROGRESS_DIR = os.path.join(".data", "bulk")
+
+BILL_SPEC_RE = re.compile(r"^([a-z]+)(\d+)(?:-(\d+))?$")
+
+Bill = Tuple[str, str]  # (bill type, bill number)
+
+
+def parse_bill_specs(specs: Iterable[str]) -> List[Bill]:
+    """Expand specs like ``hr3852`` or ``hr10-20`` into (type, number) pairs."""
+    bills = []
+    for spec in specs:
+        match = BILL_SPEC_RE.match(spec.strip().lower())
+        if not match:
+            raise ValueError(f"Invalid bill spec: {spec!r} (expected e.g. hr3852 or hr10-20)")
+        bill_type, start, end = match.group(1), int(match.group(2)), int(match.group(3) or match.group(2))
+        if end < start:
+            raise ValueError(f"Invalid bill range: {spec!r}")
+        bills.extend((bill_type, str(number)) for number in range(start, end + 1))
+    return list(dict.fromkeys(bills))
+
+
+def fetch_congress_bills(congress: str, bill_type: Optional[str] = None) -> List[Bill]:
+    """List every bill in a congress (optionally of one type) from congress.gov."""
+    path = f"/bill/{congress}/{bill_type}" if bill_type else f"/bill/{congress}"
+    return [(str(bill["type"]).lower(), str(bill["number"])) for bill in fetch_all(path, "bills")]
+
+
+def bill_label(bill: Bill) -> str:
+    """Short label of a bill, e.g. 'hr3852'."""
+    return f"{bill[0]}{bill[1]}"
+
+
+class ProgressLog:
+    """Append-only JSONL record of finished bills, used to resume a run."""
+
+    def __init__(self, path: str):
+        """Use the JSONL file at `path`, created on first append."""
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """Return the last recorded entry per bill."""
+        entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry["bill"]] = entry
+        return entries
+
+    def append(self, entry: dict) -> None:
+        """Record one finished bill."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+class ReportStoreWriter:
+    """Save each bill's result in the report store under ``bulk:<congress>:<bill>``."""
+
+    def __init__(self, congress: str):
+        """Write to the shared report store for `congress`."""
+        from agent.report_store import report_store
+
+        self.congress = congress
+        self.store = report_store
+
+    def write(self, bill: Bill, result: dict) -> None:
+        """Save the full result as a report."""
+        self.store.save(
+            f"bulk:{self.congress}:{bill_label(bill)}",
+            result,
+            congress=self.congress,
+            bill_type=bill[0],
+            bill_number=bill[1],
+            title=result.get("bill_metadata", {}).get("bill", {}).get("title"),
+        )
+
+
+class JSONLWriter:
+    """Append each bill's compact report as one JSON line."""
+
+    def __init__(self, path: str):
+        """Append to the JSONL file at `path`."""
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, bill: Bill, result: dict) -> None:
+        """Append the compact report of one bill."""
+        from agent.reports import compact_report
+
+        line = dumps({"bill": bill_label(bill), "result": compact_report(result)})
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line + b"\n")
+
+
+def run_bulk(
+    congress: str,
+    bills: List[Bill],
+    writer,
+    progress: ProgressLog,
+    workers: int = BULK_WORKERS,
+    retry_failed: bool = False,
+    analyze: Optional[Callable[[str, str, str], dict]] = None,
+) -> dict:
+    """Analyze `bills` on a worker pool, skipping ones the progress log has finished.
+
+    Returns throughput stats for the bills processed in this run.
+    """
+    if analyze is None:
+        from agent.graph import analyze_bill as analyze
+
+    done = progress.load()
+    skip = {label for label, entry in done.items() if entry["status"] == "ok" or not retry_failed}
+    pending = [bill for bill in bills if bill_label(bill) not in skip]
+    logger.info(f"Bulk: {len(bills)} bills, {len(bills) - len(pending)} already done, {len(pending)} to analyze")
+
+    def process(bill: Bill) -> dict:
+        started = time.time()
+        with track_usage() as usage:
+            try:
+                result = analyze(congress, bill[0], bill[1])
+                writer.write(bill, result)
+                status, error = "ok", None
+            except Exception as e:
+                status, error = "failed", str(e)
+        entry = {
+            "bill": bill_label(bill),
+            "status": status,
+            "tokens": usage.total_tokens,
+            "seconds": round(time.time() - started, 2),
+        }
+        if error:
+            entry["error"] = error
+        progress.append(entry)
+        logger.info(f"Bulk: {entry['bill']} {status} ({entry['seconds']}s, {entry['tokens']} tokens)")
+        return entry
+
+    started = time.time()
+    entries = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in as_completed([executor.submit(process, bill) for bill in pending]):
+            entries.append(future.result())
+    elapsed = time.time() - started
+
+    succeeded = [entry for entry in entries if entry["status"] == "ok"]
+    tokens = sum(entry["tokens"] for entry in entries)
+    return {
+        "bills": len(entries),
+        "succeeded": len(succeeded),
+        "failed": len(entries) - len(succeeded),
+        "skipped": len(bills) - len(pending),
+        "seconds": round(elapsed, 2),
+        "bills_per_hour": round(len(succeeded) / elapsed * 3600, 1) if elapsed > 0 else 0.0,
+        "tokens": tokens,
+        "tokens_per_bill": round(tokens / len(succeeded)) if succeeded else 0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a bulk analysis from the command line."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Run the bill-level analysis over many bills.")
+    parser.add_argument("bills", nargs="*", help="Bills or ranges, e.g. hr3852 s1001 hr10-20")
+    parser.add_argument("--congress", required=True, help="Congress number, e.g. 119")
+    parser.add_argument("--all", action="store_true", help="Analyze every bill in the congress")
+    parser.add_argument("--type", dest="bill_type", help="With --all, only bills of this type (hr, s, ...)")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS)
+    parser.add_argument("--output", default="reports", help="'reports' for the report store, or a .jsonl path")
+    parser.add_argument("--progress", help="Progress file (default: .data/bulk/<congress>.progress.jsonl)")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run bills that failed previously")
+    args = parser.parse_args(argv)
+
+    bills = parse_bill_specs(args.bills)
+    if args.all:
+        bills = list(dict.fromkeys(bills + fetch_congress_bills(args.congress, args.bill_type)))
+    if not bills:
+        parser.error("give bills to analyze or --all")
+
+    writer = ReportStoreWriter(args.congress) if args.output == "reports" else JSONLWriter(args.output)
+    progress = ProgressLog(args.progress or os.path.join(BULK_PROGRESS_DIR, f"{args.congress}.progress.jsonl"))
+    stats = run_bulk(args.congress, bills, writer, progress, workers=args.workers, retry_failed=args.retry_failed)
+
+    logger.info(
+        f"Bulk: {stats['succeeded']} ok, {stats['failed']} failed, {stats['skipped']} skipped in {stats['seconds']}s; "
+        f"{stats['bills_per_hour']} bills/hour, {stats['tokens_per_bill']} tokens/bill"
+    )
+    for row in stage_metrics.summary():
+        logger.info(
+            f"  {row['stage']:24s} {row['model']:24s} {row['calls']:6d} calls {row['seconds']:9.1f}s "
+            f"{row['input_tokens'] + row['output_tokens']:10d} tokens ${row['cost']:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Key/value caches with per-entry TTL.
+
+`PersistentCache` is backed by SQLite. Values are stored as JSON, so callers
+cache plain dicts (e.g. `model_dump()` output) and rebuild models on the way
+out. Entries live in namespaces so each service can share one database file
+without key collisions.
+
+`LRUCache` is an in-process, size-bounded cache for hot request results.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", os.path.join(".data", "cache.sqlite"))
+
+_MISSING = object()
+
+
+class PersistentCache:
+    """A namespaced JSON cache stored in SQLite."""
+
+    def __init__(self, namespace: str, ttl_seconds: Optional[float] = None, path: Optional[str] = None):
+        """Open `namespace` in the SQLite database at `path` (default CACHE_DB_PATH)."""
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.path = path or CACHE_DB_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value, or `default` if missing or expired."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return default
+        return json.loads(row[0])
+
+    def get_many(self, keys: Iterable[str]) -> dict:
+        """Return the live entries among `keys` as a dict."""
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, overriding the default TTL if given."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, default=str), expires_at),
+            )
+            conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Drop one entry."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+
+    def clear(self) -> None:
+        """Drop every entry in this namespace."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            conn.commit()
+
+
+
+class LRUCache:
+    """A thread-safe in-memory cache with least-recently-used eviction and TTL."""
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: Optional[float] = None):
+        """Keep at most `maxsize` entries, each for `ttl_seconds` (forever if None)."""
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a live entry and mark it recently used, or `default`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store an entry, evicting the least recently used ones over `maxsize`."""
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        """Tell whether a live entry exists for `key`."""
+        return self.get(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
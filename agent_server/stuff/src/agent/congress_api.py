@@ -0,0 +1,66 @@
+"""congress.gov API access, including concurrent pagination of list endpoints.
+
+List endpoints (amendments, actions, cosponsors, bill lists) return at most
+250 items per page with the total in ``pagination.count``. The first page is
+fetched on its own to learn the total; the remaining pages are then fetched
+concurrently with bounded parallelism and yielded as they arrive, so callers
+can start working before the last page is in.
+"""
+
+import os
+from concurrent.futures import as_completed
+from typing import Iterator, List, Optional, Tuple
+
+import requests
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+CONGRESS_API_URL = "https://api.congress.gov/v3"
+CONGRESS_API_KEY = os.getenv("CONGRESS_API_KEY", "gL8knMuwndZ6omgUPhecOBXcIPFgVrwnGjhV8XMK")
+PAGE_SIZE = 250  # congress.gov maximum
+MAX_PAGE_CONCURRENCY = 4  # Parallel page requests per list; keeps us well inside the rate limit
+
+
+def api_get(path: str, params: Optional[dict] = None) -> dict:
+    """GET a congress.gov path (e.g. "/bill/119/hr/1/amendments") as JSON."""
+    response = requests.get(
+        f"{CONGRESS_API_URL}{path}",
+        params={"format": "json", **(params or {}), "api_key": CONGRESS_API_KEY},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_pages(
+    path: str,
+    item_key: str,
+    params: Optional[dict] = None,
+    page_size: int = PAGE_SIZE,
+    max_concurrency: int = MAX_PAGE_CONCURRENCY,
+) -> Iterator[Tuple[int, List[dict]]]:
+    """Yield ``(offset, items)`` for every page of a list endpoint.
+
+    The first page comes first; the rest follow in completion order, so use
+    the offsets to restore API order. A failed page raises rather than
+    silently truncating the list.
+    """
+    first = api_get(path, {**(params or {}), "offset": 0, "limit": page_size})
+    items = first.get(item_key, [])
+    yield 0, items
+
+    count = first.get("pagination", {}).get("count", len(items))
+    offsets = range(page_size, count, page_size)
+    if not offsets:
+        return
+    with ContextThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {
+            executor.submit(api_get, path, {**(params or {}), "offset": offset, "limit": page_size}): offset
+            for offset in offsets
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result().get(item_key, [])
+
+
+def fetch_all(path: str, item_key: str, params: Optional[dict] = None, **kwargs) -> List[dict]:
+    """Every item of a list endpoint, in API order."""
+    pages = sorted(iter_pages(path, item_key, params, **kwargs), key=lambda page: page[0])
+    return [item for _, items in pages for item in items]
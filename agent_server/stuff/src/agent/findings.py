@@ -0,0 +1,124 @@
+"""Merge investigative findings across chunks.
+
+Each chunk yields its own ``*Records`` container, and a provision that spans
+a chunk boundary (or is simply mentioned twice) is reported more than once
+with slightly different wording. Findings are clustered locally, with no LLM
+call: records with the same normalized title, or whose explanation
+shingles have an estimated Jaccard similarity above a threshold (MinHash),
+are the same finding. Each cluster keeps its most severe record.
+"""
+
+import hashlib
+import re
+from typing import Iterable, List
+
+from pydantic import BaseModel
+
+from agent.reports import as_plain
+
+DEDUP_JACCARD_THRESHOLD = 0.7  # Estimated similarity at which two findings are the same
+MINHASH_PERMUTATIONS = 64
+SHINGLE_SIZE = 3  # Words per shingle
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2}
+TITLE_STOPWORDS = {"a", "an", "and", "the", "of", "for", "to", "in", "on", "by", "with", "sec", "section"}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+
+def words(text: str) -> List[str]:
+    """Lowercase word tokens; dollar signs are kept so amounts stay distinct."""
+    return re.findall(r"[a-z0-9$]+", text.lower())
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, drop punctuation and filler words: "Sec. 5: The Grants" -> "5 grants"."""
+    return " ".join(word for word in words(title) if word not in TITLE_STOPWORDS)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Set of `size`-word shingles of a text (the whole text when it is shorter)."""
+    tokens = words(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(features: Iterable[str]) -> List[int]:
+    """MinHash signature of a set of strings."""
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "big") for f in features]
+    if not hashes:
+        return [_MERSENNE_PRIME] * MINHASH_PERMUTATIONS
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimated_jaccard(left: List[int], right: List[int]) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+def finding_title(record: dict) -> str:
+    """Title of any finding type."""
+    return record.get("title") or record.get("name") or ""
+
+
+def finding_text(record: dict) -> str:
+    """Return the main description field of any finding type (titles are compared separately)."""
+    return record.get("explanation") or record.get("benefit") or record.get("summary") or finding_title(record)
+
+
+def cluster_findings(records: List[dict], threshold: float = DEDUP_JACCARD_THRESHOLD) -> List[List[int]]:
+    """Group indexes of near-duplicate records, preserving first-seen order."""
+    parent = list(range(len(records)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        parent[max(find(i), find(j))] = min(find(i), find(j))
+
+    by_title = {}
+    for i, record in enumerate(records):
+        title = normalize_title(finding_title(record))
+        if title in by_title:
+            union(i, by_title[title])
+        elif title:
+            by_title[title] = i
+
+    signatures = [minhash(shingles(finding_text(record))) for record in records]
+    for i in range(len(records)):
+        for j in range(i + 1, len(records)):
+            if find(i) != find(j) and estimated_jaccard(signatures[i], signatures[j]) >= threshold:
+                union(i, j)
+
+    clusters = {}
+    for i in range(len(records)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def merge_findings(containers: list, container_type: type[BaseModel], threshold: float = DEDUP_JACCARD_THRESHOLD) -> list:
+    """Flatten per-chunk containers into one, keeping the most severe record of each cluster.
+
+    Ties on severity go to the more detailed record. Returns a one-element
+    list so the ``state[field][0].records`` shape is unchanged.
+    """
+    records = [as_plain(record) for container in containers for record in as_plain(container).get("records", [])]
+    merged = []
+    for cluster in cluster_findings(records, threshold):
+        best = max(
+            (records[i] for i in cluster),
+            key=lambda record: (SEVERITY_RANK.get(record.get("severity"), 0), len(finding_text(record)))
+        )
+        merged.append(best)
+    return [container_type.model_validate({"records": merged})]
@@ -1,32 +1,63 @@
-from typing import Annotated, Callable, TypeVar, Generic
+from typing import Annotated, AsyncIterator, Callable, TypeVar, Generic
 from typing_extensions import TypedDict
 from pydantic import BaseModel, Field
 import requests
 import json
+import logging
 import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import create_react_agent
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from langchain.chat_models import init_chat_model
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
-from langchain_tavily import TavilySearch
 from dotenv import load_dotenv
 
-from agent.types import AlignmentRecords, BeneficiaryRecords, BillCost, ChangeRecords, PorkRecords, TrojanHorseRecords
+from agent.bill_diff import compare_versions, hash_text, parse_sections
+from agent.bill_text import normalize_bill_text
+from agent.blobstore import blob_store, load_text
+from agent.cache import LRUCache, PersistentCache
+from agent.congress_api import CONGRESS_API_KEY, CONGRESS_API_URL, fetch_all, iter_pages
+from agent.findings import merge_findings
+from agent.media_search import cached_search, dedupe_articles, trim_articles
+from agent.relevance import bill_relevance_index, relevant_sections
+from agent.rep_profiles import RepresentativeProfileService
+from agent.section_index import attach_rider_evidence, section_index
+from agent.routing import STAGE_MODEL_TIERS, model_name, needs_escalation, stage_metrics
+from agent.structured import StructuredOutputs, with_confidence
+from agent.tokens import chunk_token_budget, context_window, estimate_tokens
+
+from agent import types as agent_types
+from agent.types import (
+    AlignmentRecords,
+    BeneficiaryRecords,
+    BillCost,
+    ChangeRecords,
+    CohortAlignmentRecords,
+    PorkRecords,
+    TrojanHorseRecords,
+)
 from agent.prompts import (
     BILL_SUMMARY_PROMPTS,
-    REPRESENTATIVE_PROFILE_PROMPT,
+    SUMMARY_REDUCE_PROMPT,
     AMENDMENT_ANALYSIS_PROMPT,
     MEDIA_ANALYSIS_PROMPTS,
     PORK_BARREL_PROMPT,
     TROJAN_HORSE_PROMPT,
     SLEEPER_PROVISION_PROMPT,
     BENEFICIARY_ANALYSIS_PROMPT,
+    COHORT_ALIGNMENT_INSTRUCTIONS,
     USER_ALIGNMENT_PROMPTS
 )
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 
 '''
@@ -43,24 +74,79 @@ can manage order how you like
 '''
 
 USE_CLAUDE = False  # Set to False to use Gemini
+LLM_MODEL = "anthropic:claude-3-5-sonnet-latest" if USE_CLAUDE else "gemini-2.0-flash"
+CHEAP_LLM_MODEL = "anthropic:claude-3-5-haiku-latest" if USE_CLAUDE else "gemini-2.0-flash-lite"
+ENABLE_MODEL_CASCADE = os.getenv("ENABLE_MODEL_CASCADE", "0") == "1"  # Cheap model for extraction/validation, escalating to LLM_MODEL
 ENABLE_CHUNKING = True  # Set to False to process full text without chunking
 MAX_CORRECTION_ATTEMPTS = 3  # Maximum number of times alignment can be corrected
 ENABLE_INVESTIGATION_CORRECTION = True  # Enable/disable investigation correction workflow
 ENABLE_ALIGNMENT_CORRECTION = False #True  # Enable/disable alignment correction workflow
-
-def split_bill_text(text: str) -> list[Document]:
-    """Split bill text into chunks using LangChain's text splitter."""
+CHUNK_BOUNDARY_MODULUS = 4  # Content-defined chunk break after roughly 1 in N sections
+MAX_LLM_CONCURRENCY = 8  # Maximum concurrent LLM calls issued by a single node
+RESULT_CACHE_SIZE = 512  # Entries kept per request cache (scores, letters)
+RESULT_CACHE_TTL_SECONDS = 24 * 60 * 60
+SUMMARY_REDUCE_MAX_LEVELS = 5  # Safety stop for hierarchical reduction
+COHORT_SIZE = 4  # Profiles packed into one alignment call by align_profiles
+COMBINED_ALIGNMENT = False  # One call per chunk for benefits and drawbacks, split by benefit_or_harm
+ENABLE_RELEVANCE_FILTER = os.getenv("ENABLE_RELEVANCE_FILTER", "0") == "1"  # Align only profile-relevant sections, see agent.relevance
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", os.path.join(".data", "checkpoints.sqlite"))
+# Keys of the congress.gov bill record kept inline in state; the full JSON lives in the blob store
+BILL_METADATA_KEYS = ("congress", "number", "type", "title", "originChamber", "introducedDate", "updateDate", "latestAction", "policyArea")
+
+def split_bill_text(text: str, stage: str = "extraction") -> list[Document]:
+    """Split bill text into section-aligned chunks sized for `stage`.
+
+    The chunk size comes from `chunk_token_budget`: the context window of the
+    model `stage` is routed to (see `stage_llm`) and MAX_LLM_CONCURRENCY decide
+    it, not a fixed word count.
+    Chunks only break between sections, and besides the size limit a break is
+    placed after any section whose content hash hits CHUNK_BOUNDARY_MODULUS
+    (content-defined chunking). Editing, adding or removing a section therefore
+    only changes the chunk that contains it. Each chunk's `content_hash`
+    metadata is derived from its sections and keys cached per-chunk results.
+    """
     if not ENABLE_CHUNKING:
-        return [Document(page_content=text)]
+        return [Document(page_content=text, metadata={"content_hash": hash_text(text), "sections": []})]
     
-    # large chunk size for claude
+    max_tokens = chunk_token_budget(stage, estimate_tokens(text), context_window(model_name(stage_llm(stage))), MAX_LLM_CONCURRENCY)
+    # Only used for single sections longer than a whole chunk
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=50000, # Average words per chunk
-        chunk_overlap=200, # Words of overlap
-        length_function=lambda x: len(x.split()), # Count words instead of chars
+        chunk_size=max_tokens,
+        chunk_overlap=200, # Tokens of overlap
+        length_function=estimate_tokens,
         separators=["\n\n", "\n", " ", ""]
     )
-    return text_splitter.create_documents([text])
+    
+    chunks = []
+    current = []
+    current_tokens = 0
+    
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunk_key = "".join(f"{section.key}:{section.content_hash}" for section in current)
+            chunks.append(Document(
+                page_content="\n\n".join(section.text for section in current),
+                metadata={"content_hash": hash_text(chunk_key), "sections": [section.key for section in current]}
+            ))
+        current, current_tokens = [], 0
+    
+    for section in parse_sections(text):
+        tokens = estimate_tokens(section.text)
+        if tokens > max_tokens:
+            flush()
+            for piece in text_splitter.split_text(section.text):
+                chunks.append(Document(page_content=piece, metadata={"content_hash": hash_text(piece), "sections": [section.key]}))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+        current.append(section)
+        current_tokens += tokens
+        if current_tokens >= max_tokens // 4 and int(section.content_hash[:8], 16) % CHUNK_BOUNDARY_MODULUS == 0:
+            flush()
+    flush()
+    logger.info(f"Split {estimate_tokens(text)} tokens into {len(chunks)} {stage} chunk(s) of up to {max_tokens} tokens")
+    return chunks
 
 ### Helpers ###
 class BillHelper:
@@ -70,9 +156,7 @@ class BillHelper:
         self.bill_number = bill_number
 
     def bill_api_call(self, suffix="/text"):
-        api_key = "gL8knMuwndZ6omgUPhecOBXcIPFgVrwnGjhV8XMK"
-        base_url = "https://api.congress.gov/v3"
-        url = f"{base_url}/bill/{self.congress_num}/{self.bill_type}/{self.bill_number}{suffix}?api_key={api_key}"
+        url = f"{CONGRESS_API_URL}/bill/{self.congress_num}/{self.bill_type}/{self.bill_number}{suffix}?api_key={CONGRESS_API_KEY}"
 
         try:
             response = requests.get(url)
@@ -91,10 +175,10 @@ class BillHelper:
 
     # TODO idk if summaries important
 
-    def get_bill_versions(self):
+    def get_bill_text_versions(self, limit=None):
+        """Fetch the Formatted XML of the bill's text versions in API order (most recent first)."""
         res_text = self.bill_api_call("/text")
-        print(res_text)
-        bill_versions = res_text["textVersions"]
+        bill_versions = res_text["textVersions"][:limit]
 
         all_versions = []
         for version in bill_versions:
@@ -102,26 +186,40 @@ class BillHelper:
 
             text_res = requests.get(text_url["url"])
             text_res.raise_for_status()
-            all_versions.append(text_res.text)
-        
+            all_versions.append({
+                "type": version.get("type"),
+                "date": version.get("date"),
+                "text": text_res.text
+            })
+        return all_versions
+
+    def get_bill_versions(self):
         # TODO verify this is the most recent
-        return all_versions[0]
+        return self.get_bill_text_versions(limit=1)[0]["text"]
     
-    def get_bill_amendments(self):
-        res_text = self.bill_api_call("/amendments")
+    def bill_path(self, suffix=""):
+        """Return the congress.gov API path of this bill, plus `suffix`."""
+        return f"/bill/{self.congress_num}/{self.bill_type}/{self.bill_number}{suffix}"
 
-        return res_text["amendments"]
+    def iter_amendment_pages(self):
+        """Yield (offset, amendments) pages as they arrive; later pages are fetched concurrently."""
+        return iter_pages(self.bill_path("/amendments"), "amendments")
+
+    def get_bill_amendments(self):
+        """Return every amendment of the bill."""
+        return fetch_all(self.bill_path("/amendments"), "amendments")
 
 
 
 # Agent
 load_dotenv()
 
-if USE_CLAUDE:
-    llm = init_chat_model("anthropic:claude-3-5-sonnet-latest" if USE_CLAUDE else "gemini-2.0-flash")
-else:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
+def make_llm(model: str):
+    """Build the chat model for an "anthropic:"-prefixed Claude name or a Gemini name."""
+    if model.startswith("anthropic:"):
+        return init_chat_model(model)
+    return ChatGoogleGenerativeAI(
+        model=model,
         temperature=0,
         max_tokens=None,
         timeout=None,
@@ -129,6 +227,23 @@ else:
         # other params...
     )
 
+llm = make_llm(LLM_MODEL)
+# Runs the "cheap" stages of STAGE_MODEL_TIERS when the cascade is enabled
+cheap_llm = make_llm(CHEAP_LLM_MODEL) if ENABLE_MODEL_CASCADE else llm
+
+rep_profile_service = RepresentativeProfileService(llm)
+# Structured-output runnables are built once per model at startup instead of on every call
+structured_outputs = {id(model): StructuredOutputs(model).build() for model in (llm, cheap_llm)}
+# Per-chunk investigation/alignment results, keyed by the section hashes of the chunk
+section_result_cache = PersistentCache("section_results")
+# Repeat report page views send identical inputs to generate_score/generate_letter
+score_cache = LRUCache(maxsize=RESULT_CACHE_SIZE, ttl_seconds=RESULT_CACHE_TTL_SECONDS)
+letter_cache = LRUCache(maxsize=RESULT_CACHE_SIZE, ttl_seconds=RESULT_CACHE_TTL_SECONDS)
+# Bill summaries depend only on the bill text, so they are keyed by its hash
+summary_cache = PersistentCache("bill_summaries")
+# Amendment analyses only change when the amendment does, so they are keyed by update date and never expire
+amendment_cache = PersistentCache("amendment_analysis")
+
 
 class State(TypedDict):
     # Messages and user profile
@@ -151,13 +266,21 @@ class State(TypedDict):
     bill_number: str = 3852
     
     # Bill metadata and analysis
-    bill_metadata: dict
+    # Large artifacts are kept in the blob store; state only holds their sha256 digests
+    bill_metadata: dict  # Slim copy, see BILL_METADATA_KEYS
+    bill_metadata_hash: str
     bill_status: str
-    bill_text: str
-    bill_history: list
-    bill_history_analysis: list
+    bill_text_hash: str  # Plain text normalized from the XML; what every prompt sees
+    bill_xml_hash: str  # Original Formatted XML
+    bill_text_offsets_hash: str  # (text offset, XML byte offset) line map, see bill_text.xml_offset
+    text_normalization: dict  # XML vs plain text size and token savings
+    previous_bill_text_hash: str  # Prior text version, when there is one
+    version_changes: dict  # Section-level diff against the prior version, see bill_diff.compare_versions
+    bill_history_hash: str  # Raw amendment objects, in API order
+    bill_history_analysis_hash: str  # [{"amendment", "analysis"}] per amendment, see get_bill_history_analysis
     sponsors: list
     summaries: dict  # Will contain different levels of summaries
+    bill_purpose: str  # Plain-text short + paragraph summary, used by the trojan-horse checks
     
     # Analysis results
     media_analysis: list
@@ -186,222 +309,378 @@ class State(TypedDict):
 
 graph_builder = StateGraph(State)
 
+def bill_key(state: State) -> str:
+    """Key the state's bill as congress/type/number."""
+    return f"{state['congress_num']}/{str(state['bill_type']).lower()}/{state['bill_number']}"
+
+def bill_title(state: State) -> str:
+    """Return the bill's official title, which (unlike its generated summaries) rarely changes between text versions."""
+    return state.get("bill_metadata", {}).get("bill", {}).get("title", "")
+
+def get_bill_text(state: State) -> str:
+    """Materialize the bill text referenced by the state."""
+    return load_text(state.get("bill_text_hash", ""))
+
+def get_bill_history(state: State) -> list:
+    """Materialize the raw amendments referenced by the state."""
+    digest = state.get("bill_history_hash", "")
+    return blob_store.get_json(digest) if digest else []
+
+def get_bill_history_analysis(state: State) -> list:
+    """Materialize the amendment analyses referenced by the state, as `ChangeRecords`."""
+    digest = state.get("bill_history_analysis_hash", "")
+    return [
+        {**entry, "analysis": ChangeRecords.model_validate(entry["analysis"]) if entry["analysis"] is not None else None}
+        for entry in (blob_store.get_json(digest) if digest else [])
+    ]
+
+def slim_bill_metadata(metadata: dict) -> dict:
+    """Keep only the bill fields the nodes and the frontend read."""
+    bill = (metadata or {}).get("bill", {})
+    return {"bill": {key: bill[key] for key in BILL_METADATA_KEYS if key in bill}}
+
+def structured(schema: type[BaseModel], model=None):
+    """Prebuilt structured-output runnable for `schema` on `model` (default `llm`)."""
+    model = model or llm
+    registry = structured_outputs.get(id(model))
+    if registry is None or registry.llm is not model:
+        registry = structured_outputs[id(model)] = StructuredOutputs(model)
+    return registry.get(schema)
+
+def stage_llm(stage: str):
+    """Return the chat model that runs `stage` (see STAGE_MODEL_TIERS)."""
+    if ENABLE_MODEL_CASCADE and STAGE_MODEL_TIERS.get(stage) == "cheap":
+        return cheap_llm
+    return llm
+
+def run_structured(stage: str, schema: type[BaseModel], prompts: list) -> list:
+    """Structured calls for `stage`, run concurrently.
+
+    On a cheap stage the cheap model also reports its confidence; answers that
+    failed to parse or validate, or are low-confidence, are re-run on `llm`.
+    """
+    model = stage_llm(stage)
+    config = {"max_concurrency": MAX_LLM_CONCURRENCY}
+    if model is llm:
+        return structured(schema).batch(prompts, config=config)
+    
+    responses = structured(with_confidence(schema), model).batch(prompts, config=config, return_exceptions=True)
+    escalate = [i for i, response in enumerate(responses) if needs_escalation(response)]
+    if escalate:
+        logger.info(f"[{stage}] escalating {len(escalate)}/{len(prompts)} call(s) to {model_name(llm)}")
+        for i, response in zip(escalate, structured(schema).batch([prompts[i] for i in escalate], config=config)):
+            responses[i] = response
+    return [
+        schema.model_validate(response.model_dump(exclude={"confidence"})) if isinstance(response, with_confidence(schema)) else response
+        for response in responses
+    ]
+
+def invoke_structured(stage: str, schema: type[BaseModel], messages: list):
+    """One structured call for `stage`, escalated to `llm` like `run_structured`."""
+    model = stage_llm(stage)
+    if model is llm:
+        return structured(schema).invoke(messages)
+    try:
+        response = structured(with_confidence(schema), model).invoke(messages)
+    except Exception as e:
+        response = e
+    if needs_escalation(response):
+        logger.info(f"[{stage}] escalating to {model_name(llm)}: {response!r:.200}")
+        return structured(schema).invoke(messages)
+    return schema.model_validate(response.model_dump(exclude={"confidence"}))
+
+def chunk_cache_key(stage: str, chunk: Document, context: str = "") -> str:
+    """Section cache key of a per-chunk result: stage, chunk content and a hash of the rest of the prompt."""
+    return f"{stage}:{chunk.metadata['content_hash']}:{hash_text(context)[:16]}"
+
+def run_cached_chunks(stage: str, schema: type[BaseModel], chunks: list[Document], build_messages: Callable, context: str = "", route: str = "extraction") -> list:
+    """Run a structured LLM call per chunk, reusing results of unchanged chunks.
+
+    Results are cached under the chunk's section-derived content hash plus a
+    hash of `context`, the other prompt inputs the result depends on, so when a
+    bill gets a new text version only chunks with changed or new sections reach
+    the LLM. `context` must stay the same across versions: bill-wide inputs that
+    are regenerated for every version (summaries, the generated purpose, findings
+    merged across chunks) are left out of it. Misses run concurrently on the
+    model that `route` is routed to.
+    """
+    keys = [chunk_cache_key(stage, chunk, context) for chunk in chunks]
+    results = section_result_cache.get_many(keys)
+    misses = [(key, chunk) for key, chunk in zip(keys, chunks) if key not in results]
+    
+    if misses:
+        responses = run_structured(route, schema, [build_messages(chunk) for _, chunk in misses])
+        for (key, _), response in zip(misses, responses):
+            if response is None:
+                continue  # Don't cache failed structured output
+            results[key] = response.model_dump()
+            section_result_cache.set(key, results[key])
+    
+    return [schema.model_validate(results[key]) for key in keys if key in results]
+
 def init_state_agent(state: State):
     """Initialize the state with bill metadata and user profile."""
     bill_helper = BillHelper(state["congress_num"], state["bill_type"], state["bill_number"])
     
     # Get initial bill metadata
     metadata = bill_helper.bill_api_call("/")
-    bill_text = bill_helper.get_bill_versions()
+    # The latest two versions are enough to report what changed since the last one
+    versions = bill_helper.get_bill_text_versions(limit=2)
+    bill_xml = versions[0]["text"]
+    # Prompts get compact plain text instead of markup
+    normalized = normalize_bill_text(bill_xml)
+    bill_text = normalized.text
+    previous_text = normalize_bill_text(versions[1]["text"]).text if len(versions) > 1 else ""
+    stats = normalized.stats
+    logger.info(f"Bill text: {stats['xml_tokens']} -> {stats['text_tokens']} tokens ({stats['saved_ratio']:.0%} saved by stripping XML)")
+    # Every fetched bill feeds the cross-bill rider index
+    section_index.add_bill(bill_key(state), parse_sections(bill_text))
+    version_changes = compare_versions(previous_text, bill_text, versions[1]["type"], versions[0]["type"]) if previous_text else {}
     sponsors = bill_helper.get_bill_sponsors()
-    amendments = bill_helper.get_bill_amendments()
     
     # Update state with initial data
     return {
         **state,
-        "bill_metadata": metadata,
-        "bill_text": bill_text,
-        "bill_history": amendments,
+        "bill_metadata": slim_bill_metadata(metadata),
+        "bill_metadata_hash": blob_store.put_json(metadata),
+        "bill_text_hash": blob_store.put(bill_text),
+        "bill_xml_hash": blob_store.put(bill_xml),
+        "bill_text_offsets_hash": blob_store.put_json(normalized.offsets),
+        "text_normalization": stats,
+        "previous_bill_text_hash": blob_store.put(previous_text) if previous_text else "",
+        "version_changes": version_changes,
         "sponsors": sponsors,
         "bill_status": metadata.get("status", {}).get("phase", "Unknown")
     }
 
+def summarize_chunks(chunks: list[Document]) -> list[str]:
+    """Map step: outline each chunk in parallel, reusing outlines of unchanged chunks."""
+    keys = [f"summary_map:{chunk.metadata['content_hash']}" for chunk in chunks]
+    outlines = section_result_cache.get_many(keys)
+    misses = [(key, chunk) for key, chunk in zip(keys, chunks) if key not in outlines]
+    if misses:
+        prompts = [
+            [
+                BILL_SUMMARY_PROMPTS[2],
+                {"role": "user", "content": f"Bill text section: {chunk.page_content}"}
+            ]
+            for _, chunk in misses
+        ]
+        with stage_metrics.measure("summary_map"):
+            responses = stage_llm("extraction").batch(prompts, config={"max_concurrency": MAX_LLM_CONCURRENCY})
+        for (key, _), response in zip(misses, responses):
+            outlines[key] = response.content
+            section_result_cache.set(key, response.content)
+    return [outlines[key] for key in keys]
+
+def group_by_size(parts: list[str], max_tokens: int) -> list[list[str]]:
+    """Pack consecutive parts into groups of at most `max_tokens` (a larger part gets its own group)."""
+    groups, current, size = [], [], 0
+    for part in parts:
+        tokens = estimate_tokens(part)
+        if current and size + tokens > max_tokens:
+            groups.append(current)
+            current, size = [], 0
+        current.append(part)
+        size += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def summary_reduce_budget() -> int:
+    """Largest input, in tokens, to one reduce call, sized for the model the summary stage is routed to."""
+    return chunk_token_budget("summary_reduce", 0, context_window(model_name(stage_llm("summary"))), MAX_LLM_CONCURRENCY)
+
+def reduce_outlines(outlines: list[str]) -> str:
+    """Reduce step: merge outlines group by group, level by level, until they fit one prompt."""
+    parts = [outline for outline in outlines if outline.strip()]
+    max_tokens = summary_reduce_budget()
+    for _ in range(SUMMARY_REDUCE_MAX_LEVELS):
+        if sum(estimate_tokens(part) for part in parts) <= max_tokens:
+            break
+        groups = group_by_size(parts, max_tokens)
+        prompts = [
+            [
+                SUMMARY_REDUCE_PROMPT,
+                {"role": "user", "content": "\n\n".join(f"Part {i + 1}:\n{part}" for i, part in enumerate(group))}
+            ]
+            for group in groups
+        ]
+        with stage_metrics.measure("summary_reduce"):
+            responses = stage_llm("summary").batch(prompts, config={"max_concurrency": MAX_LLM_CONCURRENCY})
+        parts = [response.content for response in responses]
+    return "\n\n".join(parts)
+
+def summarize_bill_text(bill_text: str) -> dict:
+    """Summarize the whole bill by map-reduce, keyed by prompt.
+
+    Chunks are outlined in parallel (the detailed level), the outlines are
+    reduced hierarchically to one condensed outline, and the short and
+    paragraph summaries are written from that, so no part of the bill is
+    cut off and the full text is never sent in one prompt.
+    """
+    outlines = summarize_chunks(split_bill_text(bill_text, "summary"))
+    condensed = reduce_outlines(outlines)
+    
+    summaries = {}
+    with stage_metrics.measure("summary"):
+        responses = stage_llm("summary").batch([
+            [
+                prompt,
+                {"role": "user", "content": f"Bill outline: {condensed}"}
+            ]
+            for prompt in BILL_SUMMARY_PROMPTS[:2]
+        ])
+    for prompt, response in zip(BILL_SUMMARY_PROMPTS[:2], responses):
+        summaries[prompt["content"]] = response.content
+    summaries[BILL_SUMMARY_PROMPTS[2]["content"]] = "\n\n".join(outlines)
+    return summaries
+
+def bill_purpose(summaries: dict) -> str:
+    """Return the bill's stated purpose: the short and paragraph summaries without markup."""
+    text = " ".join(summaries.get(prompt["content"], "") for prompt in BILL_SUMMARY_PROMPTS[:2])
+    return re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", text)).strip()
+
 def summarizer_agent(state: State):
     """Generate multi-level summaries of the bill and analyze representatives."""
     
-    bill_text = state["bill_text"]
+    bill_text = get_bill_text(state)
     sponsors = state["sponsors"]
 
     print("SPONSORS")
     print(json.dumps(sponsors, indent=4))
 
-    # Split text for detailed analysis
-    text_chunks = split_bill_text(bill_text)
-    
-    summaries = {}
-    # First two prompts use beginning of text
-    for prompt in BILL_SUMMARY_PROMPTS[:2]:
-        response = llm.invoke([
-            prompt,
-            {"role": "user", "content": f"Bill text: {bill_text[:10000]}"}
-        ])
-        summaries[prompt["content"]] = response.content
-    
-    # Detailed section analysis uses chunks
-    section_analyses = []
-    for chunk in text_chunks:
-        response = llm.invoke([
-            BILL_SUMMARY_PROMPTS[2],
-            {"role": "user", "content": f"Bill text section: {chunk.page_content}"}
-        ])
-        section_analyses.append(response.content)
-    summaries[BILL_SUMMARY_PROMPTS[2]["content"]] = "\n\n".join(section_analyses)
+    cache_key = f"mapreduce:{state['bill_text_hash']}"
+    summaries = summary_cache.get(cache_key)
+    if summaries is None:
+        summaries = summarize_bill_text(bill_text)
+        summary_cache.set(cache_key, summaries)
     
-    # Generate profiles for representatives
-    rep_profiles = {}
-    
-    # Initialize Tavily Search Tool
-    tavily_search_tool = TavilySearch(
-        max_results=5,
-        topic="general",
-    )
-    
-    search_agent = create_react_agent(
-        llm,
-        tools=[tavily_search_tool],
-        prompt=REPRESENTATIVE_PROFILE_PROMPT
-    )
-
-    for sponsor in sponsors:
-        inputs = {
-            "messages": [
-                {
-                    "role": "user", 
-                    "content": f"Representative Info: {sponsor}"
-                }
-            ]
-        }
-        response = search_agent.invoke(inputs)
-        rep_profiles[sponsor['fullName']] = response
+    # Generate profiles for representatives (cached per bioguideId, misses run concurrently)
+    rep_profiles = rep_profile_service.get_profiles(sponsors)
     
     return {
         **state,
         "summaries": {
             "levels": summaries,
             "rep_profiles": rep_profiles
-        }
+        },
+        "bill_purpose": bill_purpose(summaries)
     }
 
+def amendment_cache_key(amendment: dict) -> str:
+    """Key an amendment analysis by amendment identity plus its last update date."""
+    return f"{amendment.get('congress')}/{amendment.get('type')}/{amendment.get('number')}@{amendment.get('updateDate')}"
+
 def bill_history_checker_agent(state: State):
-    """Analyze bill history and changes over time."""
-    
-    bill_history = state["bill_history"]
-    current_text = state["bill_text"]
+    """Fetch and analyze the bill's amendments.
 
-    llm_struc = llm.with_structured_output(ChangeRecords)
+    Amendment pages are streamed from congress.gov, and each amendment that is
+    new or updated since its last analysis is sent to the LLM as soon as its
+    page arrives; everything else comes from the amendment cache.
+    """
     
-    # Analyze each amendment and version
-    history_analysis = []
-    for amendment in bill_history:
-        response = llm_struc.invoke([
+    bill_helper = BillHelper(state["congress_num"], state["bill_type"], state["bill_number"])
+    
+    def analyze(amendment: dict):
+        return invoke_structured("extraction", ChangeRecords, [
             AMENDMENT_ANALYSIS_PROMPT,
             {"role": "user", "content": f"Amendment details: {amendment}"}
         ])
-        history_analysis.append({
-            "amendment": amendment,
-            "analysis": response  # Remove .content since response is already the structured output
-        })
     
-    return {
-        "bill_history_analysis": history_analysis
-    }
-
-def search_news_api(query: str) -> list:
-    """Search NewsAPI for articles."""
-    NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-    if not NEWS_API_KEY:
-        return []
-    
-    url = "https://newsapi.org/v2/everything"
-    params = {
-        "q": query,
-        "sortBy": "relevancy",
-        "language": "en",
-        "apiKey": NEWS_API_KEY
-    }
+    amendments = {}  # API position -> amendment
+    analyses = {}
+    futures = {}
+    with stage_metrics.measure("amendments"), ContextThreadPoolExecutor(max_workers=MAX_LLM_CONCURRENCY) as executor:
+        for offset, page in bill_helper.iter_amendment_pages():
+            keys = [amendment_cache_key(amendment) for amendment in page]
+            analyses.update(amendment_cache.get_many(keys))
+            for position, (key, amendment) in enumerate(zip(keys, page), start=offset):
+                amendments[position] = amendment
+                if key not in analyses and key not in futures:
+                    futures[key] = executor.submit(analyze, amendment)
+        logger.info(f"Amendments: {len(amendments)} total, {len(futures)} to analyze")
+        
+        for key, future in futures.items():
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.warning(f"Amendment analysis failed for {key}: {e}")
+                continue
+            if response is None:
+                continue  # Don't cache failed structured output
+            analyses[key] = response.model_dump()
+            amendment_cache.set(key, analyses[key])
+    
+    bill_history = [amendments[position] for position in sorted(amendments)]
     
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json().get("articles", [])
-    except Exception as e:
-        print(f"NewsAPI error: {e}")
-        return []
-
-def search_tavily(query: str) -> list:
-    """Search using Tavily's AI-optimized search engine."""
-    TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-    if not TAVILY_API_KEY:
-        return []
+    # Analyze each amendment and version
+    history_analysis = [
+        {"amendment": amendment, "analysis": analyses.get(amendment_cache_key(amendment))}
+        for amendment in bill_history
+    ]
     
-    try:
-        tavily = TavilySearch(max_results=5, 
-                            include_raw_content=True,
-                            search_depth="advanced")
-        results = tavily.invoke({"query": query})
-        return results.get("results", [])
-    except Exception as e:
-        print(f"Tavily search error: {e}")
-        return []
+    # Both grow with the amendment count, so checkpoints only carry their digests
+    return {
+        "bill_history_hash": blob_store.put_json(bill_history),
+        "bill_history_analysis_hash": blob_store.put_json(history_analysis)
+    }
 
 # TODO URGENT verify THIS part is working because seems a little suspicious
 # TODO refine media_search_agent with other featuers like refined prompts react_agent etc
 def media_search_agent(state: State):
-    """Search and analyze media coverage and expert opinions."""
+    """Search and analyze media coverage and expert opinions.
+
+    All searches run concurrently through the per-query cache, articles are
+    deduplicated across sources, and content is trimmed to a token budget
+    before the four analyses are sent to the LLM as one batch.
+    """
     
     bill_metadata = state["bill_metadata"]
-    bill_number = bill_metadata.get("number")
-    congress = bill_metadata.get("congress")
-    bill_title = bill_metadata.get("title", "")
+    bill = bill_metadata.get("bill", bill_metadata)
+    bill_number = bill.get("number")
+    congress = bill.get("congress")
+    bill_title = bill.get("title", "")
     
     # Construct search queries
     base_query = f"Bill {bill_number} Congress {congress} {bill_title}"
+    expert_query = f"{base_query} analysis expert opinion think tank research institute"
+    watchdog_query = f"{base_query} watchdog oversight accountability GAO CBO analysis report"
     
-    media_analysis = []
+    # (source, search engine, query, analysis prompt, prompt label)
+    searches = [
+        ("major_news_outlets", "newsapi", base_query, "news_analysis", "Articles"),
+        ("tavily", "tavily", base_query, "search_analysis", "Search results"),
+        ("expert_opinions", "tavily", expert_query, "expert_analysis", "Expert analyses"),
+        ("watchdog_groups", "tavily", watchdog_query, "watchdog_analysis", "Watchdog reports"),
+    ]
     
-    # Search major news outlets via NewsAPI
-    news_articles = search_news_api(base_query)
-    if news_articles:
-        response = llm.invoke([
-            MEDIA_ANALYSIS_PROMPTS["news_analysis"],
-            {"role": "user", "content": f"Articles: {json.dumps(news_articles[:5])}"}
-        ])
-        media_analysis.append({
-            "source": "major_news_outlets",
-            "articles": news_articles,
-            "analysis": response  # Remove .content
-        })
-    
-    # Use Tavily for comprehensive search including news and analysis
-    tavily_results = search_tavily(base_query)
-    if tavily_results:
-        response = llm.invoke([
-            MEDIA_ANALYSIS_PROMPTS["search_analysis"],
-            {"role": "user", "content": f"Search results: {json.dumps(tavily_results)}"}
-        ])
-        media_analysis.append({
-            "source": "tavily",
-            "articles": tavily_results,
-            "analysis": response.content
-        })
-        
-    # Expert opinions search through Tavily
-    expert_query = f"{base_query} analysis expert opinion think tank research institute"
-    expert_results = search_tavily(expert_query)
-    if expert_results:
-        response = llm.invoke([
-            MEDIA_ANALYSIS_PROMPTS["expert_analysis"],
-            {"role": "user", "content": f"Expert analyses: {json.dumps(expert_results)}"}
+    with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+        result_groups = list(executor.map(lambda search: cached_search(search[1], search[2]), searches))
+    result_groups = dedupe_articles(result_groups)
+    
+    analyzed = []
+    prompts = []
+    for (source, _, _, prompt_key, label), articles in zip(searches, result_groups):
+        if not articles:
+            continue
+        articles = trim_articles(articles)
+        analyzed.append((source, articles))
+        prompts.append([
+            MEDIA_ANALYSIS_PROMPTS[prompt_key],
+            {"role": "user", "content": f"{label}: {json.dumps(articles)}"}
         ])
-        media_analysis.append({
-            "source": "expert_opinions",
-            "articles": expert_results,
-            "analysis": response.content
-        })
     
-    # Watchdog and oversight search through Tavily
-    watchdog_query = f"{base_query} watchdog oversight accountability GAO CBO analysis report"
-    watchdog_results = search_tavily(watchdog_query)
-    if watchdog_results:
-        response = llm.invoke([
-            MEDIA_ANALYSIS_PROMPTS["watchdog_analysis"],
-            {"role": "user", "content": f"Watchdog reports: {json.dumps(watchdog_results)}"}
-        ])
-        media_analysis.append({
-            "source": "watchdog_groups",
-            "articles": watchdog_results,
+    with stage_metrics.measure("media"):
+        responses = stage_llm("synthesis").batch(prompts, config={"max_concurrency": MAX_LLM_CONCURRENCY}) if prompts else []
+    media_analysis = [
+        {
+            "source": source,
+            "articles": articles,
             "analysis": response.content
-        })
+        }
+        for (source, articles), response in zip(analyzed, responses)
+    ]
     
     return {
         "media_analysis": media_analysis
@@ -417,70 +696,67 @@ def investigative_agent_subworkflow(state: State):
     
     def check_pork_barrel(chunks: list[Document]) -> list:
         """Identify potential pork-barrel spending and pork_barrel_spending."""
-        findings = []
-        llm_struc = llm.with_structured_output(PorkRecords)
-        for chunk in chunks:
-            response = llm_struc.invoke([
-                PORK_BARREL_PROMPT,
-                {"role": "user", "content": f"{chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
-            ])
-            findings.append(response)
-        return findings
+        return run_cached_chunks("pork_barrel", PorkRecords, chunks, lambda chunk: [
+            PORK_BARREL_PROMPT,
+            {"role": "user", "content": f"{chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
+        ], context=feedback_context)
 
     def identify_trojan_horses(chunks: list[Document], original_purpose: str) -> list:
         """Identify provisions unrelated to bill's original purpose."""
-        findings = []
-        llm_struc = llm.with_structured_output(TrojanHorseRecords)
-        for chunk in chunks:
-            response = llm_struc.invoke([
-                TROJAN_HORSE_PROMPT,
-                {"role": "user", "content": f"Original purpose: {original_purpose}\nBill text: {chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
-            ])
-            findings.append(response)
-        return findings
+        # Keyed on the title: the generated purpose is reworded for every text version
+        purpose_key = bill_title(state) or original_purpose
+        return run_cached_chunks("trojan_horses", TrojanHorseRecords, chunks, lambda chunk: [
+            TROJAN_HORSE_PROMPT,
+            {"role": "user", "content": f"Original purpose: {original_purpose}\nBill text: {chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
+        ], context=f"{purpose_key}{feedback_context}")
 
     def identify_sleeper_provisions(chunks: list[Document]) -> list:
         """Identify subtle but impactful provisions."""
-        findings = []
-        llm_struc = llm.with_structured_output(TrojanHorseRecords)
-        for chunk in chunks:
-            response = llm_struc.invoke([
-                SLEEPER_PROVISION_PROMPT,
-                {"role": "user", "content": f"{chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
-            ])
-            findings.append(response)
-        return findings
+        return run_cached_chunks("sleeper_provisions", TrojanHorseRecords, chunks, lambda chunk: [
+            SLEEPER_PROVISION_PROMPT,
+            {"role": "user", "content": f"{chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
+        ], context=feedback_context)
 
     def analyze_beneficiaries(chunks: list[Document]) -> dict:
         """Identify specific beneficiaries and their benefits."""
-        findings = []
-        llm_struc = llm.with_structured_output(BeneficiaryRecords)
-        for chunk in chunks:
-            response = llm_struc.invoke([
-                BENEFICIARY_ANALYSIS_PROMPT,
-                {"role": "user", "content": f"{chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
-            ])
-            findings.append(response)
-        return findings
+        return run_cached_chunks("beneficiaries", BeneficiaryRecords, chunks, lambda chunk: [
+            BENEFICIARY_ANALYSIS_PROMPT,
+            {"role": "user", "content": f"{chunk.page_content}{feedback_context}\nImportant: Only include details that are explicitly mentioned in the text with specific evidence."}
+        ], context=feedback_context)
 
     # Split bill text into chunks
-    bill_text = state["bill_text"]
+    bill_text = get_bill_text(state)
     text_chunks = split_bill_text(bill_text)
+    
+    # Sections copied from other bills are evidence for riders; verbatim boilerplate
+    # found across many bills is left out of the rider checks entirely
+    sections = parse_sections(bill_text)
+    copies = section_index.find_copies(sections, exclude_bill=bill_key(state))
+    boilerplate = section_index.boilerplate_hashes([section.content_hash for section in sections], exclude_bill=bill_key(state))
+    rider_chunks = text_chunks
+    if boilerplate:
+        logger.info(f"Skipping {len(boilerplate)} boilerplate section(s) in rider checks")
+        rider_chunks = split_bill_text("\n\n".join(section.text for section in sections if section.content_hash not in boilerplate))
 
-    # Get the bill's original purpose from all summaries
-    summaries = state.get("summaries", {}).get("levels", {})
-    original_purpose = "\n\n".join([summary for summary in summaries.values() if summary])
+    # The bill's purpose is computed once by the summarizer
+    original_purpose = state.get("bill_purpose", "")
     
     # Fallback to title if no summaries available
     if not original_purpose:
-        original_purpose = state["bill_metadata"].get("title", "")
-    
-    investigation_results = {
-        "pork_barrel_spending": check_pork_barrel(text_chunks),
-        "trojan_horses": identify_trojan_horses(text_chunks, original_purpose),
-        "sleeper_provisions": identify_sleeper_provisions(text_chunks),
-        "beneficiaries": analyze_beneficiaries(text_chunks)
-    }
+        original_purpose = state["bill_metadata"].get("bill", {}).get("title", "")
+    
+    # Per-chunk findings are merged so repeated provisions reach later prompts once
+    with stage_metrics.measure("investigation"):
+        investigation_results = {
+            "pork_barrel_spending": merge_findings(check_pork_barrel(text_chunks), PorkRecords),
+            "trojan_horses": attach_rider_evidence(
+                merge_findings(identify_trojan_horses(rider_chunks, original_purpose), TrojanHorseRecords), sections, copies
+            ),
+            "sleeper_provisions": attach_rider_evidence(
+                merge_findings(identify_sleeper_provisions(rider_chunks), TrojanHorseRecords), sections, copies
+            ),
+            "beneficiaries": merge_findings(analyze_beneficiaries(text_chunks), BeneficiaryRecords)
+        }
     
     return {
         **state,
@@ -488,17 +764,9 @@ def investigative_agent_subworkflow(state: State):
         "investigation_feedback": ""  # Clear any previous feedback
     }
 
-def user_alignment_agent(state: State):
-    """Analyze bill's impact on the user based on their profile."""
-    
-    user_profile = state["profile"]
-    bill_text = state["bill_text"]
-    
-    # Split text into chunks for processing
-    text_chunks = split_bill_text(bill_text)
-    
-    # Prepare base bill analysis without full text
-    base_bill_analysis = {
+def base_bill_analysis(state: State) -> dict:
+    """Bill-level analysis sent with every alignment prompt (everything but the text)."""
+    return {
         "summaries": state["summaries"],
         "media_analysis": state.get("media_analysis", []),
         "investigation": {
@@ -507,49 +775,89 @@ def user_alignment_agent(state: State):
             "beneficiaries": state["beneficiaries"],
         }
     }
-    
-    # If there's feedback from correction node, include it in the prompt
+
+def alignment_feedback(state: State) -> str:
+    """Feedback from the correction node, as a line for the alignment prompts."""
     correction_feedback = state.get("correction_feedback", "")
-    feedback_context = f"\nPrevious feedback: {correction_feedback}" if correction_feedback else ""
-    
-    llm_struc = llm.with_structured_output(AlignmentRecords)
-    
-    # Process each chunk for benefits and drawbacks
-    all_benefits = []
-    all_drawbacks = []
-    for chunk in text_chunks:
-        # Create chunk-specific analysis
-        chunk_analysis = {
-            **base_bill_analysis,
-            "text": chunk.page_content
-        }
-        
-        # Analyze benefits for this chunk
-        benefits_response = llm_struc.invoke([
-            USER_ALIGNMENT_PROMPTS["benefits_analysis"],
-            {"role": "user", "content": f"User profile: {user_profile}\nBill analysis: {chunk_analysis}{feedback_context}\nImportant: Only include benefits that are explicitly mentioned or can be directly inferred from this section of the bill text."}
-        ])
-        if benefits_response:
-            all_benefits.append(benefits_response)
-            
-        # Analyze drawbacks for this chunk
-        drawbacks_response = llm_struc.invoke([
-            USER_ALIGNMENT_PROMPTS["drawbacks_analysis"],
-            {"role": "user", "content": f"User profile: {user_profile}\nBill analysis: {chunk_analysis}{feedback_context}\nImportant: Only include drawbacks that are explicitly mentioned or can be directly inferred from this section of the bill text."}
+    return f"\nPrevious feedback: {correction_feedback}" if correction_feedback else ""
+
+def alignment_cache_context(profile: str, feedback: str, title: str) -> str:
+    """Section cache context of alignment chunks: profile, feedback and bill title.
+
+    The bill analysis sent with each chunk is left out. It is regenerated for
+    every text version, and what it says about an unchanged chunk comes from
+    that chunk's own (cached) investigation results.
+    """
+    return f"{profile}{feedback}{title}"
+
+def alignment_messages(kind: str, profiles: str, chunk: Document, analysis: dict, feedback: str, cohort: bool = False) -> list:
+    """Benefits, drawbacks or combined (`kind`) prompt for one chunk; `profiles` is one profile or a labeled cohort."""
+    system = USER_ALIGNMENT_PROMPTS[f"{kind}_analysis"]
+    if cohort:
+        system = {**system, "content": f"{system['content']}\n\n{COHORT_ALIGNMENT_INSTRUCTIONS}"}
+    chunk_analysis = {**analysis, "text": chunk.page_content}
+    return [
+        system,
+        {"role": "user", "content": f"User {'profiles' if cohort else 'profile'}: {profiles}\nBill analysis: {chunk_analysis}{feedback}\nImportant: Only include {'benefits and drawbacks' if kind == 'combined' else kind} that are explicitly mentioned or can be directly inferred from this section of the bill text."}
+    ]
+
+def alignment_text(state: State, bill_text: str, profiles: list) -> str:
+    """Bill text to align: with the relevance filter on, only the sections relevant to any of `profiles`."""
+    if not ENABLE_RELEVANCE_FILTER:
+        return bill_text
+    index = bill_relevance_index(bill_text, state.get("bill_text_hash") or None)
+    findings = [*state.get("pork_barrel_spending", []), *state.get("trojan_horses", []), *state.get("sleeper_provisions", [])]
+    sections = relevant_sections(index, profiles, findings)
+    if not sections:
+        return bill_text
+    logger.info(f"Relevance filter: aligning {len(sections)} of {len(index.sections)} sections")
+    return "\n\n".join(section.text for section in sections)
+
+def split_by_effect(containers: list) -> tuple[list, list]:
+    """Split combined per-chunk alignment records into (benefits, drawbacks) containers."""
+    def only(effect: str) -> list:
+        return [AlignmentRecords(records=[r for r in container.records if r.benefit_or_harm == effect]) for container in containers]
+    return only("benefit"), only("harm")
+
+def run_cost_analysis(bill_text: str, analysis: dict, feedback: str):
+    """Cost analysis of the whole bill; it does not depend on the user profile."""
+    full_analysis = {**analysis, "text": bill_text}
+    with stage_metrics.measure("cost_analysis"):
+        return invoke_structured("alignment", BillCost, [
+            USER_ALIGNMENT_PROMPTS["cost_analysis"],
+            {"role": "user", "content": f"Bill analysis: {full_analysis}{feedback}\nImportant: Only include cost analysis that is explicitly mentioned or can be directly inferred from the bill text."}
         ])
-        if drawbacks_response:
-            all_drawbacks.append(drawbacks_response)
+
+def user_alignment_agent(state: State):
+    """Analyze bill's impact on the user based on their profile."""
+    
+    user_profile = state["profile"]
+    bill_text = get_bill_text(state)
+    
+    # Split the (profile-relevant) text into chunks for processing
+    text_chunks = split_bill_text(alignment_text(state, bill_text, [user_profile]), "alignment")
+    
+    # Bill analysis without full text, and feedback from the correction node if any
+    analysis = base_bill_analysis(state)
+    feedback_context = alignment_feedback(state)
+    
+    # Process each chunk for benefits and drawbacks; unchanged chunks come from the section cache
+    alignment_context = alignment_cache_context(user_profile, feedback_context, bill_title(state))
+    with stage_metrics.measure("alignment"):
+        if COMBINED_ALIGNMENT:
+            all_benefits, all_drawbacks = split_by_effect(run_cached_chunks("combined", AlignmentRecords, text_chunks, lambda chunk: alignment_messages(
+                "combined", user_profile, chunk, analysis, feedback_context
+            ), context=alignment_context, route="alignment"))
+        else:
+            all_benefits = run_cached_chunks("benefits", AlignmentRecords, text_chunks, lambda chunk: alignment_messages(
+                "benefits", user_profile, chunk, analysis, feedback_context
+            ), context=alignment_context, route="alignment")
+            all_drawbacks = run_cached_chunks("drawbacks", AlignmentRecords, text_chunks, lambda chunk: alignment_messages(
+                "drawbacks", user_profile, chunk, analysis, feedback_context
+            ), context=alignment_context, route="alignment")
     
     # Analyze costs for the entire bill
-    llm_struc_cost = llm.with_structured_output(BillCost)
-    full_analysis = {
-        **base_bill_analysis,
-        "text": bill_text
-    }
-    cost_analysis_response = llm_struc_cost.invoke([
-        USER_ALIGNMENT_PROMPTS["cost_analysis"],
-        {"role": "user", "content": f"Bill analysis: {full_analysis}{feedback_context}\nImportant: Only include cost analysis that is explicitly mentioned or can be directly inferred from the bill text."}
-    ])
+    cost_analysis_response = run_cost_analysis(bill_text, analysis, feedback_context)
 
     return {
         **state,
@@ -559,13 +867,100 @@ def user_alignment_agent(state: State):
         "correction_feedback": ""  # Clear any previous feedback
     }
 
+def run_cohort_chunks(kind: str, chunks: list[Document], profiles: dict, analysis: dict, feedback: str, title: str, cohort_size: int) -> dict:
+    """Benefits, drawbacks or both (`kind`) of every chunk for every profile, `cohort_size` profiles per call.
+
+    Uses the same cache keys as `user_alignment_agent`. Pairs the model left out
+    of a cohort answer are re-run one profile at a time.
+    """
+    keys = {
+        (profile_id, index): chunk_cache_key(kind, chunk, alignment_cache_context(profile, feedback, title))
+        for profile_id, profile in profiles.items()
+        for index, chunk in enumerate(chunks)
+    }
+    results = section_result_cache.get_many(list(keys.values()))
+    
+    # Cohorts are formed per chunk from the profiles that still miss it
+    calls = []
+    for index in range(len(chunks)):
+        missing = [profile_id for profile_id in profiles if keys[(profile_id, index)] not in results]
+        calls.extend((index, missing[start:start + cohort_size]) for start in range(0, len(missing), cohort_size))
+    
+    def cohort_prompt(index: int, profile_ids: list) -> list:
+        labeled = "\n".join(f"[P{n + 1}] {profiles[profile_id]}" for n, profile_id in enumerate(profile_ids))
+        return alignment_messages(kind, labeled, chunks[index], analysis, feedback, cohort=True)
+    
+    retry = []
+    responses = run_structured("alignment", CohortAlignmentRecords, [cohort_prompt(index, ids) for index, ids in calls]) if calls else []
+    for (index, profile_ids), response in zip(calls, responses):
+        by_label = {entry.profile_id.strip("[] "): entry for entry in response.profiles} if response is not None else {}
+        for n, profile_id in enumerate(profile_ids):
+            entry = by_label.get(f"P{n + 1}")
+            if entry is None:
+                retry.append((index, profile_id))
+                continue
+            key = keys[(profile_id, index)]
+            results[key] = AlignmentRecords(records=entry.records).model_dump()
+            section_result_cache.set(key, results[key])
+    
+    if retry:
+        logger.info(f"Cohort alignment: {len(retry)} profile/chunk pair(s) missing from cohort answers, analyzing them one by one")
+        responses = run_structured("alignment", AlignmentRecords, [
+            alignment_messages(kind, profiles[profile_id], chunks[index], analysis, feedback) for index, profile_id in retry
+        ])
+        for (index, profile_id), response in zip(retry, responses):
+            if response is not None:
+                key = keys[(profile_id, index)]
+                results[key] = response.model_dump()
+                section_result_cache.set(key, results[key])
+    
+    return {
+        profile_id: [
+            AlignmentRecords.model_validate(results[keys[(profile_id, index)]])
+            for index in range(len(chunks)) if keys[(profile_id, index)] in results
+        ]
+        for profile_id in profiles
+    }
+
+def align_profiles(state: State, profiles: dict, cohort_size: int = COHORT_SIZE) -> dict:
+    """Align one analyzed bill with many user profiles (cohort mode).
+
+    `profiles` maps a user id to its profile text. Profiles are packed
+    `cohort_size` to a call, so each chunk and the shared bill analysis are
+    sent once per cohort rather than once per user. The profile-independent
+    cost analysis runs once. Returns ``{user id: {"user_benefits",
+    "user_drawbacks", "cost_analysis"}}`` in the shapes `user_alignment_agent`
+    puts in state. With the relevance filter on, the cohort shares the union
+    of its profiles' relevant sections.
+    """
+    bill_text = get_bill_text(state)
+    text_chunks = split_bill_text(alignment_text(state, bill_text, list(profiles.values())), "alignment")
+    analysis = base_bill_analysis(state)
+    feedback = alignment_feedback(state)
+    title = bill_title(state)
+    
+    with stage_metrics.measure("cohort_alignment"):
+        if COMBINED_ALIGNMENT:
+            combined = run_cohort_chunks("combined", text_chunks, profiles, analysis, feedback, title, cohort_size)
+            split = {profile_id: split_by_effect(containers) for profile_id, containers in combined.items()}
+            benefits = {profile_id: both[0] for profile_id, both in split.items()}
+            drawbacks = {profile_id: both[1] for profile_id, both in split.items()}
+        else:
+            benefits = run_cohort_chunks("benefits", text_chunks, profiles, analysis, feedback, title, cohort_size)
+            drawbacks = run_cohort_chunks("drawbacks", text_chunks, profiles, analysis, feedback, title, cohort_size)
+    cost_analysis = run_cost_analysis(bill_text, analysis, feedback)
+    return {
+        profile_id: {"user_benefits": benefits[profile_id], "user_drawbacks": drawbacks[profile_id], "cost_analysis": cost_analysis}
+        for profile_id in profiles
+    }
+
 def correction_alignment_agent(state: State):
     """Validates alignment results against the bill text to detect hallucinations.
     Only triggers revisions for significant issues and clear misinformation."""
     
     current_attempts = state.get("correction_attempts", 0) + 1
     
-    bill_text = state["bill_text"]
+    bill_text = get_bill_text(state)
     user_benefits = state["user_benefits"]
     user_drawbacks = state["user_drawbacks"]
     cost_analysis = state["cost_analysis"]
@@ -583,7 +978,7 @@ def correction_alignment_agent(state: State):
         Focus on identifying clear factual errors and significant misinformation."""
         all_findings = []
         
-        llm_response = llm.invoke([{
+        llm_response = stage_llm("synthesis").invoke([{
             "role": "system",
             "content": "Summarize the key factual claims and specific assertions."
         }, {
@@ -593,7 +988,7 @@ def correction_alignment_agent(state: State):
         claims_summary = llm_response.content
         
         for chunk in text_chunks:
-            llm_response = llm.invoke([{
+            llm_response = stage_llm("validation").invoke([{
                 "role": "system",
                 "content": """You are a fact-checking agent focused on identifying serious factual errors and clear misinformation.
                 Only flag issues that:
@@ -622,7 +1017,7 @@ Findings from all chunks:
 List ONLY clear factual errors and significant misinformation that definitively require revision.
 Ignore minor discrepancies, subjective interpretations, or reasonable extrapolations."""
             
-            final_response = llm.invoke([{
+            final_response = stage_llm("synthesis").invoke([{
                 "role": "system",
                 "content": "Focus only on major issues that clearly require revision. Ignore minor or subjective discrepancies."
             }, {
@@ -633,12 +1028,13 @@ Ignore minor discrepancies, subjective interpretations, or reasonable extrapolat
         return ""
     
     # Split text into chunks for processing
-    text_chunks = split_bill_text(bill_text)
+    text_chunks = split_bill_text(bill_text, "validation")
     
     # Validate each type of analysis
-    benefits_validation = validate_against_text(user_benefits, text_chunks)
-    drawbacks_validation = validate_against_text(user_drawbacks, text_chunks)
-    cost_validation = validate_against_text(cost_analysis, text_chunks)
+    with stage_metrics.measure("alignment_validation"):
+        benefits_validation = validate_against_text(user_benefits, text_chunks)
+        drawbacks_validation = validate_against_text(user_drawbacks, text_chunks)
+        cost_validation = validate_against_text(cost_analysis, text_chunks)
     
     # Combine all validation results
     all_validations = [
@@ -679,12 +1075,12 @@ def correction_investigative_agent(state: State):
     
     current_attempts = state.get("investigation_correction_attempts", 0) + 1
     
-    bill_text = state["bill_text"]
+    bill_text = get_bill_text(state)
     pork_barrel_spending = state["pork_barrel_spending"]
     trojan_horses = state["trojan_horses"]
     sleeper_provisions = state["sleeper_provisions"]
     beneficiaries = state["beneficiaries"]
-    original_purpose = state.get("summaries", {}).get("levels", {}).get("You are a legislative analyst. Summarize this bill in one sentence.", "")
+    original_purpose = state.get("bill_purpose", "")
     
     if current_attempts > MAX_CORRECTION_ATTEMPTS:
         return {
@@ -698,7 +1094,7 @@ def correction_investigative_agent(state: State):
         """Helper to validate correct usage of legislative terms and concepts in findings."""
         all_validations = []
         
-        llm_response = llm.invoke([{
+        llm_response = stage_llm("synthesis").invoke([{
             "role": "system",
             "content": f"Summarize the key legislative terms and concepts identified in these {finding_type} findings."
         }, {
@@ -744,7 +1140,7 @@ def correction_investigative_agent(state: State):
         }.get(finding_type, "")
         
         for chunk in text_chunks:
-            llm_response = llm.invoke([{
+            llm_response = stage_llm("validation").invoke([{
                 "role": "system",
                 "content": f"""You are a legislative analysis expert focusing on proper use of legislative terms and concepts.
                 
@@ -792,7 +1188,7 @@ List ONLY:
 
 Focus on proper use of legislative terminology and concepts."""
             
-            final_response = llm.invoke([{
+            final_response = stage_llm("synthesis").invoke([{
                 "role": "system",
                 "content": f"Focus only on major misuse of legislative terms and concepts. Ignore minor terminology issues."
             }, {
@@ -802,14 +1198,15 @@ Focus on proper use of legislative terminology and concepts."""
             return final_response.content
         return ""
     
-    text_chunks = split_bill_text(bill_text)
+    text_chunks = split_bill_text(bill_text, "validation")
     
-    validations = [
-        ("pork_barrel_spending", validate_findings(pork_barrel_spending, "pork_barrel_spending", text_chunks)),
-        ("trojan_horses", validate_findings(trojan_horses, "trojan_horses", text_chunks, original_purpose)),
-        ("sleeper_provisions", validate_findings(sleeper_provisions, "sleeper_provisions", text_chunks)),
-        ("beneficiaries", validate_findings(beneficiaries, "beneficiaries", text_chunks))
-    ]
+    with stage_metrics.measure("investigation_validation"):
+        validations = [
+            ("pork_barrel_spending", validate_findings(pork_barrel_spending, "pork_barrel_spending", text_chunks)),
+            ("trojan_horses", validate_findings(trojan_horses, "trojan_horses", text_chunks, original_purpose)),
+            ("sleeper_provisions", validate_findings(sleeper_provisions, "sleeper_provisions", text_chunks)),
+            ("beneficiaries", validate_findings(beneficiaries, "beneficiaries", text_chunks))
+        ]
     
     # Only consider significant term misuse
     significant_issues = any(
@@ -866,10 +1263,20 @@ class ScoreRecord(BaseModel):
     environment: ScoreItem
     personal: ScoreItem
 
-def generate_score(preferences: str, bill_context: str):
-    """Generate numeric scores (0-100) for key impact areas using structured output."""
-    
-    score_prompt = [{
+def normalize_request_text(text: str) -> str:
+    """Canonicalize a request field: sorted keys for JSON, collapsed whitespace otherwise."""
+    try:
+        return json.dumps(json.loads(text), sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return " ".join(text.split())
+
+def request_cache_key(kind: str, preferences: str, bill_context: str) -> str:
+    """Hash normalized inputs; doubles as the ETag of the cached result."""
+    return hash_text(json.dumps([kind, normalize_request_text(preferences), normalize_request_text(bill_context)]))
+
+def score_messages(preferences: str, bill_context: str) -> list:
+    """Build the scoring prompt."""
+    return [{
         "role": "system",
         "content": """You are an expert policy analyst.
         Based on the bill context and user preferences, generate numeric scores (0-100) for:
@@ -887,20 +1294,64 @@ def generate_score(preferences: str, bill_context: str):
         Bill Context: {bill_context}
         User Preferences: {preferences}"""
     }]
+
+def generate_score(preferences: str, bill_context: str):
+    """Generate numeric scores (0-100) for key impact areas using structured output."""
+    
+    cache_key = request_cache_key("score", preferences, bill_context)
+    cached = score_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    print("BEFORE TRY")
     # Use structured output
-    llm_struc = llm.with_structured_output(ScoreRecord)
+    llm_struc = structured(ScoreRecord)
     
-    response = llm_struc.invoke(score_prompt)
+    response = llm_struc.invoke(score_messages(preferences, bill_context))
 
     # Convert Pydantic model to dict
-    return response.model_dump()
+    scores = response.model_dump()
+    score_cache.set(cache_key, scores)
+    return scores
 
     
-def generate_letter(preferences: str, bill_context: str):
-    """Generate a professional letter to a representative incorporating user preferences and bill context."""
-    letter_prompt = [{
+async def agenerate_scores(preferences: str, bill_contexts: list[str], max_concurrency: int = MAX_LLM_CONCURRENCY) -> AsyncIterator[tuple[int, dict]]:
+    """Score many bills for one profile, yielding `(index, scores)` as each finishes.
+
+    Cached results are yielded first, identical contexts in the batch are
+    scored once, and the remaining calls run through `abatch_as_completed`
+    with at most `max_concurrency` requests in flight. A failed call yields
+    `{"error": message}` for its indices instead of aborting the batch.
+    """
+    pending = {}  # cache key -> indices waiting on it
+    for index, bill_context in enumerate(bill_contexts):
+        cache_key = request_cache_key("score", preferences, bill_context)
+        cached = score_cache.get(cache_key)
+        if cached is not None:
+            yield index, cached
+        else:
+            pending.setdefault(cache_key, []).append(index)
+    
+    if not pending:
+        return
+    keys = list(pending)
+    llm_struc = structured(ScoreRecord)
+    async for position, response in llm_struc.abatch_as_completed(
+        [score_messages(preferences, bill_contexts[pending[key][0]]) for key in keys],
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    ):
+        key = keys[position]
+        if isinstance(response, Exception) or response is None:
+            result = {"error": str(response) if response is not None else "No structured output returned"}
+        else:
+            result = response.model_dump()
+            score_cache.set(key, result)
+        for index in pending[key]:
+            yield index, result
+
+def letter_messages(preferences: str, bill_context: str) -> list:
+    """Build the letter-writing prompt."""
+    return [{
         "role": "system",
         "content": """You are an expert in drafting professional letters to government representatives.
         Generate a concise, formal letter that:
@@ -919,12 +1370,46 @@ def generate_letter(preferences: str, bill_context: str):
         
         User Preferences: {preferences}"""
     }]
+
+def generate_letter(preferences: str, bill_context: str):
+    """Generate a professional letter to a representative incorporating user preferences and bill context."""
+    cache_key = request_cache_key("letter", preferences, bill_context)
+    cached = letter_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    response = llm.invoke(letter_prompt)
+    response = llm.invoke(letter_messages(preferences, bill_context))
+    letter_cache.set(cache_key, response.content)
     return response.content
 
+def chunk_text(chunk) -> str:
+    """Text of a streamed message chunk, whether content is a string or content blocks."""
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in chunk.content)
+
+async def astream_letter(preferences: str, bill_context: str) -> AsyncIterator[str]:
+    """Stream the letter token by token; a cached letter is yielded in one piece.
+
+    The full letter is cached once the stream completes, so repeat requests
+    (streaming or not) are served from `letter_cache`.
+    """
+    cache_key = request_cache_key("letter", preferences, bill_context)
+    cached = letter_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    parts = []
+    async for chunk in llm.astream(letter_messages(preferences, bill_context)):
+        text = chunk_text(chunk)
+        if text:
+            parts.append(text)
+            yield text
+    letter_cache.set(cache_key, "".join(parts))
+
 # Set up the workflow graph
-graph = (
+graph_builder = (
     graph_builder
     .add_node("init", init_state_agent)
     .add_node("summarizer", summarizer_agent)
@@ -951,9 +1436,79 @@ graph = (
     )
     
     .set_entry_point("init")
-    .compile()
 )
 
+def analyze_bill(congress_num: str, bill_type: str, bill_number: str) -> dict:
+    """Run the bill-level, profile-independent stages and return the resulting state.
+
+    Covers init, summaries, history and investigation; the correction loop and
+    user alignment need a profile and are left to interactive runs.
+    """
+    state = {"messages": [], "congress_num": congress_num, "bill_type": bill_type, "bill_number": bill_number}
+    for stage in (init_state_agent, summarizer_agent, bill_history_checker_agent, investigative_agent_subworkflow):
+        state = {**state, **stage(state)}
+    return state
+
+# Plain graph for LangGraph server/studio, which injects its own persistence
+graph = graph_builder.compile()
+
+_durable_graph = None
+
+def checkpoint_serializer() -> JsonPlusSerializer:
+    """Checkpoint serializer that allow-lists the record models nodes put in state (agent.types)."""
+    record_types = [
+        value for value in vars(agent_types).values()
+        if isinstance(value, type) and issubclass(value, BaseModel) and value.__module__ == agent_types.__name__
+    ]
+    try:
+        return JsonPlusSerializer(allowed_msgpack_modules=record_types)
+    except TypeError:
+        return JsonPlusSerializer()  # Older langgraph-checkpoint releases have no allowlist and load any type
+
+def get_durable_graph():
+    """Return the graph compiled with the persistent SQLite checkpointer.
+
+    Every node's output is checkpointed under the run ID (thread_id), so a run
+    that fails midway can be resumed from its last completed node. Bill text,
+    XML, metadata, amendments and their analyses are blob references; media
+    results are stored inline in each checkpoint.
+    """
+    global _durable_graph
+    if _durable_graph is None:
+        os.makedirs(os.path.dirname(CHECKPOINT_DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(CHECKPOINT_DB_PATH, check_same_thread=False)
+        _durable_graph = graph_builder.compile(checkpointer=SqliteSaver(conn, serde=checkpoint_serializer()))
+    return _durable_graph
+
+def run_config(run_id: str) -> dict:
+    """Build the LangGraph config that keys checkpoints by run ID."""
+    return {"configurable": {"thread_id": run_id}}
+
+def run_workflow(initial_state: dict, run_id: str) -> dict:
+    """Run the analysis workflow with checkpointing under `run_id`."""
+    return get_durable_graph().invoke(initial_state, run_config(run_id))
+
+def get_run_status(run_id: str) -> dict:
+    """Report whether a run exists, has finished, and which nodes are pending."""
+    snapshot = get_durable_graph().get_state(run_config(run_id))
+    return {
+        "run_id": run_id,
+        "exists": bool(snapshot.values),
+        "completed": bool(snapshot.values) and not snapshot.next,
+        "next": list(snapshot.next),
+    }
+
+def resume_workflow(run_id: str) -> dict:
+    """Resume a failed or interrupted run from its last completed node."""
+    durable_graph = get_durable_graph()
+    snapshot = durable_graph.get_state(run_config(run_id))
+    if not snapshot.values:
+        raise KeyError(f"No checkpoint found for run {run_id}")
+    if not snapshot.next:
+        return snapshot.values  # Already finished
+    # Invoking with no input continues from the pending nodes of the last checkpoint
+    return durable_graph.invoke(None, run_config(run_id))
+
 # Example usage
 if __name__ == "__main__":
 
@@ -977,11 +1532,13 @@ if __name__ == "__main__":
         "bill_number": "3852",
         # Initialize other fields as empty
         "bill_metadata": {},
+        "bill_metadata_hash": "",
         "bill_status": "",
-        "bill_text": "",
-        "bill_history": [],
+        "bill_text_hash": "",
+        "bill_history_hash": "",
         "sponsors": [],
         "summaries": {},
+        "bill_purpose": "",
         "media_analysis": [],  # Initialize with empty list even when media agent is disabled
         "pork_barrel_spending": [],
         "trojan_horses": [],
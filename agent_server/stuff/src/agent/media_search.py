@@ -0,0 +1,154 @@
+"""Media search helpers: cached NewsAPI/Tavily searches, deduplication and trimming.
+
+Searches ask for snippets rather than full page dumps. Results are trimmed
+to MEDIA_ARTICLE_MAX_TOKENS per article and cached per query with a TTL,
+articles repeated across sources are dropped by URL or content hash, and
+content is trimmed again to a token budget before it is placed in an
+analysis prompt.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from urllib.parse import urlsplit
+
+import requests
+from langchain_tavily import TavilySearch
+
+from agent.cache import PersistentCache
+from agent.tokens import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+MEDIA_SEARCH_TTL_SECONDS = 6 * 60 * 60  # Coverage moves quickly; refresh every six hours
+MEDIA_TOKEN_BUDGET = 8000  # Tokens of article content per analysis prompt
+MEDIA_ARTICLE_MAX_TOKENS = 2000  # Tokens of content kept per cached article
+
+search_cache = PersistentCache("media_search", ttl_seconds=MEDIA_SEARCH_TTL_SECONDS)
+
+
+def search_news_api(query: str) -> list:
+    """Search NewsAPI for articles."""
+    NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+    if not NEWS_API_KEY:
+        return []
+
+    url = "https://newsapi.org/v2/everything"
+    params = {
+        "q": query,
+        "sortBy": "relevancy",
+        "language": "en",
+        "apiKey": NEWS_API_KEY
+    }
+
+    try:
+        response = requests.get(url, params=params)
+        response.raise_for_status()
+        return response.json().get("articles", [])
+    except Exception as e:
+        logger.warning(f"NewsAPI error: {e}")
+        return []
+
+
+def search_tavily(query: str) -> list:
+    """Search using Tavily's AI-optimized search engine."""
+    TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+    if not TAVILY_API_KEY:
+        return []
+
+    try:
+        # Snippets only: raw page dumps are mostly cut by trim_articles anyway
+        tavily = TavilySearch(max_results=5,
+                            include_raw_content=False,
+                            search_depth="advanced")
+        results = tavily.invoke({"query": query})
+        return results.get("results", [])
+    except Exception as e:
+        logger.warning(f"Tavily search error: {e}")
+        return []
+
+
+SEARCH_FUNCTIONS = {
+    "newsapi": search_news_api,
+    "tavily": search_tavily,
+}
+
+
+def cached_search(engine: str, query: str) -> list:
+    """Run a search through the per-query cache, storing trimmed articles. Empty results are not cached."""
+    key = f"{engine}:{query}"
+    results = search_cache.get(key)
+    if results is None:
+        results = [slim_article(article, MEDIA_ARTICLE_MAX_TOKENS) for article in SEARCH_FUNCTIONS[engine](query)]
+        if results:
+            search_cache.set(key, results)
+    return results
+
+
+def normalize_url(url: str) -> str:
+    """Reduce a URL to host + path so tracking params and schemes don't defeat dedup."""
+    parts = urlsplit(url or "")
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def article_text(article: dict) -> str:
+    """Best available body of a NewsAPI or Tavily article."""
+    return article.get("raw_content") or article.get("content") or article.get("description") or ""
+
+
+def content_hash(text: str) -> str:
+    """Hash article text with case and whitespace normalized."""
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def dedupe_articles(result_groups: list) -> list:
+    """Drop articles already seen in an earlier group (or earlier in the same group).
+
+    Articles match on normalized URL or on a hash of their body text, so the
+    same story syndicated under another URL is only analyzed once.
+    """
+    seen_urls = set()
+    seen_hashes = set()
+    deduped_groups = []
+    for articles in result_groups:
+        deduped = []
+        for article in articles:
+            url = normalize_url(article.get("url", ""))
+            text = article_text(article)
+            digest = content_hash(text) if text.strip() else None
+            if (url and url in seen_urls) or (digest and digest in seen_hashes):
+                continue
+            if url:
+                seen_urls.add(url)
+            if digest:
+                seen_hashes.add(digest)
+            deduped.append(article)
+        deduped_groups.append(deduped)
+    return deduped_groups
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly `max_tokens`, backing up to the last whitespace."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars] + " ..."
+
+
+def slim_article(article: dict, max_tokens: int) -> dict:
+    """Keep an article's metadata and at most `max_tokens` of its best body, as `content`."""
+    slim = {key: value for key, value in article.items() if key not in ("raw_content", "content", "description")}
+    slim["content"] = truncate_to_tokens(article_text(article), max_tokens)
+    return slim
+
+
+def trim_articles(articles: list, token_budget: int = MEDIA_TOKEN_BUDGET) -> list:
+    """Share the token budget evenly across articles and drop the raw page dumps."""
+    if not articles:
+        return []
+    per_article = max(token_budget // len(articles), 1)
+    return [slim_article(article, per_article) for article in articles]
@@ -0,0 +1,199 @@
+"""Background pre-warming of the bill-level analysis caches.
+
+A scheduler polls congress.gov bill lists for bills that are new or whose
+text or actions were updated since they were last warmed, and runs the
+profile-independent stages (init, summaries, history, investigation) for
+them. Those stages write the summary, amendment and section-result caches,
+so an interactive request for the same bill only pays for user alignment.
+
+Warming yields to interactive runs and stops for the day once the daily
+token budget is spent.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, Iterable, Optional
+
+import requests
+
+from agent.cache import PersistentCache
+from agent.congress_api import api_get
+from agent.routing import track_usage
+
+logger = logging.getLogger(__name__)
+
+PREWARM_POLL_INTERVAL_SECONDS = 30 * 60
+PREWARM_DAILY_TOKEN_BUDGET = int(os.getenv("PREWARM_DAILY_TOKEN_BUDGET", "2000000"))
+PREWARM_MAX_BILLS_PER_POLL = 20  # Bills warmed per poll; the rest wait for the next one
+PREWARM_LIST_LIMIT = 50  # Bills requested per list endpoint
+# congress.gov has no "trending" feed; recently updated bills are the closest proxy
+PREWARM_LIST_QUERIES = (("/bill", {"sort": "updateDate desc"}),)
+INTERACTIVE_IDLE_POLL_SECONDS = 5  # How often a waiting warm-up checks for idle
+
+
+def bill_key(bill: dict) -> str:
+    """Key a congress.gov bill-list entry as congress/type/number."""
+    return f"{bill['congress']}/{str(bill['type']).lower()}/{bill['number']}"
+
+
+def bill_version(bill: dict) -> str:
+    """Return what counts as an update: new text, or a newer record if text dates are missing."""
+    return bill.get("updateDateIncludingText") or bill.get("updateDate") or ""
+
+
+class CongressBillSource:
+    """Fetch recently updated bills from congress.gov bill-list endpoints."""
+
+    def __init__(self, queries: Iterable[tuple] = PREWARM_LIST_QUERIES, limit: int = PREWARM_LIST_LIMIT):
+        """Poll the bill lists in `queries`, `limit` bills each."""
+        self.queries = tuple(queries)
+        self.limit = limit
+
+    def fetch(self) -> list:
+        """Return the bills of every list query; failed queries are skipped."""
+        bills = []
+        for path, params in self.queries:
+            try:
+                bills.extend(api_get(path, {**params, "limit": self.limit}).get("bills", []))
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Error fetching bill list {path}: {e}")
+        return bills
+
+
+class FixtureBillSource:
+    """Stand-in source that reads a saved congress.gov bill-list response."""
+
+    def __init__(self, path: str):
+        """Read the bill list saved at `path`."""
+        self.path = path
+
+    def fetch(self) -> list:
+        """Return the bills of the saved response."""
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f).get("bills", [])
+
+
+def warm_bill(congress: str, bill_type: str, bill_number: str) -> None:
+    """Run the profile-independent stages of the workflow for one bill."""
+    from agent.graph import analyze_bill
+
+    analyze_bill(congress, bill_type, bill_number)
+
+
+class PrewarmScheduler:
+    """Poll a bill source and warm new or updated bills within a daily token budget."""
+
+    def __init__(
+        self,
+        source=None,
+        warm: Callable[[str, str, str], None] = warm_bill,
+        token_budget: int = PREWARM_DAILY_TOKEN_BUDGET,
+        poll_interval: float = PREWARM_POLL_INTERVAL_SECONDS,
+        max_bills_per_poll: int = PREWARM_MAX_BILLS_PER_POLL,
+        state_cache: Optional[PersistentCache] = None,
+    ):
+        """Warm bills from `source` with `warm`, spending at most `token_budget` tokens a day."""
+        self.source = source or CongressBillSource()
+        self.warm = warm
+        self.token_budget = token_budget
+        self.poll_interval = poll_interval
+        self.max_bills_per_poll = max_bills_per_poll
+        # Warmed bill versions and daily token usage
+        self.state = state_cache or PersistentCache("prewarm")
+        self._interactive = 0
+        self._interactive_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @contextmanager
+    def interactive(self):
+        """Mark an interactive run in progress; warming waits until none are."""
+        with self._interactive_lock:
+            self._interactive += 1
+        try:
+            yield
+        finally:
+            with self._interactive_lock:
+                self._interactive -= 1
+
+    def is_idle(self) -> bool:
+        """Tell whether no interactive run is in progress."""
+        return self._interactive == 0
+
+    def tokens_used_today(self) -> int:
+        """Return the tokens spent on warming today."""
+        return self.state.get(f"tokens:{date.today().isoformat()}", 0)
+
+    def add_tokens(self, tokens: int) -> None:
+        """Count warming tokens against today's budget."""
+        key = f"tokens:{date.today().isoformat()}"
+        self.state.set(key, self.state.get(key, 0) + tokens, ttl_seconds=2 * 24 * 60 * 60)
+
+    def detect_changes(self) -> list:
+        """Return bills from the source that are new or updated since they were last warmed."""
+        changed, seen = [], set()
+        for bill in self.source.fetch():
+            key = bill_key(bill)
+            if key in seen:
+                continue
+            seen.add(key)
+            if self.state.get(f"bill:{key}") != bill_version(bill):
+                changed.append(bill)
+        return changed
+
+    def run_once(self) -> dict:
+        """Poll once and warm what changed, most recently updated first."""
+        changed = sorted(self.detect_changes(), key=bill_version, reverse=True)
+        warmed, failed = [], []
+        for bill in changed[:self.max_bills_per_poll]:
+            if self.tokens_used_today() >= self.token_budget:
+                logger.info("Prewarm: daily token budget spent")
+                break
+            while not self.is_idle() and not self._stop.is_set():
+                time.sleep(INTERACTIVE_IDLE_POLL_SECONDS)
+            if self._stop.is_set():
+                break
+
+            key = bill_key(bill)
+            with track_usage() as usage:
+                try:
+                    self.warm(str(bill["congress"]), str(bill["type"]).lower(), str(bill["number"]))
+                except Exception as e:
+                    logger.warning(f"Prewarm of {key} failed: {e}")
+                    failed.append(key)
+                    continue
+                finally:
+                    self.add_tokens(usage.total_tokens)
+            self.state.set(f"bill:{key}", bill_version(bill))
+            warmed.append(key)
+        logger.info(f"Prewarm: {len(changed)} changed, {len(warmed)} warmed, {len(failed)} failed")
+        return {
+            "changed": len(changed),
+            "warmed": warmed,
+            "failed": failed,
+            "tokens_used_today": self.tokens_used_today(),
+        }
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"Prewarm poll failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        """Start polling on a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="prewarm", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the polling thread."""
+        self._stop.set()
@@ -0,0 +1,151 @@
+"""Rank bill sections by relevance to a user profile, without calling a model.
+
+An omnibus bill has hundreds of sections and most of them have nothing to do
+with a given user. Each bill gets a BM25 index over its sections, built once
+and kept in memory. The profile's location, occupation and interests are the
+query. Alignment then only sees the best-ranked sections plus every section
+that a high-severity investigation finding points to.
+
+`RELEVANCE_TOP_K` is the minimum number of ranked sections to keep.
+`RELEVANCE_COVERAGE` trades cost for recall: ranked sections keep being added
+until they hold that share of the bill's total relevance score, so 1.0 keeps
+every section that matches any profile term.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from agent.bill_diff import BillSection, hash_text, parse_sections
+from agent.cache import LRUCache
+from agent.findings import finding_text, shingles, words
+from agent.section_index import (
+    EVIDENCE_MIN_CONTAINMENT,
+    SECTION_CITATION_RE,
+    containment,
+)
+
+RELEVANCE_TOP_K = 8  # Ranked sections always kept
+RELEVANCE_COVERAGE = 0.6  # Share of the total relevance score the kept sections must reach
+RELEVANCE_SEVERITIES = {"high"}  # Findings of these severities pull their sections in regardless of rank
+PROFILE_QUERY_FIELDS = ("location", "occupation", "interests")
+BM25_K1 = 1.5
+BM25_B = 0.75
+RELEVANCE_INDEX_CACHE_SIZE = 32  # Bills whose section index is kept in memory
+
+QUERY_STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "by", "with", "or", "at", "as", "is", "be",
+    "my", "i", "me", "local", "small", "other", "sec", "section", "shall", "such", "any",
+}
+_PROFILE_FIELD_RE = re.compile(r"^\s*([A-Za-z][A-Za-z ]*?)\s*:\s*(.*)$")
+_STEM_SUFFIXES = ("ations", "ation", "ings", "ing", "ers", "er", "ies", "es", "ed", "s")
+
+
+def stem(word: str) -> str:
+    """Strip a common English suffix so "farmers" and "farming" both match "farm"."""
+    for suffix in _STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def terms(text: str) -> List[str]:
+    """Stemmed query terms of a text, without stopwords and bare numbers."""
+    return [stem(word) for word in words(text) if word not in QUERY_STOPWORDS and not word.isdigit()]
+
+
+def parse_profile(profile: str) -> Dict[str, str]:
+    """Split a "Field: value" profile into lowercase fields; list items belong to the field above them."""
+    fields, current = {}, None
+    for line in profile.splitlines():
+        match = _PROFILE_FIELD_RE.match(line)
+        if match:
+            current = match.group(1).strip().lower()
+            fields[current] = match.group(2).strip()
+        elif current and line.strip():
+            fields[current] = f"{fields[current]} {line.strip().lstrip('-•* ')}".strip()
+    return fields
+
+
+def profile_query(profile: str) -> List[str]:
+    """Query terms from the profile's location, occupation and interests (the whole text if none are given)."""
+    fields = parse_profile(profile)
+    text = " ".join(fields[field] for field in PROFILE_QUERY_FIELDS if field in fields)
+    return terms(text or profile)
+
+
+class BM25Index:
+    """Okapi BM25 over the sections of one bill."""
+
+    def __init__(self, sections: List[BillSection]):
+        """Index the term counts of `sections`."""
+        self.sections = sections
+        self.term_counts = [Counter(terms(section.text)) for section in sections]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        count = len(sections)
+        self.idf = {term: math.log(1 + (count - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def scores(self, query: Iterable[str]) -> List[float]:
+        """BM25 score of every section for `query`, in section order."""
+        query = set(query)
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.average_length or 1))
+            results.append(sum(
+                self.idf[term] * counts[term] * (BM25_K1 + 1) / (counts[term] + norm)
+                for term in query if term in counts
+            ))
+        return results
+
+    def rank(self, query: Iterable[str], top_k: int = RELEVANCE_TOP_K, coverage: float = RELEVANCE_COVERAGE) -> List[int]:
+        """Indexes of the sections to keep, best first: at least `top_k`, more until `coverage` of the score is reached."""
+        scores = self.scores(query)
+        total = sum(scores)
+        kept, covered = [], 0.0
+        for index in sorted(range(len(scores)), key=lambda i: -scores[i]):
+            if scores[index] <= 0 or (len(kept) >= top_k and covered >= coverage * total):
+                break
+            kept.append(index)
+            covered += scores[index]
+        return kept
+
+
+relevance_indexes = LRUCache(maxsize=RELEVANCE_INDEX_CACHE_SIZE)
+
+
+def bill_relevance_index(bill_text: str, key: Optional[str] = None) -> BM25Index:
+    """Return the section index of a bill, built on first use; `key` defaults to the hash of the text."""
+    key = key or hash_text(bill_text)
+    index = relevance_indexes.get(key)
+    if index is None:
+        index = BM25Index(parse_sections(bill_text))
+        relevance_indexes.set(key, index)
+    return index
+
+
+def flagged_sections(containers: list, sections: List[BillSection], severities: set = RELEVANCE_SEVERITIES) -> List[int]:
+    """Indexes of sections that findings of the given severities cite or quote from."""
+    severe = [record for container in containers for record in container.records if record.severity in severities]
+    if not severe:
+        return []
+    section_shingles = [shingles(section.text) for section in sections]
+    flagged = set()
+    for record in severe:
+        cited = set(SECTION_CITATION_RE.findall(f"{getattr(record, 'title', '')} {record.explanation}"))
+        record_shingles = shingles(finding_text(record.model_dump()))
+        for index, section in enumerate(sections):
+            if section.number in cited or containment(record_shingles, section_shingles[index]) >= EVIDENCE_MIN_CONTAINMENT:
+                flagged.add(index)
+    return sorted(flagged)
+
+
+def relevant_sections(index: BM25Index, profiles: Iterable[str], findings: list,
+                      top_k: int = RELEVANCE_TOP_K, coverage: float = RELEVANCE_COVERAGE) -> List[BillSection]:
+    """Sections worth aligning for any of `profiles`, plus those behind high-severity findings, in bill order."""
+    kept = set(flagged_sections(findings, index.sections))
+    for profile in profiles:
+        kept.update(index.rank(profile_query(profile), top_k, coverage))
+    return [index.sections[i] for i in sorted(kept)]
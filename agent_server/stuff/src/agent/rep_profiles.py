@@ -0,0 +1,89 @@
+"""Representative profiles, cached per sponsor and built concurrently.
+
+A profile depends only on the member (bioguideId), not on the bill, so the
+react search agent runs once per member per TTL instead of once per bill.
+"""
+
+import threading
+from typing import Any, Optional
+
+from langchain_core.messages import messages_to_dict
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_tavily import TavilySearch
+from langgraph.prebuilt import create_react_agent
+
+from agent.blobstore import blob_store
+from agent.cache import PersistentCache
+from agent.prompts import REPRESENTATIVE_PROFILE_PROMPT
+
+REP_PROFILE_TTL_SECONDS = 7 * 24 * 60 * 60  # Profiles change slowly; refresh weekly
+REP_PROFILE_MAX_CONCURRENCY = 4  # Sponsors profiled in parallel
+
+
+def sponsor_key(sponsor: dict) -> str:
+    """Cache key for a sponsor: bioguideId, falling back to the full name."""
+    return sponsor.get("bioguideId") or sponsor.get("fullName", "")
+
+
+class RepresentativeProfileService:
+    """Build representative profiles with a shared react agent and a persistent cache."""
+
+    def __init__(self, llm: Any, cache: Optional[PersistentCache] = None, max_concurrency: int = REP_PROFILE_MAX_CONCURRENCY):
+        """Profile with `llm`, caching in `cache` and running `max_concurrency` agents at once."""
+        self.llm = llm
+        self.cache = cache or PersistentCache("rep_profiles", ttl_seconds=REP_PROFILE_TTL_SECONDS)
+        self.max_concurrency = max_concurrency
+        self._agent = None
+        self._agent_lock = threading.Lock()
+
+    @property
+    def agent(self) -> Any:
+        """The compiled react agent, built on first use and reused across runs."""
+        with self._agent_lock:
+            if self._agent is None:
+                tavily_search_tool = TavilySearch(
+                    max_results=5,
+                    topic="general",
+                )
+                self._agent = create_react_agent(
+                    self.llm,
+                    tools=[tavily_search_tool],
+                    prompt=REPRESENTATIVE_PROFILE_PROMPT
+                )
+            return self._agent
+
+    def build_profile(self, sponsor: dict) -> dict:
+        """Run the react agent for one sponsor and store its transcript as a blob."""
+        inputs = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"Representative Info: {sponsor}"
+                }
+            ]
+        }
+        response = self.agent.invoke(inputs)
+        return {
+            "bioguideId": sponsor.get("bioguideId"),
+            "profile": response["messages"][-1].content,
+            "transcript": blob_store.put_json(messages_to_dict(response["messages"])),
+        }
+
+    def get_profiles(self, sponsors: list) -> dict:
+        """Return profiles keyed by sponsor full name, profiling cache misses concurrently."""
+        profiles = {}
+        misses = []
+        for sponsor in sponsors:
+            cached = self.cache.get(sponsor_key(sponsor))
+            if cached is not None:
+                profiles[sponsor["fullName"]] = cached
+            else:
+                misses.append(sponsor)
+
+        if misses:
+            # Workers inherit the caller's context, so usage callbacks count the profile calls
+            with ContextThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                for sponsor, profile in zip(misses, executor.map(self.build_profile, misses)):
+                    self.cache.set(sponsor_key(sponsor), profile)
+                    profiles[sponsor["fullName"]] = profile
+        return profiles
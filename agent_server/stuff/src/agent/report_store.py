@@ -0,0 +1,143 @@
+"""Server-side store of finished analysis reports.
+
+Reports are kept in SQLite as zlib-compressed JSON next to a few indexed
+columns (report ID, user, bill), so opening one report is a primary-key
+lookup and listing a user's or a bill's reports is an index range scan that
+never touches the report bodies.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Optional
+
+from agent.serialization import dumps
+
+REPORT_DB_PATH = os.getenv("REPORT_DB_PATH", os.path.join(".data", "reports.sqlite"))
+MAX_PAGE_SIZE = 100
+
+METADATA_COLUMNS = ("id", "user_id", "congress", "bill_type", "bill_number", "bill_id", "title", "created_at", "size")
+
+
+def bill_id(bill_type: str, bill_number: str) -> str:
+    """Bill identifier as the frontend writes it, e.g. 'hr3852'."""
+    return f"{str(bill_type).lower()}{bill_number}"
+
+
+class ReportStore:
+    """Persist and page through analysis reports."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Use the SQLite database at `path` (default REPORT_DB_PATH)."""
+        self.path = path or REPORT_DB_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    congress TEXT NOT NULL,
+                    bill_type TEXT NOT NULL,
+                    bill_number TEXT NOT NULL,
+                    bill_id TEXT NOT NULL,
+                    title TEXT,
+                    created_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    body BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS reports_by_user ON reports (user_id, created_at DESC);
+                CREATE INDEX IF NOT EXISTS reports_by_bill ON reports (congress, bill_id, created_at DESC);
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def save(self, report_id: str, result: Any, congress: str, bill_type: str, bill_number: str,
+             user_id: Optional[str] = None, title: Optional[str] = None) -> dict:
+        """Store (or replace) a report and return its metadata."""
+        body = dumps(result)
+        row = {
+            "id": report_id,
+            "user_id": user_id,
+            "congress": str(congress),
+            "bill_type": str(bill_type).lower(),
+            "bill_number": str(bill_number),
+            "bill_id": bill_id(bill_type, bill_number),
+            "title": title,
+            "created_at": time.time(),
+            "size": len(body),
+        }
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO reports ({', '.join(METADATA_COLUMNS)}, body) "
+                f"VALUES ({', '.join('?' * (len(METADATA_COLUMNS) + 1))})",
+                (*row.values(), zlib.compress(body, 6)),
+            )
+            conn.commit()
+        return row
+
+    def get(self, report_id: str) -> Optional[dict]:
+        """Return a report's metadata plus its decompressed `result`, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(METADATA_COLUMNS)}, body FROM reports WHERE id = ?", (report_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        report = dict(zip(METADATA_COLUMNS, row[:-1]))
+        report["result"] = json.loads(zlib.decompress(row[-1]))
+        return report
+
+    def list_reports(self, user_id: Optional[str] = None, congress: Optional[str] = None, bill: Optional[str] = None,
+                     page: int = 1, page_size: int = 20) -> dict:
+        """List report metadata, newest first, filtered by user and/or bill."""
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if congress is not None:
+            clauses.append("congress = ?")
+            params.append(str(congress))
+        if bill is not None:
+            clauses.append("bill_id = ?")
+            params.append(bill.lower())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(f"SELECT COUNT(*) FROM reports {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(METADATA_COLUMNS)} FROM reports {where} ORDER BY created_at DESC, rowid DESC LIMIT ? OFFSET ?",
+                (*params, page_size, (page - 1) * page_size),
+            ).fetchall()
+        return {
+            "items": [dict(zip(METADATA_COLUMNS, row)) for row in rows],
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "has_more": page * page_size < total,
+        }
+
+    def delete(self, report_id: str) -> bool:
+        """Delete a report; returns whether it existed."""
+        with self._lock:
+            conn = self._connect()
+            deleted = conn.execute("DELETE FROM reports WHERE id = ?", (report_id,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+
+report_store = ReportStore()
@@ -0,0 +1,113 @@
+"""Shaping workflow results for clients: field projection and the compact report format.
+
+A full result carries raw amendment objects, per-chunk record containers and
+media articles. The compact report keeps what the report page renders, in the
+same shape, so it fits comfortably in browser storage.
+"""
+
+from typing import Any, Iterable, List
+
+from agent.blobstore import blob_store
+
+# Record containers that are lists of per-chunk `*Records` models
+RECORD_LIST_FIELDS = (
+    "pork_barrel_spending",
+    "trojan_horses",
+    "sleeper_provisions",
+    "beneficiaries",
+    "user_benefits",
+    "user_drawbacks",
+)
+AMENDMENT_KEYS = ("congress", "type", "number", "description", "purpose", "latestAction", "updateDate")
+
+
+def as_plain(value: Any) -> Any:
+    """Turn a Pydantic model into a dict, leaving everything else untouched."""
+    return value.model_dump() if hasattr(value, "model_dump") else value
+
+
+def project_fields(data: Any, fields: Iterable[str]) -> Any:
+    """Keep only the given dotted paths, e.g. ``["summaries.levels", "trojan_horses"]``.
+
+    Paths descend through dicts and models; lists are projected item by item.
+    Unknown paths are ignored.
+    """
+    tree = {}
+    for field in fields:
+        node = tree
+        for part in field.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return _project(data, tree) if tree else data
+
+
+def _project(data: Any, tree: dict) -> Any:
+    if not tree:
+        return data
+    data = as_plain(data)
+    if isinstance(data, list):
+        return [_project(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+    return {key: _project(data[key], subtree) for key, subtree in tree.items() if key in data}
+
+
+def merge_record_containers(containers: Any) -> List[dict]:
+    """Flatten per-chunk ``*Records`` containers into a single container."""
+    if not isinstance(containers, list):
+        return []
+    records = []
+    for container in containers:
+        container = as_plain(container)
+        if isinstance(container, dict):
+            records.extend(as_plain(record) for record in container.get("records", []))
+    return [{"records": records}]
+
+
+def history_analysis(result: dict) -> List[dict]:
+    """Amendment analyses of a result: inline in reports saved before they moved to the blob store."""
+    if result.get("bill_history_analysis"):
+        return result["bill_history_analysis"]
+    digest = result.get("bill_history_analysis_hash")
+    return blob_store.get_json(digest) if digest and blob_store.exists(digest) else []
+
+
+def compact_report(result: dict) -> dict:
+    """Reduce a workflow result to the summaries and findings the report page shows.
+
+    Drops raw amendment payloads, media articles, transcripts and state
+    bookkeeping, and merges per-chunk findings into one container per type so
+    ``result.<field>[0].records`` holds every finding.
+    """
+    summaries = result.get("summaries", {}) or {}
+    compact = {
+        "bill_metadata": result.get("bill_metadata", {}),
+        "bill_status": result.get("bill_status", ""),
+        "bill_text_hash": result.get("bill_text_hash", ""),
+        "text_normalization": result.get("text_normalization", {}),
+        "summaries": {
+            "levels": summaries.get("levels", {}),
+            "rep_profiles": {
+                name: {key: value for key, value in as_plain(profile).items() if key != "transcript"}
+                for name, profile in summaries.get("rep_profiles", {}).items()
+            },
+        },
+        "bill_history_analysis": [
+            {
+                "amendment": {key: entry["amendment"][key] for key in AMENDMENT_KEYS if key in entry["amendment"]},
+                "analysis": as_plain(entry.get("analysis")),
+            }
+            for entry in history_analysis(result)
+        ],
+        "media_analysis": [
+            {"source": entry.get("source"), "analysis": entry.get("analysis")}
+            for entry in result.get("media_analysis", []) or []
+        ],
+        "cost_analysis": as_plain(result.get("cost_analysis", {})),
+    }
+    version_changes = result.get("version_changes") or {}
+    if version_changes:
+        compact["version_changes"] = {"report": version_changes.get("report", "")}
+    for field in RECORD_LIST_FIELDS:
+        compact[field] = merge_record_containers(result.get(field, []))
+    return compact
@@ -0,0 +1,165 @@
+"""Per-stage model routing, cascade escalation and per-stage cost/latency logs.
+
+Each pipeline stage runs on a model tier. With the cascade enabled, the
+"cheap" stages (per-chunk extraction and validation) run on a fast, cheap
+model, and any of its structured answers that failed to parse or validate,
+or that report low confidence, are re-run on the strong model. Every
+measured stage logs its calls, wall time, tokens and estimated cost per
+model (wall time covers the stage's concurrent calls), and
+`stage_metrics.summary()` totals them so the mix can be tuned.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+logger = logging.getLogger(__name__)
+
+# Model tier of each stage when the cascade is enabled (otherwise everything runs on the strong model)
+STAGE_MODEL_TIERS = {
+    "extraction": "cheap",  # Per-chunk findings, amendment analyses, chunk outlines
+    "validation": "cheap",  # Per-chunk fact checks of findings and alignment claims
+    "summary": "strong",  # Reduce steps and the bill summaries
+    "alignment": "strong",
+    "synthesis": "strong",  # Cross-chunk synthesis: validation verdicts, media analysis
+}
+CASCADE_ESCALATE_CONFIDENCE = {"low"}  # Self-reported confidence that sends an answer to the strong model
+
+# USD per million (input, output) tokens; model names are matched by prefix
+MODEL_PRICES_PER_MILLION = {
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+}
+
+
+def model_name(model) -> str:
+    """Readable name of a chat model instance (or of a model name string)."""
+    if isinstance(model, str):
+        name = model
+    else:
+        name = getattr(model, "model", None) or getattr(model, "model_name", None) or type(model).__name__
+    return name.split(":", 1)[-1].removeprefix("models/")
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of a call; 0 for models without a known price."""
+    name = model_name(model)
+    for prefix in sorted(MODEL_PRICES_PER_MILLION, key=len, reverse=True):
+        if name.startswith(prefix):
+            input_price, output_price = MODEL_PRICES_PER_MILLION[prefix]
+            return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return 0.0
+
+
+def needs_escalation(response) -> bool:
+    """Tell whether a cheap-model structured answer should be redone by the strong model."""
+    if response is None or isinstance(response, Exception):
+        return True  # No tool call, or arguments that failed schema validation
+    return getattr(response, "confidence", None) in CASCADE_ESCALATE_CONFIDENCE
+
+
+class StageUsageHandler(BaseCallbackHandler):
+    """Counts chat model calls and tokens per model name, and reports them to the enclosing handler."""
+
+    def __init__(self, parent: Optional["StageUsageHandler"] = None):
+        """Count usage, forwarding every call to `parent` as well."""
+        self.by_model = {}  # model -> {"calls", "input_tokens", "output_tokens"}
+        self.parent = parent
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, **kwargs) -> None:
+        """Add the usage of a finished chat model call."""
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        usage = getattr(message, "usage_metadata", None) or {}
+        name = model_name((getattr(message, "response_metadata", None) or {}).get("model_name") or "unknown")
+        with self._lock:
+            totals = self.by_model.setdefault(name, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+            totals["calls"] += 1
+            totals["input_tokens"] += usage.get("input_tokens", 0)
+            totals["output_tokens"] += usage.get("output_tokens", 0)
+        if self.parent is not None:
+            self.parent.on_llm_end(response, **kwargs)
+
+    @property
+    def total_tokens(self) -> int:
+        """Input plus output tokens over every model."""
+        with self._lock:
+            return sum(usage["input_tokens"] + usage["output_tokens"] for usage in self.by_model.values())
+
+
+# Registered once; get_usage_metadata_callback() would register a new hook on every call
+_stage_usage_var: ContextVar[Optional[StageUsageHandler]] = ContextVar("stage_usage_handler", default=None)
+register_configure_hook(_stage_usage_var, inheritable=True)
+
+
+@contextmanager
+def track_usage():
+    """Count the chat model calls made inside the block (including worker threads) per model.
+
+    Blocks nest: calls inside an inner block are also counted by the outer ones.
+    """
+    handler = StageUsageHandler(parent=_stage_usage_var.get())
+    token = _stage_usage_var.set(handler)
+    try:
+        yield handler
+    finally:
+        _stage_usage_var.reset(token)
+
+
+class StageMetrics:
+    """Running per-stage, per-model totals of LLM calls, latency, tokens and cost."""
+
+    def __init__(self):
+        """Start with no totals."""
+        self.totals = {}  # (stage, model) -> totals
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage: str):
+        """Record the chat model calls made inside the block (including worker threads) under `stage`."""
+        start = time.perf_counter()
+        with track_usage() as handler:
+            try:
+                yield handler
+            finally:
+                seconds = time.perf_counter() - start
+                for name, usage in handler.by_model.items():
+                    self.record(stage, name, usage["calls"], seconds, usage["input_tokens"], usage["output_tokens"])
+
+    def record(self, stage: str, model: str, calls: int, seconds: float, input_tokens: int, output_tokens: int) -> None:
+        """Add one stage's calls for `model` to the totals and log them."""
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        logger.info(f"[{stage}] {model}: {calls} call(s) in {seconds:.2f}s, {input_tokens}+{output_tokens} tokens, ${cost:.4f}")
+        with self._lock:
+            totals = self.totals.setdefault((stage, model), {
+                "calls": 0, "seconds": 0.0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0
+            })
+            totals["calls"] += calls
+            totals["seconds"] += seconds
+            totals["input_tokens"] += input_tokens
+            totals["output_tokens"] += output_tokens
+            totals["cost"] += cost
+
+    def summary(self) -> List[dict]:
+        """Totals per stage and model, most expensive first."""
+        with self._lock:
+            rows = [{"stage": stage, "model": model, **totals} for (stage, model), totals in self.totals.items()]
+        return sorted(rows, key=lambda row: -row["cost"])
+
+    def reset(self) -> None:
+        """Drop every total."""
+        with self._lock:
+            self.totals.clear()
+
+
+stage_metrics = StageMetrics()
@@ -0,0 +1,201 @@
+"""Cross-bill index of bill sections for spotting copied riders and boilerplate.
+
+Every fetched bill's sections are stored with their content hash and a
+MinHash signature of their word shingles, split into LSH bands. Looking up a
+section only compares it with sections sharing at least one band bucket, so
+"this section also appears in bills X, Y" is a few indexed SQLite lookups.
+
+Sections are stored by their position in the bill, and reported by their
+division-qualified number, because omnibus bills repeat section numbers in
+every division. Exact copies are found by content hash (which ignores
+section numbering).
+Text that appears verbatim in many bills, such as PAYGO budgetary-effects
+clauses, is treated as known boilerplate and is not sent to the rider checks.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from agent.bill_diff import BillSection
+from agent.findings import (
+    MINHASH_PERMUTATIONS,
+    estimated_jaccard,
+    finding_text,
+    minhash,
+    shingles,
+)
+
+SECTION_INDEX_DB_PATH = os.getenv("SECTION_INDEX_DB_PATH", os.path.join(".data", "sections.sqlite"))
+SECTION_SHINGLE_SIZE = 5  # Words per shingle; longer than for findings so shared legal phrasing doesn't match
+LSH_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard usually share a bucket
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+RIDER_SIMILARITY_THRESHOLD = 0.8  # Estimated Jaccard for "also appears in"
+MIN_SECTION_WORDS = 25  # Shorter sections (short titles, effective dates) match too much to mean anything
+BOILERPLATE_MIN_BILLS = 5  # Exact copies in this many other bills make a section known boilerplate
+MAX_MATCHES_PER_SECTION = 10
+SCHEMA_VERSION = 2  # 2: sections keyed by position, since omnibus divisions repeat section numbers
+EVIDENCE_MIN_CONTAINMENT = 0.3  # Share of a finding's shingles found in a section to tie them together
+
+SECTION_CITATION_RE = re.compile(r"\bsec(?:tion)?\.?\s+(\d+[A-Za-z]*)", re.IGNORECASE)
+
+
+def band_buckets(signature: List[int]) -> List[str]:
+    """LSH bucket of each band of a MinHash signature."""
+    return [
+        hashlib.blake2b(array("Q", signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]).tobytes(), digest_size=8).hexdigest()
+        for band in range(LSH_BANDS)
+    ]
+
+
+class SectionIndex:
+    """SQLite-backed MinHash LSH index of bill sections."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Use the SQLite database at `path` (default SECTION_INDEX_DB_PATH)."""
+        self.path = path or SECTION_INDEX_DB_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # The index is rebuilt from fetched bills, so older layouts are dropped
+                self._conn.executescript("DROP TABLE IF EXISTS sections; DROP TABLE IF EXISTS bands;")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sections (
+                    bill TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    number TEXT NOT NULL,
+                    header TEXT,
+                    content_hash TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    PRIMARY KEY (bill, position)
+                );
+                CREATE INDEX IF NOT EXISTS sections_by_hash ON sections (content_hash);
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    bill TEXT NOT NULL,
+                    position INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS bands_by_bucket ON bands (band, bucket);
+                CREATE INDEX IF NOT EXISTS bands_by_bill ON bands (bill);
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def signature(section: BillSection) -> List[int]:
+        """MinHash signature of a section's text."""
+        return minhash(shingles(section.text, SECTION_SHINGLE_SIZE))
+
+    def add_bill(self, bill: str, sections: Iterable[BillSection]) -> None:
+        """Index a bill's sections, replacing any earlier version of the bill."""
+        rows, band_rows = [], []
+        for position, section in enumerate(sections):
+            if len(section.text.split()) < MIN_SECTION_WORDS:
+                continue
+            signature = self.signature(section)
+            rows.append((bill, position, section.key, section.header, section.content_hash, array("Q", signature).tobytes()))
+            band_rows.extend((band, bucket, bill, position) for band, bucket in enumerate(band_buckets(signature)))
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM sections WHERE bill = ?", (bill,))
+            conn.execute("DELETE FROM bands WHERE bill = ?", (bill,))
+            conn.executemany("INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO bands VALUES (?, ?, ?, ?)", band_rows)
+            conn.commit()
+
+    def similar_sections(self, section: BillSection, exclude_bill: Optional[str] = None) -> List[dict]:
+        """Sections of other bills that are copies or near-copies of `section`, most similar first."""
+        if len(section.text.split()) < MIN_SECTION_WORDS:
+            return []
+        signature = self.signature(section)
+        buckets = band_buckets(signature)
+        clause = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * LSH_BANDS)
+        params = [value for band, bucket in enumerate(buckets) for value in (band, bucket)]
+        with self._lock:
+            candidates = self._connect().execute(
+                f"SELECT DISTINCT s.bill, s.position, s.number, s.header, s.content_hash, s.signature "
+                f"FROM bands b JOIN sections s ON s.bill = b.bill AND s.position = b.position "
+                f"WHERE ({clause}) AND b.bill != ?",
+                (*params, exclude_bill or ""),
+            ).fetchall()
+
+        matches = []
+        for bill, _, number, header, content_hash, blob in candidates:
+            exact = content_hash == section.content_hash
+            similarity = 1.0 if exact else estimated_jaccard(signature, list(array("Q", blob)))
+            if similarity >= RIDER_SIMILARITY_THRESHOLD:
+                matches.append({"bill": bill, "section": number, "header": header, "similarity": round(similarity, 3), "exact": exact})
+        matches.sort(key=lambda match: -match["similarity"])
+        return matches[:MAX_MATCHES_PER_SECTION]
+
+    def find_copies(self, sections: Iterable[BillSection], exclude_bill: Optional[str] = None) -> Dict[int, List[dict]]:
+        """`similar_sections` for every section of a bill, keyed by position in `sections` (sections with matches only)."""
+        found = {}
+        for position, section in enumerate(sections):
+            matches = self.similar_sections(section, exclude_bill)
+            if matches:
+                found[position] = matches
+        return found
+
+    def boilerplate_hashes(self, content_hashes: Iterable[str], exclude_bill: Optional[str] = None) -> set:
+        """Content hashes that appear verbatim in at least BOILERPLATE_MIN_BILLS other bills."""
+        content_hashes = list(set(content_hashes))
+        if not content_hashes:
+            return set()
+        placeholders = ", ".join("?" * len(content_hashes))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT content_hash FROM sections WHERE content_hash IN ({placeholders}) AND bill != ? "
+                f"GROUP BY content_hash HAVING COUNT(DISTINCT bill) >= ?",
+                (*content_hashes, exclude_bill or "", BOILERPLATE_MIN_BILLS),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+
+def containment(needle: set, haystack: set) -> float:
+    """Share of `needle` found in `haystack`."""
+    return len(needle & haystack) / len(needle) if needle else 0.0
+
+
+def attach_rider_evidence(containers: list, sections: List[BillSection], copies: Dict[int, List[dict]]) -> list:
+    """Set `also_appears_in` on findings that concern a section found in other bills.
+
+    A finding is tied to a section when it cites the section number (only if
+    no other division reuses that number) or when a good share of its
+    explanation's wording is found in the section text. `copies` is keyed by
+    position in `sections`, as returned by `SectionIndex.find_copies`.
+    """
+    if not copies:
+        return containers
+    number_counts = Counter(section.number for section in sections)
+    copied = [(position, sections[position], shingles(sections[position].text)) for position in sorted(copies)]
+    for container in containers:
+        for record in container.records:
+            cited = set(SECTION_CITATION_RE.findall(f"{record.title} {record.explanation}"))
+            record_shingles = shingles(finding_text(record.model_dump()))
+            evidence = {}
+            for position, section, section_shingles in copied:
+                cites_section = section.number in cited and number_counts[section.number] == 1
+                if cites_section or containment(record_shingles, section_shingles) >= EVIDENCE_MIN_CONTAINMENT:
+                    for match in copies[position]:
+                        evidence.setdefault((match["bill"], match["section"]), {"bill_section": section.key, **match})
+            record.also_appears_in = list(evidence.values())
+    return containers
+
+
+section_index = SectionIndex()
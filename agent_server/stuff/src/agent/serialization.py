@@ -0,0 +1,27 @@
+"""Single-pass JSON encoding for workflow results.
+
+orjson walks the result once in native code and only calls back into Python
+for objects it doesn't know (Pydantic records, LangChain messages). This
+replaces a recursive Python walk followed by FastAPI's `jsonable_encoder`.
+"""
+
+from typing import Any
+
+import orjson
+
+
+def orjson_default(obj: Any) -> Any:
+    """Convert objects orjson can't serialize natively; orjson walks the result again."""
+    if hasattr(obj, "model_dump"):  # Pydantic models, including LangChain messages
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "__dict__"):  # For other custom class instances
+        return obj.__dict__
+    return str(obj)  # Fallback for other types
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize a result to JSON bytes in a single pass."""
+    return orjson.dumps(obj, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
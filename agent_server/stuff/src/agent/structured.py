@@ -0,0 +1,118 @@
+"""Structured-output runnables built once per schema and model.
+
+``llm.with_structured_output(schema)`` converts the Pydantic schema into a tool
+declaration every time it is called, and nodes used to call it on every
+invocation. `StructuredOutputs` builds each runnable once (at startup for the
+schemas in `STRUCTURED_SCHEMAS`, lazily for others) and hands out the same
+object afterwards.
+
+It can also build a variant of the finding schemas in which the severity field
+only refers to the rubric, and the rubric (`SEVERITY_GUIDELINES`) is sent once in
+the system prompt instead. See benchmarks/bench_structured_schemas.py for the
+token counts of both variants.
+"""
+
+import threading
+from functools import cache
+from typing import Iterable, List, Literal, get_args
+
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, Field, create_model
+
+from agent.types import (
+    SEVERITY_GUIDELINES,
+    AlignmentRecords,
+    BeneficiaryRecords,
+    BillCost,
+    ChangeRecords,
+    PorkRecords,
+    TrojanHorseRecords,
+)
+
+HOIST_SEVERITY_RUBRIC = False  # Send the severity rubric in the system prompt instead of inside the schema
+SEVERITY_REFERENCE = "low, medium or high, following the SEVERITY SCALE in the instructions"
+CONFIDENCE_DESCRIPTION = (
+    "How confident you are that these records are complete and supported by the text: "
+    "low if the text was ambiguous, truncated or outside your knowledge"
+)
+STRUCTURED_SCHEMAS = (ChangeRecords, PorkRecords, TrojanHorseRecords, BeneficiaryRecords, AlignmentRecords, BillCost)
+
+
+def record_type(schema: type[BaseModel]):
+    """Return the record model of a ``*Records`` container, or None."""
+    field = schema.model_fields.get("records")
+    args = get_args(field.annotation) if field is not None else ()
+    return args[0] if args and isinstance(args[0], type) and issubclass(args[0], BaseModel) else None
+
+
+def has_severity(schema: type[BaseModel]) -> bool:
+    """Tell whether a schema, or its record type, has a `severity` field."""
+    record = record_type(schema)
+    return "severity" in schema.model_fields or (record is not None and has_severity(record))
+
+
+def with_severity_reference(schema: type[BaseModel]) -> type[BaseModel]:
+    """Subclass of `schema` whose severity fields refer to the rubric instead of containing it.
+
+    The subclass keeps the schema's name, so the tool the model sees is called
+    the same, and its instances are still instances of `schema`.
+    """
+    fields = {}
+    if "severity" in schema.model_fields:
+        fields["severity"] = (schema.model_fields["severity"].annotation, Field(description=SEVERITY_REFERENCE))
+    record = record_type(schema)
+    if record is not None and has_severity(record):
+        fields["records"] = (List[with_severity_reference(record)], Field(description=schema.model_fields["records"].description))
+    if not fields:
+        return schema
+    return create_model(schema.__name__, __base__=schema, __doc__=schema.__doc__, **fields)
+
+
+@cache
+def with_confidence(schema: type[BaseModel]) -> type[BaseModel]:
+    """Subclass of `schema` that also asks for a self-reported confidence (used by the model cascade)."""
+    return create_model(
+        schema.__name__, __base__=schema, __doc__=schema.__doc__,
+        confidence=(Literal["low", "medium", "high"], Field(description=CONFIDENCE_DESCRIPTION)),
+    )
+
+
+def add_severity_rubric(messages: list) -> list:
+    """Append the severity rubric to the system message (or add one)."""
+    rubric = f"\n\n{SEVERITY_GUIDELINES.strip()}"
+    first = messages[0] if messages else None
+    if isinstance(first, dict) and first.get("role") == "system":
+        return [{**first, "content": first["content"] + rubric}, *messages[1:]]
+    return [{"role": "system", "content": rubric.strip()}, *messages]
+
+
+class StructuredOutputs:
+    """Registry of structured-output runnables for one chat model."""
+
+    def __init__(self, llm, hoist_severity: bool = HOIST_SEVERITY_RUBRIC):
+        """Build runnables on `llm`, hoisting the severity rubric if `hoist_severity`."""
+        self.llm = llm
+        self.hoist_severity = hoist_severity
+        self._runnables = {}
+        self._lock = threading.Lock()
+
+    def _build(self, schema: type[BaseModel]) -> Runnable:
+        if self.hoist_severity and has_severity(schema):
+            return RunnableLambda(add_severity_rubric) | self.llm.with_structured_output(with_severity_reference(schema))
+        return self.llm.with_structured_output(schema)
+
+    def build(self, schemas: Iterable[type[BaseModel]] = STRUCTURED_SCHEMAS) -> "StructuredOutputs":
+        """Build the runnables for `schemas` up front."""
+        for schema in schemas:
+            self.get(schema)
+        return self
+
+    def get(self, schema: type[BaseModel]) -> Runnable:
+        """Return the runnable for `schema`, building it on first use."""
+        runnable = self._runnables.get(schema)
+        if runnable is None:
+            with self._lock:
+                runnable = self._runnables.get(schema)
+                if runnable is None:
+                    runnable = self._runnables[schema] = self._build(schema)
+        return runnable
@@ -0,0 +1,51 @@
+"""Token estimates and token-based chunk budgets, without calling a tokenizer."""
+
+import math
+
+CHARS_PER_TOKEN = 4  # Rough English average, good enough for budgeting
+
+# Input context window of the models we run, in tokens
+MODEL_CONTEXT_TOKENS = {
+    "gemini-2.0-flash": 1_048_576,
+    "gemini-2.0-flash-lite": 1_048_576,
+    "claude-3-5-sonnet-latest": 200_000,
+    "claude-3-5-haiku-latest": 200_000,
+}
+DEFAULT_CONTEXT_TOKENS = 128_000  # Assumed for models not listed above
+MIN_CHUNK_TOKENS = 4_096  # Below this the repeated prompt costs more than the parallelism saves
+
+# Per stage: the largest share of the context window one chunk may take (the rest
+# is instructions, repeated inputs and output), and whether the stage's chunk
+# calls run concurrently. Concurrent stages split the bill into about one chunk
+# per concurrent call; sequential stages use the fewest, largest chunks.
+STAGE_CHUNK_POLICIES = {
+    "extraction": {"context_share": 0.1, "parallel": True},  # Several finding types per chunk; small chunks keep recall up
+    "alignment": {"context_share": 0.25, "parallel": True},  # Profile and bill analysis are repeated in every call
+    "validation": {"context_share": 0.4, "parallel": False},  # All claims are repeated per chunk, one call after another
+    "summary": {"context_share": 0.25, "parallel": True},
+    "summary_reduce": {"context_share": 0.1, "parallel": False},  # Fan-in of one reduce call; long merges lose detail
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of `text`."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def context_window(model: str) -> int:
+    """Context window of a model name such as "gemini-2.0-flash" or "anthropic:claude-3-5-sonnet-latest"."""
+    return MODEL_CONTEXT_TOKENS.get(model.split(":", 1)[-1], DEFAULT_CONTEXT_TOKENS)
+
+
+def chunk_token_budget(stage: str, text_tokens: int, context_tokens: int, concurrency: int) -> int:
+    """Largest chunk, in tokens, for splitting `text_tokens` of bill text for `stage`.
+
+    The budget is rounded down to a power of two so that a small edit to a bill
+    rarely changes its chunking (and with it the per-chunk cache keys).
+    """
+    policy = STAGE_CHUNK_POLICIES[stage]
+    cap = int(context_tokens * policy["context_share"])
+    budget = cap
+    if policy["parallel"]:
+        budget = min(cap, max(math.ceil(text_tokens / max(concurrency, 1)), MIN_CHUNK_TOKENS))
+    return 1 << max(budget, 1).bit_length() - 1
@@ -1,5 +1,6 @@
 from typing import Any, Literal, List
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 
 SEVERITY_GUIDELINES = """
 SEVERITY SCALE — rate each provision by its overall level of risk, controversy, and misalignment with the bill’s stated purpose, **plus** how well it aligns with or harms the user’s stated background, values, and priorities.  
@@ -53,6 +54,8 @@ class TrojanHorseRecord(BaseModel):
     concern: str = Field(description="Why trojan horse or sleeper provision is concerning")
     severity: Literal["low", "medium", "high"] = Field(description=SEVERITY_GUIDELINES)
     why: str = Field(description="Explain WHY this is a trojan horse  or sleeper provision. do not call things trojan horses or sleeper provisions if they are not actually trojan horses or sleeper provisions")
+    # Filled locally from the cross-bill section index, never by the LLM (hidden from the schema)
+    also_appears_in: SkipJsonSchema[List[dict]] = Field(default_factory=list, description="Other bills containing the same section")
 
 class BeneficiaryRecord(BaseModel):
     """A model for representing beneficiary records."""
@@ -98,3 +101,12 @@ class BeneficiaryRecords(BaseModel):
 class AlignmentRecords(BaseModel):
     """Container for a list of alignment records."""
     records: List[AlignmentRecord] = Field(description="List of alignment records")
+
+class ProfileAlignment(BaseModel):
+    """Alignment records for one profile of a cohort."""
+    profile_id: str = Field(description="Id of the profile these records are for, exactly as given (e.g. P1)")
+    records: List[AlignmentRecord] = Field(description="List of alignment records for this profile only")
+
+class CohortAlignmentRecords(BaseModel):
+    """Container for the alignment records of several profiles analyzed together."""
+    profiles: List[ProfileAlignment] = Field(description="One entry per profile id given")
@@ -1,43 +1,154 @@
-from fastapi import FastAPI
-from typing import Any, Dict
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
+import logging
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-from agent.types import (
-    ChangeRecord, PorkRecord, TrojanHorseRecord, BeneficiaryRecord,
-    AlignmentRecord, BillCost, Alternative,
-    ChangeRecords, PorkRecords, TrojanHorseRecords, BeneficiaryRecords,
-    AlignmentRecords
+from agent.blobstore import blob_store
+from agent.prewarm import PrewarmScheduler
+from agent.report_store import report_store
+from agent.reports import compact_report, project_fields
+from agent.serialization import dumps
+from agent.graph import (
+    COHORT_SIZE, agenerate_scores, align_profiles, analyze_bill, astream_letter, generate_letter, generate_score,
+    get_run_status, letter_cache, request_cache_key, resume_workflow, run_workflow, score_cache
 )
-from agent import graph
-from agent.graph import generate_letter, generate_score
-
-def convert_to_json_serializable(obj: Any) -> Any:
-    """Convert a langgraph output to JSON-serializable format."""
-    if isinstance(obj, (
-        ChangeRecord, PorkRecord, TrojanHorseRecord, BeneficiaryRecord,
-        AlignmentRecord, BillCost, Alternative,
-        ChangeRecords, PorkRecords, TrojanHorseRecords, BeneficiaryRecords,
-        AlignmentRecords
-    )):
-        return convert_to_json_serializable(obj.model_dump())
-    elif isinstance(obj, dict):
-        return {k: convert_to_json_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_json_serializable(item) for item in obj]
-    elif hasattr(obj, 'model_dump'):  # For other Pydantic models
-        return convert_to_json_serializable(obj.model_dump())
-    elif hasattr(obj, '__dict__'):  # For other custom class instances
-        return convert_to_json_serializable(obj.__dict__)
-    elif isinstance(obj, (str, int, float, bool, type(None))):
-        return obj
-    else:
-        return str(obj)  # Fallback for other types
+
+try:
+    import brotli
+except ImportError:  # Optional; large responses fall back to gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_SIZE = 1024  # Bytes; smaller bodies aren't worth compressing
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "0") == "1"  # Warm caches for new/updated bills in the background
+
+prewarm_scheduler = PrewarmScheduler()
+
+class ORJSONResponse(Response):
+    """A JSON response rendered by orjson in one pass, bypassing `jsonable_encoder`."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """Encode `content` with orjson."""
+        return dumps(content)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list or weak tags) against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+def cached_response(content: Dict[str, Any], etag: str) -> JSONResponse:
+    """Return `content` with its ETag; clients must revalidate before reusing it."""
+    return JSONResponse(content, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+def json_response(content: Any, http_request: Request) -> Response:
+    """Encode content once with orjson and brotli-compress it when the client accepts it.
+
+    Without brotli (or for clients that don't send `br`), GZipMiddleware
+    compresses the response instead.
+    """
+    body = dumps(content)
+    if brotli is not None and len(body) >= COMPRESSION_MIN_SIZE and "br" in http_request.headers.get("accept-encoding", ""):
+        return Response(
+            brotli.compress(body, quality=5),
+            media_type="application/json",
+            headers={"Content-Encoding": "br", "Vary": "Accept-Encoding"}
+        )
+    return Response(body, media_type="application/json")
+
+def workflow_response(
+    result: Dict[str, Any],
+    run_id: str,
+    include_artifacts: bool,
+    http_request: Request,
+    fields: Optional[str] = None,
+    report_format: str = "full"
+) -> Response:
+    """Build the API response for a finished workflow run.
+
+    `report_format="compact"` returns the storage-sized report, and `fields`
+    (comma-separated dotted paths) projects the result down to those paths.
+    """
+    shaped = compact_report(result) if report_format == "compact" else result
+    if fields:
+        shaped = project_fields(shaped, fields.split(","))
+    response = {
+        "status": "success",
+        "run_id": run_id,
+        "report_id": run_id,  # Reports are saved under their run ID
+        "result": shaped
+    }
+    if include_artifacts:
+        response["artifacts"] = collect_artifacts(result)
+    return json_response(response, http_request)
+
+def save_report(result: Dict[str, Any], run_id: str, user_id: Optional[str]) -> None:
+    """Persist a finished run in the report store under its run ID."""
+    try:
+        report_store.save(
+            run_id,
+            result,
+            congress=result.get("congress_num", ""),
+            bill_type=result.get("bill_type", ""),
+            bill_number=result.get("bill_number", ""),
+            user_id=user_id,
+            title=result.get("bill_metadata", {}).get("bill", {}).get("title")
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save report {run_id}: {e}")
+
+def collect_artifacts(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Materialize the blobs referenced by a workflow result."""
+    refs = {
+        "bill_text": result.get("bill_text_hash"),
+        "bill_xml": result.get("bill_xml_hash"),
+        "bill_text_offsets": result.get("bill_text_offsets_hash"),
+        "bill_metadata": result.get("bill_metadata_hash"),
+        "bill_history": result.get("bill_history_hash"),
+        "bill_history_analysis": result.get("bill_history_analysis_hash"),
+    }
+    for name, profile in result.get("summaries", {}).get("rep_profiles", {}).items():
+        refs[f"rep_profiles/{name}/transcript"] = profile.get("transcript")
+
+    artifacts = {}
+    for name, digest in refs.items():
+        if digest and blob_store.exists(digest):
+            artifacts[name] = blob_store.get_text(digest) if name in ("bill_text", "bill_xml") else blob_store.get_json(digest)
+    return artifacts
 
 class WorkflowRequest(BaseModel):
     profile: str
     congress_num: int
     type: str
     bill_num: int
+    include_artifacts: bool = False  # Inline bill text, raw metadata and transcripts
+    run_id: Optional[str] = None  # Checkpoint key; generated when omitted
+    user_id: Optional[str] = None  # Owner of the saved report
+
+class ResumeRequest(BaseModel):
+    """Options for resuming a run; the run ID is in the path."""
+
+    include_artifacts: bool = False
+    user_id: Optional[str] = None
+
+class ProfilesAlignmentRequest(BaseModel):
+    """One bill and the user profiles to align it with."""
+
+    congress_num: int
+    type: str
+    bill_num: int
+    profiles: Dict[str, str] = Field(min_length=1)  # User id -> profile text
+    cohort_size: int = Field(default=COHORT_SIZE, ge=1, le=16)
 
 class LetterRequest(BaseModel):
     preferences: str
@@ -47,12 +158,30 @@ class ScoreRequest(BaseModel):
     preferences: str
     bill_context: str
 
+class BatchScoreRequest(BaseModel):
+    """One set of preferences scored against many bills."""
+
+    preferences: str
+    bill_contexts: List[str]
+    max_concurrency: int = Field(default=8, ge=1, le=32)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the prewarm scheduler, when enabled, for the lifetime of the app."""
+    if PREWARM_ENABLED:
+        prewarm_scheduler.start()
+    yield
+    prewarm_scheduler.stop()
+
 app = FastAPI(
     title="API Server",
     description="FastAPI server for handling API requests",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -71,8 +200,13 @@ async def health_check() -> Dict[str, str]:
     return {"status": "healthy"}
 
 @app.post("/call_workflow")
-async def call_workflow(request: WorkflowRequest) -> Dict[str, Any]:
-    a_graph = graph
+async def call_workflow(
+    request: WorkflowRequest,
+    http_request: Request,
+    fields: Optional[str] = None,
+    report_format: Literal["full", "compact"] = Query("full", alias="format")
+) -> Response:
+    run_id = request.run_id or str(uuid.uuid4())
     # Example user profile
     initial_state = {
         "messages": [],
@@ -85,11 +219,13 @@ async def call_workflow(request: WorkflowRequest) -> Dict[str, Any]:
         "bill_number": str(request.bill_num),
         # Initialize other fields as empty
         "bill_metadata": {},
+        "bill_metadata_hash": "",
         "bill_status": "",
-        "bill_text": "",
-        "bill_history": [],
+        "bill_text_hash": "",
+        "bill_history_hash": "",
         "sponsors": [],
         "summaries": {},
+        "bill_purpose": "",
         "media_analysis": [],  # Initialize with empty list even when media agent is disabled
         "pork_barrel_spending": [],
         "trojan_horses": [],
@@ -109,44 +245,226 @@ async def call_workflow(request: WorkflowRequest) -> Dict[str, Any]:
         "should_revise_investigation": False
     }
 
-    # Run the analysis workflow
-    result = a_graph.invoke(initial_state)
-    
-    # Convert the result to JSON-serializable format
-    print(result)
-    json_result = convert_to_json_serializable(result)
+    # Run the analysis workflow; progress is checkpointed so a failure can be resumed
+    try:
+        with prewarm_scheduler.interactive():
+            result = run_workflow(initial_state, run_id)
+    except Exception as e:
+        return ORJSONResponse({
+            "status": "error",
+            "run_id": run_id,
+            "message": str(e)
+        })
     
+    save_report(result, run_id, request.user_id)
+    return workflow_response(result, run_id, request.include_artifacts, http_request, fields, report_format)
+
+@app.post("/resume_workflow/{run_id}")
+async def resume_workflow_run(
+    run_id: str,
+    request: ResumeRequest,
+    http_request: Request,
+    fields: Optional[str] = None,
+    report_format: Literal["full", "compact"] = Query("full", alias="format")
+) -> Response:
+    """Resume a failed or interrupted run from its last completed node."""
+    try:
+        with prewarm_scheduler.interactive():
+            result = resume_workflow(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Run not found")
+    except Exception as e:
+        return ORJSONResponse({
+            "status": "error",
+            "run_id": run_id,
+            "message": str(e)
+        })
+
+    save_report(result, run_id, request.user_id)
+    return workflow_response(result, run_id, request.include_artifacts, http_request, fields, report_format)
+
+@app.post("/align_profiles")
+def align_bill_profiles(request: ProfilesAlignmentRequest, http_request: Request) -> Response:
+    """Align one bill with many user profiles, `cohort_size` profiles per alignment call.
+
+    The bill-level stages run once (from cache when the bill is warmed); the
+    investigation correction loop is skipped, as in bulk runs. A plain `def`
+    so FastAPI runs the blocking workflow in its threadpool, off the event loop.
+    """
+    try:
+        with prewarm_scheduler.interactive():
+            state = analyze_bill(str(request.congress_num), str(request.type), str(request.bill_num))
+            alignments = align_profiles(state, request.profiles, request.cohort_size)
+    except Exception as e:
+        return ORJSONResponse({
+            "status": "error",
+            "message": str(e)
+        })
+    return json_response({
+        "status": "success",
+        "alignments": alignments
+    }, http_request)
+
+@app.get("/workflow_status/{run_id}")
+async def workflow_status(run_id: str) -> Dict[str, Any]:
+    """Report whether a run finished or which nodes are still pending."""
+    return {
+        "status": "success",
+        **get_run_status(run_id)
+    }
+
+@app.get("/reports")
+async def list_reports(
+    user_id: Optional[str] = None,
+    congress: Optional[str] = None,
+    bill: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100)
+) -> Dict[str, Any]:
+    """List saved reports (metadata only), newest first, filtered by user and/or bill (e.g. bill=hr3852)."""
     return {
         "status": "success",
-        "result": json_result
+        **report_store.list_reports(user_id=user_id, congress=congress, bill=bill, page=page, page_size=page_size)
     }
 
+@app.get("/reports/{report_id}")
+async def get_report(
+    report_id: str,
+    http_request: Request,
+    fields: Optional[str] = None,
+    report_format: Literal["full", "compact"] = Query("full", alias="format")
+) -> Response:
+    """Fetch one saved report by ID."""
+    report = report_store.get(report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    result = report.pop("result")
+    shaped = compact_report(result) if report_format == "compact" else result
+    if fields:
+        shaped = project_fields(shaped, fields.split(","))
+    return json_response({
+        "status": "success",
+        "report": report,
+        "result": shaped
+    }, http_request)
+
+@app.delete("/reports/{report_id}")
+async def delete_report(report_id: str) -> Dict[str, Any]:
+    """Delete one saved report by ID."""
+    if not report_store.delete(report_id):
+        raise HTTPException(status_code=404, detail="Report not found")
+    return {"status": "success"}
+
+@app.get("/artifacts/{digest}")
+async def get_artifact(digest: str) -> Dict[str, Any]:
+    """Fetch a single blob referenced by hash from a workflow result."""
+    if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest) or not blob_store.exists(digest):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return {
+        "status": "success",
+        "digest": digest,
+        "content": blob_store.get_text(digest)
+    }
+
+# Letters and scores are cached by a hash of their normalized inputs. That hash is
+# the ETag, so a client can revalidate with If-None-Match (304 while cached) or
+# re-fetch with a GET on the ETag value, without resending the request body.
+
 @app.post("/write_letter")
-async def write_letter(request: LetterRequest) -> Dict[str, Any]:
+async def write_letter(request: LetterRequest, if_none_match: Optional[str] = Header(default=None)):
+    etag = f'"{request_cache_key("letter", request.preferences, request.bill_context)}"'
+    if etag_matches(if_none_match, etag) and etag.strip('"') in letter_cache:
+        return Response(status_code=304, headers={"ETag": etag})
     try:
         letter = generate_letter(request.preferences, request.bill_context)
-        return {
+        return cached_response({
             "status": "success",
             "letter": letter
-        }
+        }, etag)
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
         }
 
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.post("/write_letter/stream")
+async def stream_letter(request: LetterRequest):
+    """Stream the letter as server-sent events: `data` deltas, then a `done` event."""
+    cache_key = request_cache_key("letter", request.preferences, request.bill_context)
+
+    async def events():
+        try:
+            async for delta in astream_letter(request.preferences, request.bill_context):
+                yield sse_event({"delta": delta})
+            yield sse_event({"etag": f'"{cache_key}"'}, event="done")
+        except Exception as e:
+            yield sse_event({"message": str(e)}, event="error")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"ETag": f'"{cache_key}"', "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/write_letter/{cache_key}")
+async def get_cached_letter(cache_key: str, if_none_match: Optional[str] = Header(default=None)):
+    """Return a previously generated letter by its ETag."""
+    letter = letter_cache.get(cache_key)
+    if letter is None:
+        raise HTTPException(status_code=404, detail="Letter not cached")
+    etag = f'"{cache_key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return cached_response({
+        "status": "success",
+        "letter": letter
+    }, etag)
+
 @app.post("/generate_score")
-async def generate_bill_score(request: ScoreRequest) -> Dict[str, Any]:
+async def generate_bill_score(request: ScoreRequest, if_none_match: Optional[str] = Header(default=None)):
     """Generate impact scores for a bill based on preferences and context."""
-    print("HIIIIIIII update")
+    etag = f'"{request_cache_key("score", request.preferences, request.bill_context)}"'
+    if etag_matches(if_none_match, etag) and etag.strip('"') in score_cache:
+        return Response(status_code=304, headers={"ETag": etag})
     
     scores = generate_score(request.preferences, request.bill_context)
-    print(scores)
-    return {
+    return cached_response({
         "status": "success",
         "scores": scores
-    }
+    }, etag)
+
+@app.get("/generate_score/{cache_key}")
+async def get_cached_score(cache_key: str, if_none_match: Optional[str] = Header(default=None)):
+    """Return previously generated scores by their ETag."""
+    scores = score_cache.get(cache_key)
+    if scores is None:
+        raise HTTPException(status_code=404, detail="Scores not cached")
+    etag = f'"{cache_key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return cached_response({
+        "status": "success",
+        "scores": scores
+    }, etag)
+
+@app.post("/generate_scores")
+async def generate_bill_scores(request: BatchScoreRequest):
+    """Score many bills for one profile, streaming one NDJSON line per bill as it finishes."""
+
+    async def lines():
+        async for index, scores in agenerate_scores(request.preferences, request.bill_contexts, request.max_concurrency):
+            if "error" in scores:
+                line = {"index": index, "status": "error", "message": scores["error"]}
+            else:
+                line = {"index": index, "status": "success", "scores": scores}
+            yield json.dumps(line) + "\n"
 
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 if __name__ == "__main__":
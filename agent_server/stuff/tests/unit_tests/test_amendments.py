@@ -0,0 +1,78 @@
+import importlib
+import sqlite3
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import StateGraph
+
+from agent.cache import PersistentCache
+from agent.types import ChangeRecords
+
+graph_module = importlib.import_module("agent.graph")
+
+CHANGE = {"title": "t", "explanation": "e", "concern": "c", "severity": "low"}
+
+
+class StubLLM:
+    """Analyzes every amendment except those whose text says "garbled" (no structured output)."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def with_structured_output(self, schema):
+        def respond(messages):
+            self.prompts.append(messages[-1]["content"])
+            return None if "garbled" in messages[-1]["content"] else schema(records=[CHANGE])
+        return RunnableLambda(respond)
+
+
+def amendment(number: int, update_date: str, text: str = "Strikes section 2") -> dict:
+    return {"congress": 119, "type": "HAMDT", "number": str(number), "updateDate": update_date, "description": text}
+
+
+def test_only_new_or_updated_amendments_reach_the_llm(monkeypatch, tmp_path):
+    stub = StubLLM()
+    monkeypatch.setattr(graph_module, "llm", stub)
+    monkeypatch.setattr(graph_module, "amendment_cache", PersistentCache("amendment_analysis", path=str(tmp_path / "c.sqlite")))
+    monkeypatch.setattr(graph_module.blob_store, "root", str(tmp_path / "blobs"))
+    amendments = [amendment(1, "2025-03-01"), amendment(2, "2025-03-02"), amendment(3, "2025-03-03", "garbled")]
+    monkeypatch.setattr(graph_module.BillHelper, "iter_amendment_pages", lambda self: iter([(0, amendments[:2]), (2, amendments[2:])]))
+    state = {"congress_num": "119", "bill_type": "hr", "bill_number": "1"}
+
+    first = graph_module.bill_history_checker_agent(state)
+    assert len(stub.prompts) == 3
+    first_analysis = graph_module.get_bill_history_analysis(first)
+    assert [entry["analysis"] is None for entry in first_analysis] == [False, False, True]
+
+    # Amendment 2 is updated; amendment 1 comes from the cache and the failed amendment 3 is retried
+    amendments[1] = amendment(2, "2025-04-15", "Strikes section 2 and inserts section 2A")
+    stub.prompts.clear()
+    second = graph_module.bill_history_checker_agent(state)
+    assert len(stub.prompts) == 2
+    assert any("2025-04-15" in prompt for prompt in stub.prompts)
+    assert not any("'number': '1'" in prompt for prompt in stub.prompts)
+    second_analysis = graph_module.get_bill_history_analysis(second)
+    assert [entry["amendment"]["number"] for entry in second_analysis] == ["1", "2", "3"]
+    assert isinstance(second_analysis[0]["analysis"], ChangeRecords)
+
+
+def test_checkpoint_size_stays_flat_as_history_grows(monkeypatch, tmp_path):
+    monkeypatch.setattr(graph_module, "llm", StubLLM())
+    monkeypatch.setattr(graph_module, "amendment_cache", PersistentCache("amendment_analysis", path=str(tmp_path / "c.sqlite")))
+    monkeypatch.setattr(graph_module.blob_store, "root", str(tmp_path / "blobs"))
+    history_graph = StateGraph(graph_module.State).add_node("history", graph_module.bill_history_checker_agent)
+    history_graph = history_graph.set_entry_point("history").set_finish_point("history")
+
+    def checkpoint_bytes(count: int) -> int:
+        amendments = [amendment(n, "2025-03-01", "Strikes section 2 " * 50) for n in range(count)]
+        monkeypatch.setattr(graph_module.BillHelper, "iter_amendment_pages", lambda self: iter([(0, amendments)]))
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        compiled = history_graph.compile(checkpointer=SqliteSaver(conn, serde=graph_module.checkpoint_serializer()))
+        result = compiled.invoke({"congress_num": "119", "bill_type": "hr", "bill_number": "1"}, graph_module.run_config("run"))
+        assert len(graph_module.get_bill_history(result)) == count
+        [[size]] = conn.execute(
+            "SELECT (SELECT max(length(checkpoint)) FROM checkpoints) + (SELECT coalesce(max(length(value)), 0) FROM writes)"
+        ).fetchall()
+        return size
+
+    assert abs(checkpoint_bytes(200) - checkpoint_bytes(2)) < 64
@@ -0,0 +1,71 @@
+from agent.bill_diff import compare_versions, parse_sections
+
+INTRODUCED = """<?xml version="1.0"?>
+<bill xmlns:dc="http://purl.org/dc/elements/1.1/"><legis-body>
+<section id="S1"><enum>1.</enum><header>Short title</header><text>This Act may be cited as the <quote>Example Act</quote>.</text></section>
+<section id="S2"><enum>2.</enum><header>Grants</header>
+<subsection id="a"><enum>(a)</enum><text>The Secretary shall award grants of $10,000,000.</text></subsection>
+<quoted-block><section id="Q"><enum>5.</enum><header>Quoted</header><text>Not a section of this bill.</text></section></quoted-block>
+</section>
+<section id="S3"><enum>3.</enum><header>Repeal</header><text>Section 7 of title 5 is repealed.</text></section>
+</legis-body></bill>"""
+
+ENGROSSED = """SEC. 1. SHORT TITLE.
+This Act may be cited as the Example Act.
+SEC. 2. GRANTS.
+(a) The Secretary shall award grants of $25,000,000.
+SEC. 3. REPORT.
+The Secretary shall report annually.
+"""
+
+
+def test_parse_xml_sections_skips_quoted_sections() -> None:
+    sections = parse_sections(INTRODUCED)
+    assert [s.number for s in sections] == ["1", "2", "3"]
+    assert sections[1].header == "Grants"
+    assert "$10,000,000" in sections[1].text
+    assert "(a)" in sections[1].text.splitlines()[1]
+
+
+def test_compare_versions_reports_changes() -> None:
+    diff = compare_versions(INTRODUCED, INTRODUCED)
+    assert diff["unchanged"] == 3 and not diff["modified"] and not diff["added"]
+
+    diff = compare_versions(ENGROSSED, ENGROSSED.replace("$25,000,000", "$30,000,000"), "Engrossed", "Enrolled")
+    assert [m["number"] for m in diff["modified"]] == ["2"]
+    assert diff["unchanged"] == 2
+    assert "Changes from Engrossed to Enrolled: 1 modified" in diff["report"]
+
+
+def test_renumbered_sections_still_match() -> None:
+    renumbered = ENGROSSED.replace("SEC. 3. REPORT.", "SEC. 4. REPORT.")
+    diff = compare_versions(ENGROSSED, renumbered)
+    assert diff["renumbered"] == [{"from": "3", "to": "4", "division": "", "header": "REPORT."}]
+    assert diff["unchanged"] == 3
+
+
+OMNIBUS = """SEC. 1. SHORT TITLE.
+This Act may be cited as the Consolidated Appropriations Act.
+DIVISION A—AGRICULTURE
+SEC. 101. GRANTS.
+The Secretary of Agriculture shall award grants of $10,000,000 to rural cooperatives.
+SEC. 102. AVAILABILITY.
+Amounts made available by this division shall remain available until expended.
+DIVISION B—DEFENSE
+SEC. 101. GRANTS.
+The Secretary of Defense shall award grants of $40,000,000 for shipyard workforce training.
+SEC. 102. AVAILABILITY.
+Amounts made available by this division shall remain available until expended.
+"""
+
+
+def test_omnibus_divisions_keep_repeated_section_numbers_apart() -> None:
+    sections = parse_sections(OMNIBUS)
+    assert [s.key for s in sections] == ["1", "A/101", "A/102", "B/101", "B/102"]
+
+    diff = compare_versions(OMNIBUS, OMNIBUS.replace("$40,000,000", "$45,000,000"))
+    assert [(m["division"], m["number"]) for m in diff["modified"]] == [("B", "101")]
+    assert diff["modified"][0]["similarity"] > 0.9
+    assert not diff["added"] and not diff["removed"]
+    assert diff["unchanged"] == 4
+    assert "- Modified Division B SEC. 101 GRANTS." in diff["report"]
@@ -0,0 +1,42 @@
+from agent.bill_diff import parse_sections
+from agent.bill_text import normalize_bill_text, xml_offset
+
+BILL_XML = """<?xml version="1.0"?>
+<!DOCTYPE bill PUBLIC "-//US Congress//DTDs/bill.dtd//EN" "bill.dtd">
+<bill bill-stage="Introduced-in-House"><metadata xmlns:dc="http://purl.org/dc/elements/1.1/"><dublinCore><dc:title>119 HR 1 IH: Example</dc:title></dublinCore></metadata>
+<form><congress display="yes">119th CONGRESS</congress><legis-num display="yes">H. R. 1</legis-num><official-title>To fund roads.</official-title></form>
+<legis-body id="B1" style="OLC"><section id="S1" section-type="section-one"><enum>1.</enum><header>Short title; table of contents</header><text display-inline="no-display-inline">This Act may be cited as the <short-title>Example Act</short-title>.</text>
+<toc><toc-entry level="section">Sec. 1. Short title.</toc-entry></toc></section>
+<title id="T1"><enum>I</enum><header>Roads</header>
+<section id="S2"><enum>2.</enum><header>Grants</header>
+<subsection id="a"><enum>(a)</enum><header>In general</header><text>The Secretary shall award grants of $10,000,000&#x2014;</text>
+<paragraph id="p1"><enum>(1)</enum><text>to States; and</text></paragraph></subsection>
+<quoted-block id="q"><section id="Q"><enum>5.</enum><header>Quoted</header><text>Not a section of this bill.</text></section></quoted-block>
+</section></title>
+</legis-body></bill>"""
+
+
+def test_xml_becomes_compact_text_with_sections() -> None:
+    normalized = normalize_bill_text(BILL_XML)
+    lines = normalized.text.splitlines()
+
+    assert "<" not in normalized.text and "dublinCore" not in normalized.text
+    assert "SEC. 1. Short title; table of contents" in lines
+    assert "This Act may be cited as the Example Act." in lines
+    assert "(a) In general.—The Secretary shall award grants of $10,000,000—" in lines
+    assert "(1) to States; and" in lines
+    assert "Sec. 1. Short title." not in normalized.text  # Table of contents dropped
+    assert [s.number for s in parse_sections(normalized.text)] == ["0", "1", "2"]
+    assert normalized.stats["saved_tokens"] > 0
+
+
+def test_offsets_map_text_back_to_xml() -> None:
+    normalized = normalize_bill_text(BILL_XML)
+    position = normalized.text.index("to States")
+    assert BILL_XML.encode()[xml_offset(normalized.offsets, position):].startswith(b'<paragraph id="p1">')
+
+
+def test_plain_text_passes_through() -> None:
+    normalized = normalize_bill_text("SEC. 1. SHORT TITLE.\nText.")
+    assert normalized.text == "SEC. 1. SHORT TITLE.\nText."
+    assert normalized.stats["saved_tokens"] == 0
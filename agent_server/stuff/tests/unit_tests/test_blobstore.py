@@ -0,0 +1,16 @@
+from agent.blobstore import BlobStore
+
+
+def test_put_is_content_addressed(tmp_path) -> None:
+    store = BlobStore(str(tmp_path))
+    digest = store.put("SEC. 1. SHORT TITLE.")
+    assert store.put(b"SEC. 1. SHORT TITLE.") == digest
+    assert store.get_text(digest) == "SEC. 1. SHORT TITLE."
+    assert store.path(digest).startswith(str(tmp_path / digest[:2]))
+
+
+def test_json_and_empty_blobs(tmp_path) -> None:
+    store = BlobStore(str(tmp_path))
+    assert store.get_json(store.put_json({"b": 1, "a": [1, 2]})) == {"a": [1, 2], "b": 1}
+    assert store.get_bytes(store.put(b"")) == b""
+    assert not store.exists("0" * 64)
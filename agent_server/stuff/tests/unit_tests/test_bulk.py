@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tracers.context import _configure_hooks
+
+from agent.bulk import JSONLWriter, ProgressLog, parse_bill_specs, run_bulk
+
+
+def test_parse_bill_specs_expands_ranges():
+    assert parse_bill_specs(["HR3852", "s10-12", "hr3852"]) == [
+        ("hr", "3852"), ("s", "10"), ("s", "11"), ("s", "12")
+    ]
+    with pytest.raises(ValueError):
+        parse_bill_specs(["3852"])
+
+
+def test_run_bulk_resumes_from_progress(tmp_path):
+    calls = []
+
+    def analyze(congress, bill_type, number):
+        calls.append(f"{bill_type}{number}")
+        if number == "2":
+            raise RuntimeError("congress.gov timeout")
+        return {"bill_metadata": {"bill": {"title": f"Bill {number}"}}}
+
+    output = tmp_path / "out.jsonl"
+    progress = ProgressLog(str(tmp_path / "progress.jsonl"))
+    bills = parse_bill_specs(["hr1-3"])
+
+    stats = run_bulk("119", bills, JSONLWriter(str(output)), progress, workers=2, analyze=analyze)
+    assert stats["succeeded"] == 2 and stats["failed"] == 1
+    assert sorted(json.loads(line)["bill"] for line in output.read_text().splitlines()) == ["hr1", "hr3"]
+
+    calls.clear()
+    assert run_bulk("119", bills, JSONLWriter(str(output)), progress, analyze=analyze)["bills"] == 0
+    run_bulk("119", bills, JSONLWriter(str(output)), progress, retry_failed=True, analyze=analyze)
+    assert calls == ["hr2"]
+
+
+def test_run_bulk_counts_tokens_per_bill_without_adding_callback_hooks(tmp_path):
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120})
+    model = GenericFakeChatModel(messages=iter([message] * 10))
+
+    def analyze(congress, bill_type, number):
+        model.invoke("summarize")
+        model.invoke("investigate")
+        return {}
+
+    hooks = len(_configure_hooks)
+    stats = run_bulk("119", parse_bill_specs(["hr1-5"]), JSONLWriter(str(tmp_path / "out.jsonl")),
+                     ProgressLog(str(tmp_path / "progress.jsonl")), workers=2, analyze=analyze)
+    assert stats["tokens_per_bill"] == 240
+    assert len(_configure_hooks) == hooks
@@ -0,0 +1,73 @@
+import time
+from contextvars import ContextVar
+
+from langchain_core.messages import AIMessage
+
+from agent.cache import LRUCache, PersistentCache
+from agent.rep_profiles import RepresentativeProfileService
+
+
+def test_ttl_and_namespaces(tmp_path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    profiles = PersistentCache("profiles", ttl_seconds=60, path=path)
+    other = PersistentCache("other", path=path)
+
+    profiles.set("A000001", {"profile": "text"})
+    profiles.set("B000002", {"profile": "stale"}, ttl_seconds=-1)
+    assert profiles.get("A000001") == {"profile": "text"}
+    assert profiles.get("B000002") is None
+    assert other.get("A000001") is None
+    assert profiles.get_many(["A000001", "B000002"]) == {"A000001": {"profile": "text"}}
+
+
+run_label = ContextVar("run_label", default=None)
+
+
+class FakeAgent:
+    def __init__(self):
+        self.calls = 0
+        self.contexts = []
+
+    def invoke(self, inputs):
+        self.calls += 1
+        self.contexts.append(run_label.get())
+        time.sleep(0.01)
+        return {"messages": [AIMessage(content=inputs["messages"][0]["content"])]}
+
+
+def test_rep_profiles_are_cached_by_bioguide_id(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("agent.rep_profiles.blob_store.root", str(tmp_path / "blobs"))
+    service = RepresentativeProfileService(llm=None, cache=PersistentCache("rep_profiles", path=str(tmp_path / "c.sqlite")))
+    service._agent = FakeAgent()
+    sponsors = [{"bioguideId": f"X{i:06d}", "fullName": f"Rep. {i}"} for i in range(3)]
+
+    first = service.get_profiles(sponsors)
+    second = service.get_profiles(sponsors)
+    assert service._agent.calls == 3
+    assert first == second
+    assert set(first) == {"Rep. 0", "Rep. 1", "Rep. 2"}
+
+
+def test_rep_profile_workers_inherit_the_callers_context(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("agent.rep_profiles.blob_store.root", str(tmp_path / "blobs"))
+    service = RepresentativeProfileService(llm=None, cache=PersistentCache("rep_profiles", path=str(tmp_path / "c.sqlite")))
+    service._agent = FakeAgent()
+    token = run_label.set("bill-1")  # Stands in for the usage callback context of stage_metrics
+    try:
+        service.get_profiles([{"bioguideId": f"X{i:06d}", "fullName": f"Rep. {i}"} for i in range(3)])
+    finally:
+        run_label.reset(token)
+    assert service._agent.contexts == ["bill-1"] * 3
+
+
+def test_lru_cache_evicts_and_expires() -> None:
+    cache = LRUCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert "b" not in cache and "a" in cache and "c" in cache
+
+    expired = LRUCache(ttl_seconds=-1)
+    expired.set("a", 1)
+    assert expired.get("a") is None
@@ -0,0 +1,139 @@
+import importlib
+import re
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from langchain.docstore.document import Document
+from langchain_core.runnables import RunnableLambda
+
+from agent.bill_diff import parse_sections
+from agent.cache import PersistentCache
+from agent.types import (
+    AlignmentRecords,
+    BeneficiaryRecords,
+    BillCost,
+    CohortAlignmentRecords,
+    PorkRecords,
+    TrojanHorseRecords,
+)
+
+graph_module = importlib.import_module("agent.graph")
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+
+RECORD = {"benefit_or_harm": "benefit", "effect_type": "me", "summary": "s", "explanation": "e", "severity": "low"}
+
+
+class StubLLM:
+    """Answers cohort calls for every labeled profile except P3, and single-profile calls with one record."""
+
+    def __init__(self):
+        self.calls = []
+
+    def with_structured_output(self, schema):
+        def respond(messages):
+            self.calls.append(schema.__name__)
+            if schema is CohortAlignmentRecords:
+                labels = re.findall(r"\[(P\d+)\]", messages[-1]["content"])
+                return schema(profiles=[{"profile_id": label, "records": [RECORD]} for label in labels if label != "P3"])
+            if schema is AlignmentRecords:
+                return schema(records=[RECORD])
+            return BillCost(cost_explanation="c", alternatives=[])
+        return RunnableLambda(respond)
+
+
+def setup(monkeypatch, tmp_path):
+    stub = StubLLM()
+    chunks = [Document(page_content=f"SEC. {i}. Text {i}.", metadata={"content_hash": f"chunk{i}"}) for i in range(3)]
+    monkeypatch.setattr(graph_module, "llm", stub)
+    monkeypatch.setattr(graph_module, "section_result_cache", PersistentCache("section_results", path=str(tmp_path / "c.sqlite")))
+    monkeypatch.setattr(graph_module, "get_bill_text", lambda state: "bill text")
+    monkeypatch.setattr(graph_module, "split_bill_text", lambda text, stage="extraction": chunks)
+    state = {
+        "summaries": {}, "pork_barrel_spending": [PorkRecords(records=[])],
+        "trojan_horses": [TrojanHorseRecords(records=[])], "beneficiaries": [BeneficiaryRecords(records=[])],
+    }
+    return stub, state
+
+
+def test_profiles_are_packed_per_chunk(monkeypatch, tmp_path):
+    stub, state = setup(monkeypatch, tmp_path)
+    profiles = {f"user{i}": f"Profile of user {i}" for i in range(5)}
+
+    results = graph_module.align_profiles(state, profiles, cohort_size=4)
+    # 3 chunks x 2 cohorts (4 + 1 profiles) x benefits/drawbacks; P3 of each full cohort is re-run alone
+    assert stub.calls.count("CohortAlignmentRecords") == 12
+    assert stub.calls.count("AlignmentRecords") == 6
+    assert stub.calls.count("BillCost") == 1
+    assert set(results) == set(profiles)
+    assert all(len(result["user_benefits"]) == 3 and len(result["user_drawbacks"]) == 3 for result in results.values())
+
+
+def test_single_user_run_reuses_cohort_results(monkeypatch, tmp_path):
+    stub, state = setup(monkeypatch, tmp_path)
+    graph_module.align_profiles(state, {"a": "Farmer in Kansas", "b": "Nurse in Ohio"}, cohort_size=2)
+    stub.calls.clear()
+
+    result = graph_module.user_alignment_agent({**state, "profile": "Nurse in Ohio"})
+    assert stub.calls == ["BillCost"]
+    assert len(result["user_benefits"]) == 3
+
+
+def test_combined_alignment_splits_by_effect(monkeypatch, tmp_path):
+    stub, state = setup(monkeypatch, tmp_path)
+    harm = {**RECORD, "benefit_or_harm": "harm"}
+    stub.with_structured_output = lambda schema: RunnableLambda(
+        lambda messages: stub.calls.append(schema.__name__) or (
+            schema(records=[RECORD, harm, harm]) if schema is AlignmentRecords
+            else BillCost(cost_explanation="c", alternatives=[])
+        )
+    )
+    monkeypatch.setattr(graph_module, "COMBINED_ALIGNMENT", True)
+
+    result = graph_module.user_alignment_agent({**state, "profile": "Farmer in Kansas"})
+    # One call per chunk instead of one each for benefits and drawbacks
+    assert stub.calls.count("AlignmentRecords") == 3
+    assert all([r.benefit_or_harm for r in c.records] == ["benefit"] for c in result["user_benefits"])
+    assert all([r.benefit_or_harm for r in c.records] == ["harm", "harm"] for c in result["user_drawbacks"])
+
+
+def test_new_text_version_only_resends_edited_sections(monkeypatch, tmp_path):
+    stub, state = setup(monkeypatch, tmp_path)
+    versions = {
+        "v1": "SEC. 1. GRANTS.\nGrants for rural clinics.\n\nSEC. 2. TAXES.\nA credit for farmers.\n\nSEC. 3. ROADS.\nFunds for county roads.",
+        "v2": "SEC. 1. GRANTS.\nGrants for rural clinics.\n\nSEC. 2. TAXES.\nA larger credit for farmers.\n\nSEC. 3. ROADS.\nFunds for county roads.",
+    }
+    monkeypatch.setattr(graph_module, "get_bill_text", lambda state: versions[state["version"]])
+    monkeypatch.setattr(graph_module, "split_bill_text", lambda text, stage="extraction": [
+        Document(page_content=section.text, metadata={"content_hash": section.content_hash}) for section in parse_sections(text)
+    ])
+    state = {**state, "profile": "Farmer in Kansas", "bill_metadata": {"bill": {"title": "Rural Act"}}}
+
+    graph_module.user_alignment_agent({**state, "version": "v1", "summaries": {"short": "First summary"}})
+    assert stub.calls.count("AlignmentRecords") == 6
+    stub.calls.clear()
+
+    # Summaries and findings are regenerated for the new version; only SEC. 2 changed
+    graph_module.user_alignment_agent({
+        **state, "version": "v2", "summaries": {"short": "Reworded summary"},
+        "pork_barrel_spending": [PorkRecords.model_validate({"records": [
+            {"title": "Larger credit", "explanation": "e", "concern": "c", "severity": "low", "why": "w"}
+        ]})],
+    })
+    assert stub.calls.count("AlignmentRecords") == 2  # Benefits and drawbacks of SEC. 2
+
+
+def test_align_profiles_endpoint_packs_profiles(monkeypatch, tmp_path):
+    stub, state = setup(monkeypatch, tmp_path)
+    monkeypatch.syspath_prepend(str(SRC))
+    api = importlib.import_module("api_endpoint.main")
+    monkeypatch.setattr(api, "analyze_bill", lambda congress, bill_type, number: state)
+
+    response = TestClient(api.app).post("/align_profiles", json={
+        "congress_num": 119, "type": "hr", "bill_num": 1, "cohort_size": 2,
+        "profiles": {"a": "Farmer in Kansas", "b": "Nurse in Ohio"},
+    }).json()
+    assert response["status"] == "success"
+    assert set(response["alignments"]) == {"a", "b"}
+    assert len(response["alignments"]["a"]["user_benefits"]) == 3
+    assert stub.calls.count("CohortAlignmentRecords") == 6  # 3 chunks x benefits/drawbacks, both profiles per call
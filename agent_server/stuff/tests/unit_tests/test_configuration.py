@@ -1,9 +1,34 @@
+"""Define any unit tests you may want in this directory."""
+import importlib
+
 from langgraph.pregel import Pregel
 
 from agent.graph import graph
 
+# `agent.graph` the attribute is the compiled graph, so fetch the module itself
+graph_module = importlib.import_module("agent.graph")
+
 
 def test_placeholder() -> None:
     # TODO: You can add actual unit tests
     # for your graph and other logic here.
     assert isinstance(graph, Pregel)
+
+
+def test_durable_graph_checkpoints_by_run_id(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(graph_module, "CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setattr(graph_module, "_durable_graph", None)
+
+    durable_graph = graph_module.get_durable_graph()
+    assert durable_graph.checkpointer is not None
+    assert graph_module.get_durable_graph() is durable_graph
+    assert graph_module.get_run_status("missing-run")["exists"] is False
+
+
+def test_checkpoint_serializer_round_trips_records() -> None:
+    serializer = graph_module.checkpoint_serializer()
+    records = graph_module.PorkRecords.model_validate(
+        {"records": [{"title": "t", "explanation": "e", "concern": "c", "severity": "high", "why": "w"}]}
+    )
+    restored = serializer.loads_typed(serializer.dumps_typed({"pork_barrel_spending": [records]}))
+    assert restored["pork_barrel_spending"] == [records]
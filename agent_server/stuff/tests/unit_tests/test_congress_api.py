@@ -0,0 +1,73 @@
+import importlib
+import threading
+
+from agent import congress_api
+from agent.cache import PersistentCache
+from agent.types import ChangeRecords
+
+graph_module = importlib.import_module("agent.graph")
+
+
+def fake_amendments_api(total):
+    calls = []
+    lock = threading.Lock()
+
+    def api_get(path, params=None):
+        with lock:
+            calls.append(params["offset"])
+        offset, limit = params["offset"], params["limit"]
+        numbers = range(offset, min(offset + limit, total))
+        return {
+            "amendments": [{"congress": 119, "type": "HAMDT", "number": str(n), "updateDate": "2025-06-01"} for n in numbers],
+            "pagination": {"count": total},
+        }
+
+    return api_get, calls
+
+
+def test_fetch_all_reads_every_page_in_order(monkeypatch):
+    api_get, calls = fake_amendments_api(620)
+    monkeypatch.setattr(congress_api, "api_get", api_get)
+
+    amendments = congress_api.fetch_all("/bill/119/hr/1/amendments", "amendments")
+    assert [a["number"] for a in amendments] == [str(n) for n in range(620)]
+    assert calls[0] == 0 and sorted(calls) == [0, 250, 500]
+
+
+def test_single_page_needs_one_request(monkeypatch):
+    api_get, calls = fake_amendments_api(3)
+    monkeypatch.setattr(congress_api, "api_get", api_get)
+
+    assert len(congress_api.fetch_all("/bill/119/hr/1/amendments", "amendments")) == 3
+    assert calls == [0]
+
+
+class StubStructuredLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return self
+
+    def invoke(self, messages):
+        self.calls += 1
+        return ChangeRecords(records=[])
+
+
+def test_history_agent_analyzes_streamed_pages(tmp_path, monkeypatch):
+    api_get, _ = fake_amendments_api(7)
+    monkeypatch.setattr(congress_api, "api_get", api_get)
+    monkeypatch.setattr(graph_module, "iter_pages", lambda path, key: congress_api.iter_pages(path, key, page_size=3))
+    monkeypatch.setattr(graph_module, "amendment_cache", PersistentCache("amendments", path=str(tmp_path / "c.sqlite")))
+    monkeypatch.setattr(graph_module.blob_store, "root", str(tmp_path / "blobs"))
+    stub = StubStructuredLLM()
+    monkeypatch.setattr(graph_module, "llm", stub)
+
+    state = {"congress_num": "119", "bill_type": "hr", "bill_number": "1"}
+    result = graph_module.bill_history_checker_agent(state)
+    assert [a["number"] for a in graph_module.get_bill_history(result)] == [str(n) for n in range(7)]
+    assert all(entry["analysis"] is not None for entry in graph_module.get_bill_history_analysis(result))
+    assert stub.calls == 7
+
+    graph_module.bill_history_checker_agent(state)
+    assert stub.calls == 7  # Unchanged amendments come from the cache
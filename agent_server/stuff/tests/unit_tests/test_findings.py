@@ -0,0 +1,37 @@
+from agent.findings import cluster_findings, merge_findings, normalize_title
+from agent.types import BeneficiaryRecords, PorkRecords
+
+
+def pork(title, explanation, severity="low"):
+    return {"title": title, "explanation": explanation, "concern": "c", "severity": severity, "why": "w"}
+
+
+def test_normalize_title():
+    assert normalize_title("Sec. 5: The Bridge Grants!") == "5 bridge grants"
+
+
+def test_near_duplicates_merge_to_most_severe():
+    chunk_a = PorkRecords.model_validate({"records": [
+        pork("Bridge grant for Springfield", "Provides $5,000,000 to the city of Springfield for construction of a new pedestrian bridge over the river.", "medium"),
+        pork("Museum earmark", "Directs $2,000,000 to a single museum in the sponsor's district."),
+    ]})
+    chunk_b = PorkRecords.model_validate({"records": [
+        pork("Springfield bridge funding", "Provides $5,000,000 to the city of Springfield for construction of a new pedestrian bridge across the river.", "high"),
+        pork("The Museum Earmark", "Funds a museum."),
+    ]})
+
+    merged = merge_findings([chunk_a, chunk_b], PorkRecords)
+    assert len(merged) == 1
+    records = merged[0].records
+    assert [r.severity for r in records] == ["high", "low"]
+    assert records[0].title == "Springfield bridge funding"
+    assert records[1].explanation.startswith("Directs $2,000,000")
+
+
+def test_distinct_findings_stay_separate():
+    records = [
+        {"name": "Rural hospitals", "benefit": "Receive new Medicare add-on payments for emergency services.", "severity": "low"},
+        {"name": "Defense contractors", "benefit": "Gain a sole-source procurement authority for shipbuilding.", "severity": "high"},
+    ]
+    assert cluster_findings(records) == [[0], [1]]
+    assert len(merge_findings([{"records": records}], BeneficiaryRecords)[0].records) == 2
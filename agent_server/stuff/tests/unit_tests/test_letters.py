@@ -0,0 +1,79 @@
+import asyncio
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+
+from agent.cache import LRUCache
+
+graph_module = importlib.import_module("agent.graph")
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+DELTAS = ["Dear Representative,", " please vote", " yes."]
+
+
+class StreamingStub:
+    def __init__(self):
+        self.streams = 0
+
+    async def astream(self, messages):
+        self.streams += 1
+        for delta in DELTAS:
+            yield AIMessageChunk(content=delta)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = StreamingStub()
+    monkeypatch.setattr(graph_module, "llm", stub)
+    monkeypatch.setattr(graph_module, "letter_cache", LRUCache())
+    return stub
+
+
+@pytest.fixture
+def client(monkeypatch, stub):
+    monkeypatch.syspath_prepend(str(SRC))
+    api = importlib.import_module("api_endpoint.main")
+    monkeypatch.setattr(api, "letter_cache", graph_module.letter_cache)
+    return TestClient(api.app)
+
+
+def sse_frames(body: str) -> list:
+    frames = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        frames.append((lines.get("event"), json.loads(lines["data"])))
+    return frames
+
+
+def test_stream_sends_deltas_then_done_and_caches_the_letter(stub, client):
+    body = {"preferences": "Supports rural clinics", "bill_context": "H.R. 1 funds clinics"}
+    response = client.post("/write_letter/stream", json=body)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = sse_frames(response.text)
+    assert frames[:-1] == [(None, {"delta": delta}) for delta in DELTAS]
+    assert frames[-1] == ("done", {"etag": response.headers["ETag"]})
+
+    cache_key = response.headers["ETag"].strip('"')
+    assert graph_module.letter_cache.get(cache_key) == "".join(DELTAS)
+    assert client.get(f"/write_letter/{cache_key}").json()["letter"] == "".join(DELTAS)
+
+    # A repeat request is served from the cache in one piece, without streaming the LLM
+    repeat = sse_frames(client.post("/write_letter/stream", json=body).text)
+    assert repeat[0] == (None, {"delta": "".join(DELTAS)})
+    assert stub.streams == 1
+
+
+def test_disconnected_stream_caches_nothing(stub):
+    async def read_first_delta():
+        stream = graph_module.astream_letter("Supports rural clinics", "H.R. 1 funds clinics")
+        first = await stream.__anext__()
+        await stream.aclose()  # What Starlette does when the client goes away
+        return first
+
+    assert asyncio.run(read_first_delta()) == DELTAS[0]
+    key = graph_module.request_cache_key("letter", "Supports rural clinics", "H.R. 1 funds clinics")
+    assert graph_module.letter_cache.get(key) is None
@@ -0,0 +1,40 @@
+from agent import media_search
+from agent.cache import PersistentCache
+from agent.media_search import (
+    MEDIA_ARTICLE_MAX_TOKENS,
+    cached_search,
+    dedupe_articles,
+    trim_articles,
+)
+from agent.tokens import CHARS_PER_TOKEN
+
+
+def test_dedupe_across_sources_by_url_and_content() -> None:
+    news = [{"url": "https://www.example.com/story/?utm=1", "content": "Bill passes House"}]
+    tavily = [
+        {"url": "http://example.com/story", "content": "different text"},
+        {"url": "https://mirror.net/a", "content": "  bill passes   house "},
+        {"url": "https://other.org/b", "raw_content": "Fresh analysis"},
+    ]
+    deduped_news, deduped_tavily = dedupe_articles([news, tavily])
+    assert deduped_news == news
+    assert [a["url"] for a in deduped_tavily] == ["https://other.org/b"]
+
+
+def test_trim_articles_respects_budget() -> None:
+    articles = [{"url": f"u{i}", "raw_content": "word " * 10_000, "content": "snippet"} for i in range(4)]
+    trimmed = trim_articles(articles, token_budget=400)
+    assert all("raw_content" not in a for a in trimmed)
+    assert sum(len(a["content"]) for a in trimmed) <= 400 * 4 + 4 * len(" ...")
+
+
+def test_cached_search_stores_trimmed_articles(monkeypatch, tmp_path) -> None:
+    cache = PersistentCache("media_search", path=str(tmp_path / "c.sqlite"))
+    monkeypatch.setattr(media_search, "search_cache", cache)
+    page = {"url": "u", "title": "t", "raw_content": "word " * 50_000, "content": "snippet"}
+    monkeypatch.setitem(media_search.SEARCH_FUNCTIONS, "tavily", lambda query: [page])
+
+    [article] = cached_search("tavily", "farm bill")
+    assert "raw_content" not in article and article["title"] == "t"
+    assert len(article["content"]) <= MEDIA_ARTICLE_MAX_TOKENS * CHARS_PER_TOKEN + len(" ...")
+    assert cache.get("tavily:farm bill") == [article]
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tracers.context import _configure_hooks
+
+from agent.cache import PersistentCache
+from agent.prewarm import FixtureBillSource, PrewarmScheduler
+
+FIXTURE = Path(__file__).parent / "fixtures" / "bill_list.json"
+
+
+def make_scheduler(tmp_path, source, warmed, **kwargs):
+    return PrewarmScheduler(
+        source=source,
+        warm=lambda congress, bill_type, number: warmed.append(f"{congress}/{bill_type}/{number}"),
+        state_cache=PersistentCache("prewarm", path=str(tmp_path / "cache.sqlite")),
+        **kwargs,
+    )
+
+
+def test_warms_new_bills_once_newest_first(tmp_path):
+    warmed = []
+    scheduler = make_scheduler(tmp_path, FixtureBillSource(str(FIXTURE)), warmed)
+
+    result = scheduler.run_once()
+    assert warmed == ["119/hr/3852", "119/s/1001", "119/hr/12"]
+    assert result["changed"] == 3
+
+    assert scheduler.run_once()["warmed"] == []
+    assert len(warmed) == 3
+
+
+def test_rewarms_updated_bills(tmp_path):
+    fixture = json.loads(FIXTURE.read_text())
+    path = tmp_path / "bills.json"
+    path.write_text(json.dumps(fixture))
+    warmed = []
+    scheduler = make_scheduler(tmp_path, FixtureBillSource(str(path)), warmed)
+    scheduler.run_once()
+
+    fixture["bills"][2]["updateDateIncludingText"] = "2025-06-12T00:00:00Z"
+    path.write_text(json.dumps(fixture))
+    assert scheduler.run_once()["warmed"] == ["119/hr/12"]
+
+
+def test_stops_when_daily_budget_is_spent(tmp_path):
+    warmed = []
+    scheduler = make_scheduler(tmp_path, FixtureBillSource(str(FIXTURE)), warmed, token_budget=100)
+    scheduler.add_tokens(100)
+
+    result = scheduler.run_once()
+    assert warmed == [] and result["changed"] == 3
+
+
+def test_counts_warm_tokens_without_adding_callback_hooks(tmp_path):
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": 40, "output_tokens": 10, "total_tokens": 50})
+    model = GenericFakeChatModel(messages=iter([message] * 3))
+    scheduler = PrewarmScheduler(
+        source=FixtureBillSource(str(FIXTURE)),
+        warm=lambda congress, bill_type, number: model.invoke(number),
+        state_cache=PersistentCache("prewarm", path=str(tmp_path / "cache.sqlite")),
+    )
+    hooks = len(_configure_hooks)
+    assert scheduler.run_once()["tokens_used_today"] == 150
+    assert len(_configure_hooks) == hooks
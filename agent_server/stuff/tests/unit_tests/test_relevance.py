@@ -0,0 +1,55 @@
+from agent.bill_diff import parse_sections
+from agent.relevance import (
+    BM25Index,
+    bill_relevance_index,
+    parse_profile,
+    profile_query,
+    relevant_sections,
+)
+from agent.types import PorkRecords
+
+PROFILE = """
+    Name: Jane Doe
+    Location: Dodge City, Kansas
+    Occupation: Wheat farmer
+    Interests:
+    - Crop insurance
+    - Rural broadband
+"""
+
+BILL = "\n\n".join([
+    "SEC. 1. SHORT TITLE.\nThis Act may be cited as the Omnibus Appropriations Act.",
+    "SEC. 2. CROP INSURANCE.\nThe Federal Crop Insurance Corporation shall reduce premiums for wheat farmers in Kansas.",
+    "SEC. 3. NAVAL SHIPYARDS.\nFunds are provided for the modernization of naval shipyards and submarine maintenance.",
+    "SEC. 4. RURAL BROADBAND.\nGrants are made available for broadband deployment in rural counties.",
+    "SEC. 5. AIRPORT SECURITY.\nThe Transportation Security Administration shall upgrade airport screening equipment.",
+    "SEC. 6. MUSEUM FUNDING.\nThe Smithsonian Institution shall receive funds for a new museum wing in the District of Columbia.",
+])
+
+
+def test_profile_fields_become_the_query():
+    fields = parse_profile(PROFILE)
+    assert fields["occupation"] == "Wheat farmer"
+    assert fields["interests"] == "Crop insurance Rural broadband"
+    query = profile_query(PROFILE)
+    assert "farm" in query and "kansa" in query
+    assert "jane" not in query
+
+
+def test_ranks_profile_sections_and_adds_high_severity_hits():
+    index = BM25Index(parse_sections(BILL))
+    ranked = [index.sections[i].number for i in index.rank(profile_query(PROFILE), top_k=1, coverage=1.0)]
+    assert ranked[0] == "2"
+    assert set(ranked) == {"2", "4"}
+    assert [index.sections[i].number for i in index.rank(profile_query(PROFILE), top_k=1, coverage=0.0)] == ["2"]
+
+    findings = [PorkRecords.model_validate({"records": [
+        {"title": "Sec. 6 museum wing", "explanation": "Earmark for a museum", "concern": "c", "severity": "high", "why": "w"},
+        {"title": "Sec. 3 shipyards", "explanation": "Shipyard funds", "concern": "c", "severity": "low", "why": "w"},
+    ]})]
+    kept = relevant_sections(index, [PROFILE], findings, top_k=2, coverage=1.0)
+    assert [section.number for section in kept] == ["2", "4", "6"]
+
+
+def test_index_is_built_once_per_bill():
+    assert bill_relevance_index(BILL) is bill_relevance_index(BILL)
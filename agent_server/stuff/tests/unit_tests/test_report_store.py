@@ -0,0 +1,29 @@
+from agent.report_store import ReportStore
+
+
+def test_save_and_get_round_trip(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.sqlite"))
+    meta = store.save("r1", {"summaries": {"levels": {"short": "s"}}}, 119, "HR", 3852, user_id="u1", title="A Bill")
+
+    assert meta["bill_id"] == "hr3852"
+    report = store.get("r1")
+    assert report["title"] == "A Bill"
+    assert report["result"] == {"summaries": {"levels": {"short": "s"}}}
+    assert store.get("missing") is None
+
+
+def test_list_filters_and_paginates(tmp_path):
+    store = ReportStore(str(tmp_path / "reports.sqlite"))
+    for i in range(5):
+        store.save(f"r{i}", {"i": i}, 119, "hr", i % 2, user_id="u1" if i < 4 else "u2")
+
+    first = store.list_reports(user_id="u1", page=1, page_size=3)
+    assert first["total"] == 4 and first["has_more"]
+    assert [item["id"] for item in first["items"]] == ["r3", "r2", "r1"]
+    assert "result" not in first["items"][0]
+
+    second = store.list_reports(user_id="u1", page=2, page_size=3)
+    assert [item["id"] for item in second["items"]] == ["r0"] and not second["has_more"]
+
+    assert store.list_reports(congress="119", bill="HR1")["total"] == 2
+    assert store.delete("r0") and not store.delete("r0")
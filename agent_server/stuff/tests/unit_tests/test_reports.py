@@ -0,0 +1,43 @@
+from agent.blobstore import blob_store
+from agent.reports import compact_report, project_fields
+from agent.types import PorkRecord, PorkRecords
+
+
+def pork(title: str) -> PorkRecord:
+    return PorkRecord(title=title, explanation="e", concern="c", severity="high", why="w")
+
+
+def test_project_fields_descends_models_and_lists() -> None:
+    result = {
+        "summaries": {"levels": {"short": "s"}, "rep_profiles": {"Rep. A": {"profile": "p"}}},
+        "pork_barrel_spending": [PorkRecords(records=[pork("Dam"), pork("Bridge")])],
+        "bill_history": [{"number": "1"}],
+    }
+    projected = project_fields(result, ["summaries.levels", "pork_barrel_spending.records.title", "missing"])
+    assert projected == {
+        "summaries": {"levels": {"short": "s"}},
+        "pork_barrel_spending": [{"records": [{"title": "Dam"}, {"title": "Bridge"}]}],
+    }
+
+
+def test_compact_report_merges_chunks_and_drops_raw_payloads() -> None:
+    result = {
+        "bill_metadata": {"bill": {"title": "Example Act"}},
+        "summaries": {"levels": {}, "rep_profiles": {"Rep. A": {"profile": "p", "transcript": "abc"}}},
+        "bill_history": [{"number": "1", "text": "huge"}],
+        "bill_history_analysis": [{"amendment": {"number": "1", "url": "u", "description": "d"}, "analysis": None}],
+        "pork_barrel_spending": [PorkRecords(records=[pork("Dam")]), PorkRecords(records=[pork("Bridge")])],
+    }
+    compact = compact_report(result)
+    assert "bill_history" not in compact
+    assert compact["summaries"]["rep_profiles"] == {"Rep. A": {"profile": "p"}}
+    assert compact["bill_history_analysis"][0]["amendment"] == {"number": "1", "description": "d"}
+    assert [r["title"] for r in compact["pork_barrel_spending"][0]["records"]] == ["Dam", "Bridge"]
+    assert compact["trojan_horses"] == [{"records": []}]
+
+
+def test_compact_report_resolves_history_from_blob_store(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(blob_store, "root", str(tmp_path))
+    digest = blob_store.put_json([{"amendment": {"number": "1", "text": "huge"}, "analysis": None}])
+    compact = compact_report({"bill_history_analysis_hash": digest})
+    assert compact["bill_history_analysis"] == [{"amendment": {"number": "1"}, "analysis": None}]
@@ -0,0 +1,82 @@
+import importlib
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from agent.routing import StageMetrics, estimate_cost, track_usage
+from agent.types import PorkRecords
+
+graph_module = importlib.import_module("agent.graph")
+
+
+def test_prices_match_the_longest_prefix():
+    assert estimate_cost("models/gemini-2.0-flash-lite-001", 1_000_000, 0) == 0.075
+    assert estimate_cost("gemini-2.0-flash-001", 1_000_000, 1_000_000) == 0.5
+    assert estimate_cost("some-local-model", 1_000, 1_000) == 0.0
+
+
+def test_stage_metrics_count_calls_and_tokens_per_model():
+    message = AIMessage(
+        content="ok",
+        usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120},
+        response_metadata={"model_name": "gemini-2.0-flash-lite"},
+    )
+    model = GenericFakeChatModel(messages=iter([message] * 3))
+    metrics = StageMetrics()
+    with metrics.measure("extraction"):
+        model.batch(["a", "b", "c"], config={"max_concurrency": 3})
+
+    [row] = metrics.summary()
+    assert (row["stage"], row["model"], row["calls"]) == ("extraction", "gemini-2.0-flash-lite", 3)
+    assert (row["input_tokens"], row["output_tokens"]) == (300, 60)
+    assert row["cost"] == estimate_cost("gemini-2.0-flash-lite", 300, 60)
+
+
+def test_usage_tracking_nests():
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+    model = GenericFakeChatModel(messages=iter([message] * 2))
+    metrics = StageMetrics()
+    with track_usage() as outer:
+        with metrics.measure("summary") as inner:
+            model.invoke("a")
+        model.invoke("b")
+    assert inner.total_tokens == 15
+    assert outer.total_tokens == 30
+
+
+class StubModel:
+    """Structured output decided per prompt by `answer(schema, text)`."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.prompts = []
+
+    def with_structured_output(self, schema):
+        def respond(messages):
+            self.prompts.append(messages[-1]["content"])
+            return self.answer(schema, messages[-1]["content"])
+        return RunnableLambda(respond)
+
+
+def test_cascade_escalates_failed_and_unsure_answers(monkeypatch):
+    def cheap_answer(schema, text):
+        if text == "broken":
+            raise ValueError("arguments failed validation")
+        return schema.model_validate({"records": [], "confidence": "low" if text == "unsure" else "high"})
+
+    cheap = StubModel(cheap_answer)
+    strong = StubModel(lambda schema, text: schema.model_validate({"records": []}))
+    monkeypatch.setattr(graph_module, "ENABLE_MODEL_CASCADE", True)
+    monkeypatch.setattr(graph_module, "cheap_llm", cheap)
+    monkeypatch.setattr(graph_module, "llm", strong)
+
+    prompts = [[{"role": "user", "content": text}] for text in ("fine", "unsure", "broken")]
+    responses = graph_module.run_structured("extraction", PorkRecords, prompts)
+    assert sorted(cheap.prompts) == ["broken", "fine", "unsure"]
+    assert sorted(strong.prompts) == ["broken", "unsure"]
+    assert all(type(response) is PorkRecords for response in responses)
+
+    # Strong stages never touch the cheap model
+    graph_module.run_structured("alignment", PorkRecords, prompts[:1])
+    assert len(cheap.prompts) == 3
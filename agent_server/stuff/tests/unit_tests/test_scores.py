@@ -0,0 +1,74 @@
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.runnables import RunnableLambda
+
+from agent.cache import LRUCache
+
+graph_module = importlib.import_module("agent.graph")
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+AREAS = ("spending", "equity", "progress", "environment", "personal")
+
+
+class ScoringStub:
+    """Scores a context by its length; contexts mentioning "broken" raise."""
+
+    def __init__(self):
+        self.contexts = []
+
+    def with_structured_output(self, schema):
+        def respond(messages):
+            context = messages[-1]["content"]
+            self.contexts.append(context)
+            if "broken" in context:
+                raise ValueError("model overloaded")
+            return schema.model_validate({area: {"score": len(context) % 101, "rationale": "r"} for area in AREAS})
+        return RunnableLambda(respond)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = ScoringStub()
+    monkeypatch.setattr(graph_module, "llm", stub)
+    monkeypatch.setattr(graph_module, "score_cache", LRUCache())
+    return stub
+
+
+@pytest.fixture
+def client(monkeypatch, stub):
+    monkeypatch.syspath_prepend(str(SRC))
+    return TestClient(importlib.import_module("api_endpoint.main").app)
+
+
+def post_scores(client, contexts: list) -> dict:
+    response = client.post("/generate_scores", json={"preferences": "Farmer in Kansas", "bill_contexts": contexts})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return {line["index"]: line for line in map(json.loads, response.text.splitlines())}
+
+
+def test_batch_scores_dedupes_contexts_and_reuses_the_cache(stub, client):
+    lines = post_scores(client, ["H.R. 1 farm credit", "H.R. 2 clinics", "H.R.  1 farm credit"])
+    assert len(stub.contexts) == 2  # The third context only differs in whitespace
+    assert all(line["status"] == "success" for line in lines.values())
+    assert lines[0]["scores"] == lines[2]["scores"]
+
+    stub.contexts.clear()
+    lines = post_scores(client, ["H.R. 2 clinics", "H.R. 3 roads"])
+    assert len(stub.contexts) == 1  # H.R. 2 comes from score_cache
+    assert set(lines) == {0, 1}
+
+
+def test_failed_item_is_reported_without_aborting_the_batch(stub, client):
+    lines = post_scores(client, ["H.R. 1 farm credit", "broken context", "broken context"])
+    assert lines[0]["status"] == "success"
+    assert lines[1] == {"index": 1, "status": "error", "message": "model overloaded"}
+    assert lines[2]["status"] == "error"
+
+    # Errors are not cached, so the context is retried next time
+    stub.contexts.clear()
+    post_scores(client, ["broken context"])
+    assert len(stub.contexts) == 1
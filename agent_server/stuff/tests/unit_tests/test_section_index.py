@@ -0,0 +1,96 @@
+import random
+import time
+
+from agent.bill_diff import make_section, parse_sections
+from agent.section_index import SectionIndex, attach_rider_evidence
+from agent.types import TrojanHorseRecord, TrojanHorseRecords
+
+RIDER = (
+    "Notwithstanding any other provision of law, the Secretary of the Interior shall convey to the Northern Timber "
+    "Company, without consideration, all right, title, and interest of the United States in and to the approximately "
+    "12,000 acres of National Forest System land depicted on the map titled Northern Timber Exchange and dated June 1, 2025."
+)
+PAYGO = (
+    "The budgetary effects of this Act, for the purpose of complying with the Statutory Pay-As-You-Go Act of 2010, shall "
+    "be determined by reference to the latest statement titled Budgetary Effects of PAYGO Legislation for this Act, "
+    "submitted for printing in the Congressional Record by the Chairman of the House Budget Committee."
+)
+
+
+def filler(seed: int) -> str:
+    rng = random.Random(seed)
+    vocabulary = "grant state agency report program fund school county health water road tax credit year plan".split()
+    return " ".join(rng.choice(vocabulary) for _ in range(60))
+
+
+def bill(sections):
+    return [make_section(str(i + 1), header, f"SEC. {i + 1}. {header}.\n{text}") for i, (header, text) in enumerate(sections)]
+
+
+def test_finds_renumbered_and_edited_copies(tmp_path):
+    index = SectionIndex(str(tmp_path / "sections.sqlite"))
+    index.add_bill("119/s/10", bill([("Findings", filler(1)), ("Land conveyance", RIDER)]))
+    index.add_bill("119/hr/20", bill([("Definitions", filler(2)), ("Roads", filler(3)), ("Conveyance", RIDER.replace("12,000", "12,500"))]))
+
+    target = bill([("Purpose", filler(4)), ("Land conveyance", RIDER)])
+    start = time.perf_counter()
+    copies = index.find_copies(target, exclude_bill="119/hr/99")
+    assert time.perf_counter() - start < 0.5
+
+    assert list(copies) == [1]
+    matches = {match["bill"]: match for match in copies[1]}
+    assert matches["119/s/10"]["exact"] and matches["119/s/10"]["section"] == "2"
+    assert not matches["119/hr/20"]["exact"] and matches["119/hr/20"]["similarity"] >= 0.8
+
+
+def test_boilerplate_needs_many_bills(tmp_path):
+    index = SectionIndex(str(tmp_path / "sections.sqlite"))
+    paygo = bill([("Budgetary effects", PAYGO)])[0]
+    for i in range(4):
+        index.add_bill(f"119/hr/{i}", bill([("Budgetary effects", PAYGO)]))
+    assert index.boilerplate_hashes([paygo.content_hash]) == set()
+
+    index.add_bill("119/hr/4", bill([("Budgetary effects", PAYGO)]))
+    assert index.boilerplate_hashes([paygo.content_hash]) == {paygo.content_hash}
+    assert index.boilerplate_hashes([paygo.content_hash], exclude_bill="119/hr/4") == set()
+
+
+def test_evidence_attached_to_matching_findings():
+    sections = bill([("Purpose", filler(4)), ("Timber", RIDER)])
+    copies = {1: [{"bill": "119/s/10", "section": "2", "header": "Land conveyance", "similarity": 1.0, "exact": True}]}
+    rider = TrojanHorseRecord(title="Timber land giveaway", explanation="Sec. 2 conveys 12,000 acres of forest land to a company.",
+                              concern="c", severity="high", why="w")
+    other = TrojanHorseRecord(title="Unrelated", explanation="Changes reporting deadlines for county school grants.",
+                              concern="c", severity="low", why="w")
+
+    [container] = attach_rider_evidence([TrojanHorseRecords(records=[rider, other])], sections, copies)
+    assert container.records[0].also_appears_in[0]["bill"] == "119/s/10"
+    assert container.records[0].also_appears_in[0]["bill_section"] == "2"
+    assert container.records[1].also_appears_in == []
+    assert "also_appears_in" not in str(TrojanHorseRecords.model_json_schema())
+
+
+def test_omnibus_sections_with_repeated_numbers_are_kept_apart(tmp_path):
+    index = SectionIndex(str(tmp_path / "sections.sqlite"))
+    index.add_bill("119/s/10", bill([("Findings", filler(1)), ("Land conveyance", RIDER)]))
+    text = (
+        f"DIVISION A—AGRICULTURE\nSEC. 101. LAND CONVEYANCE.\n{RIDER}\n"
+        f"DIVISION B—DEFENSE\nSEC. 101. TRAINING.\n{filler(5)}\n"
+    )
+    omnibus = parse_sections(text)
+    index.add_bill("119/hr/99", omnibus)
+    [[number]] = index._connect().execute("SELECT number FROM sections WHERE bill = '119/hr/99' AND position = 1").fetchall()
+    assert number == "A/101"
+
+    copies = index.find_copies(omnibus, exclude_bill="119/hr/99")
+    assert list(copies) == [1]  # position 0 is the division heading preamble
+    assert index.similar_sections(bill([("Land conveyance", RIDER)])[0], exclude_bill="119/s/10")[0]["section"] == "A/101"
+
+    rider = TrojanHorseRecord(title="Sec. 101 timber giveaway", explanation=f"Sec. 101 says: {RIDER}",
+                              concern="c", severity="high", why="w")
+    training = TrojanHorseRecord(title="Sec. 101 training", explanation="Sec. 101 changes county school grants.",
+                                 concern="c", severity="low", why="w")
+    [container] = attach_rider_evidence([TrojanHorseRecords(records=[rider, training])], omnibus, copies)
+    # "Sec. 101" is ambiguous in an omnibus, so only matching wording ties a finding to Division A's section
+    assert container.records[0].also_appears_in[0]["bill_section"] == "A/101"
+    assert container.records[1].also_appears_in == []
@@ -0,0 +1,57 @@
+import importlib
+import json
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from langchain_core.messages import AIMessage, HumanMessage
+from starlette.requests import Request
+
+from agent.serialization import dumps
+from agent.types import AlignmentRecords, BillCost, PorkRecords, TrojanHorseRecords
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+
+
+def legacy_convert(obj):
+    """The recursive walk `dumps` replaced (convert_to_json_serializable), before jsonable_encoder."""
+    if isinstance(obj, dict):
+        return {k: legacy_convert(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [legacy_convert(item) for item in obj]
+    if hasattr(obj, "model_dump"):
+        return legacy_convert(obj.model_dump())
+    if hasattr(obj, "__dict__"):
+        return legacy_convert(obj.__dict__)
+    if isinstance(obj, (str, int, float, bool, type(None))):
+        return obj
+    return str(obj)
+
+
+def workflow_result() -> dict:
+    finding = {"title": "Bridge", "explanation": "Funds one bridge", "concern": "c", "severity": "high", "why": "w"}
+    return {
+        "messages": [HumanMessage(content="Analyze H.R. 1"), AIMessage(content="Done", additional_kwargs={"id": 1})],
+        "pork_barrel_spending": [PorkRecords.model_validate({"records": [finding]})],
+        "trojan_horses": [TrojanHorseRecords.model_validate({"records": [finding]})],
+        "user_benefits": [AlignmentRecords(records=[])],
+        "cost_analysis": BillCost(cost_explanation="$1B", alternatives=[{"alternative": "a", "explanation": "e"}]),
+        "summaries": {"levels": {"short": "s"}, "rep_profiles": {"Rep. A": {"profile": "p"}}, "counts": [1, 2.5, None, True]},
+    }
+
+
+def test_dumps_matches_the_legacy_encoding():
+    result = workflow_result()
+    assert json.loads(dumps(result)) == jsonable_encoder(legacy_convert(result))
+
+
+def test_api_responses_use_the_same_encoding(monkeypatch):
+    monkeypatch.syspath_prepend(str(SRC))
+    api = importlib.import_module("api_endpoint.main")
+    result = workflow_result()
+    expected = jsonable_encoder(legacy_convert(result))
+
+    assert json.loads(api.ORJSONResponse(result).body) == expected
+    request = Request({"type": "http", "headers": [(b"accept-encoding", b"gzip")]})
+    response = api.json_response(result, request)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == expected
@@ -0,0 +1,49 @@
+from langchain_core.runnables import RunnableLambda
+
+from agent.structured import (
+    StructuredOutputs,
+    add_severity_rubric,
+    with_severity_reference,
+)
+from agent.types import BillCost, TrojanHorseRecords
+
+
+class StubLLM:
+    def __init__(self):
+        self.built = []
+        self.seen = []
+
+    def with_structured_output(self, schema):
+        self.built.append(schema)
+
+        def respond(messages):
+            self.seen.append(messages)
+            return schema.model_validate({"records": []})
+
+        return RunnableLambda(respond)
+
+
+def test_runnables_are_built_once():
+    stub = StubLLM()
+    registry = StructuredOutputs(stub).build([TrojanHorseRecords, BillCost])
+    assert registry.get(TrojanHorseRecords) is registry.get(TrojanHorseRecords)
+    assert stub.built == [TrojanHorseRecords, BillCost]
+
+
+def test_severity_reference_schema_drops_the_rubric():
+    compact = with_severity_reference(TrojanHorseRecords)
+    schema = str(compact.model_json_schema())
+    assert "Sweeping authority" in str(TrojanHorseRecords.model_json_schema())
+    assert "Sweeping authority" not in schema and "also_appears_in" not in schema
+    assert compact.__name__ == "TrojanHorseRecords"
+    assert isinstance(compact.model_validate({"records": []}), TrojanHorseRecords)
+    assert with_severity_reference(BillCost) is BillCost
+
+
+def test_hoisted_rubric_goes_to_system_prompt():
+    stub = StubLLM()
+    registry = StructuredOutputs(stub, hoist_severity=True)
+    registry.get(TrojanHorseRecords).invoke([{"role": "system", "content": "Find riders."}, {"role": "user", "content": "text"}])
+    system = stub.seen[0][0]
+    assert system["content"].startswith("Find riders.") and "SEVERITY SCALE" in system["content"]
+    assert add_severity_rubric([{"role": "user", "content": "x"}])[0]["role"] == "system"
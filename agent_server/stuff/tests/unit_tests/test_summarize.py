@@ -0,0 +1,47 @@
+import importlib
+
+from langchain_core.messages import AIMessage
+
+graph_module = importlib.import_module("agent.graph")
+
+
+class StubLLM:
+    """Answers every prompt with the first 100 characters of its user message."""
+
+    def __init__(self):
+        self.batches = []
+
+    def batch(self, prompts, config=None):
+        self.batches.append(len(prompts))
+        return [AIMessage(content=prompt[-1]["content"][:100]) for prompt in prompts]
+
+
+def test_group_by_size_keeps_order_and_budget():
+    groups = graph_module.group_by_size(["a" * 16, "b" * 16, "c" * 36, "d"], max_tokens=8)
+    assert groups == [["a" * 16, "b" * 16], ["c" * 36], ["d"]]
+
+
+def test_reduce_outlines_reduces_hierarchically(monkeypatch):
+    stub = StubLLM()
+    monkeypatch.setattr(graph_module, "llm", stub)
+    monkeypatch.setattr(graph_module, "summary_reduce_budget", lambda: 63)
+
+    condensed = graph_module.reduce_outlines([f"outline {i} " + "x" * 80 for i in range(12)])
+    assert graph_module.estimate_tokens(condensed) <= 63
+    assert stub.batches == [6, 3, 2]  # 12 outlines -> 6 -> 3 -> 2 parts that fit one prompt
+
+
+def test_bill_purpose_strips_markup():
+    summaries = {
+        graph_module.BILL_SUMMARY_PROMPTS[0]["content"]: "<p>H.R. 1 funds <b>roads</b>.</p>",
+        graph_module.BILL_SUMMARY_PROMPTS[1]["content"]: "<p>It also\n funds bridges.</p>",
+        graph_module.BILL_SUMMARY_PROMPTS[2]["content"]: "<ul><li>outline</li></ul>",
+    }
+    assert graph_module.bill_purpose(summaries) == "H.R. 1 funds roads . It also funds bridges."
+
+
+def test_reduce_budget_follows_the_summary_model_context_window(monkeypatch):
+    gemini = graph_module.summary_reduce_budget()
+    monkeypatch.setattr(graph_module, "context_window", lambda model: 200_000)
+    assert graph_module.summary_reduce_budget() == 16_384
+    assert gemini == 65_536
@@ -0,0 +1,60 @@
+import importlib
+
+from agent.tokens import MIN_CHUNK_TOKENS, chunk_token_budget, context_window
+
+graph_module = importlib.import_module("agent.graph")
+
+
+def test_context_window_ignores_provider_prefix():
+    assert context_window("anthropic:claude-3-5-sonnet-latest") == 200_000
+    assert context_window("gemini-2.0-flash") == 1_048_576
+    assert context_window("anthropic:claude-3-5-haiku-latest") == 200_000
+
+
+def test_parallel_stages_fan_out_to_concurrency():
+    # 400k tokens over 8 concurrent calls -> 50k, rounded down to a power of two
+    assert chunk_token_budget("extraction", 400_000, 1_048_576, 8) == 32_768
+    # Small bills never go below the minimum chunk
+    assert chunk_token_budget("extraction", 10_000, 1_048_576, 8) == MIN_CHUNK_TOKENS
+    # A smaller context window caps the chunk
+    assert chunk_token_budget("summary", 4_000_000, 200_000, 8) == 32_768
+
+
+def test_sequential_validation_uses_largest_chunks():
+    assert chunk_token_budget("validation", 10_000, 200_000, 8) == 65_536
+
+
+def test_small_edits_keep_the_budget():
+    assert chunk_token_budget("alignment", 400_000, 1_048_576, 8) == chunk_token_budget("alignment", 402_000, 1_048_576, 8)
+
+
+def test_split_bill_text_respects_stage_budget(monkeypatch):
+    sections = [f"SEC. {i}. Section {i}.\n" + " ".join(["provision"] * 400) for i in range(1, 101)]
+    text = "\n\n".join(sections)  # about 100k tokens
+    monkeypatch.setattr(graph_module, "MAX_LLM_CONCURRENCY", 8)
+
+    extraction = graph_module.split_bill_text(text, "extraction")
+    validation = graph_module.split_bill_text(text, "validation")
+    assert all(graph_module.estimate_tokens(chunk.page_content) <= 8_192 for chunk in extraction)
+    assert len(validation) <= 2  # A content-defined break may still fall past a quarter of the budget
+    assert len(extraction) > 8
+
+
+class NamedModel:
+    def __init__(self, model: str):
+        self.model = model
+
+
+def test_split_bill_text_uses_the_routed_models_window(monkeypatch):
+    sections = [f"SEC. {i}. Section {i}.\n" + " ".join(["provision"] * 400) for i in range(1, 101)]
+    text = "\n\n".join(sections)  # about 100k tokens
+    monkeypatch.setattr(graph_module, "MAX_LLM_CONCURRENCY", 1)
+    monkeypatch.setattr(graph_module, "llm", NamedModel("gemini-2.0-flash"))
+    monkeypatch.setattr(graph_module, "cheap_llm", NamedModel("anthropic:claude-3-5-haiku-latest"))
+
+    monkeypatch.setattr(graph_module, "ENABLE_MODEL_CASCADE", False)
+    assert max(graph_module.estimate_tokens(chunk.page_content) for chunk in graph_module.split_bill_text(text)) > 16_384
+
+    # Extraction is routed to the cheap model, whose 200k window caps a chunk at 10% of it (rounded to 16k)
+    monkeypatch.setattr(graph_module, "ENABLE_MODEL_CASCADE", True)
+    assert all(graph_module.estimate_tokens(chunk.page_content) <= 16_384 for chunk in graph_module.split_bill_text(text))